@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Completion latency across hint engines.
+
+Replays a corpus of typed prefixes through each engine and reports p50, p95
+and p99 of the time until a hint is available, and of the time the GTK main
+loop would be blocked by the lookup:
+
+  compgen   the old per-hint `bash -c "compgen -c ..."` subprocess
+  index     CommandIndex, sorted PATH index with bisect
+  history   HistoryIndex, frecency trie over a synthetic HISTFILE
+  engine    CompletionEngine with history and index providers on its worker
+
+PATH is synthetic, with the given number of executables spread over a few
+directories, so scaling with large toolchains can be compared. Runs headless:
+
+    python3 benchmarks/bench_completion.py --sizes 5000 50000
+"""
+
+import argparse
+import json
+import os
+import queue
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.command_index import CommandIndex
+from modules.completion import CompletionEngine
+from modules.history import HistoryIndex
+
+STEMS = ["git", "gcc", "clang", "cargo", "docker", "kube", "python", "node", "npm", "make",
+         "cmake", "ls", "grep", "find", "ssh", "rsync", "tar", "zip", "vim", "emacs"]
+SUFFIXES = ["", "-config", "-dump", "-lint", "-fmt", "-run", "-test", "-build", "-server", "-client"]
+PATH_DIRS = 8
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+def summarize(samples):
+    return {
+        "p50_ms": percentile(samples, 0.50),
+        "p95_ms": percentile(samples, 0.95),
+        "p99_ms": percentile(samples, 0.99),
+    }
+
+def make_path(root, size, rng):
+    """Create size empty executables across a few directories, return the PATH"""
+    names = set()
+    while len(names) < size:
+        names.add(f"{rng.choice(STEMS)}{rng.choice(SUFFIXES)}{rng.randint(0, size)}")
+    dirs = [os.path.join(root, f"bin{i}") for i in range(PATH_DIRS)]
+    for directory in dirs:
+        os.makedirs(directory)
+    for i, name in enumerate(sorted(names)):
+        path = os.path.join(dirs[i % PATH_DIRS], name)
+        with open(path, "w"):
+            pass
+        os.chmod(path, 0o755)
+    return os.pathsep.join(dirs), sorted(names)
+
+def make_history(path, names, lines, rng):
+    with open(path, "w") as f:
+        for _ in range(lines):
+            args = " ".join(f"arg{rng.randint(0, 500)}" for _ in range(rng.randint(0, 3)))
+            f.write(f"{rng.choice(names)} {args}".rstrip() + "\n")
+
+def make_corpus(names, count, rng):
+    """Prefixes a user types on the way to a command name"""
+    corpus = []
+    while len(corpus) < count:
+        name = rng.choice(names)
+        for length in range(1, min(len(name), 6) + 1):
+            corpus.append(name[:length])
+    return corpus[:count]
+
+def time_sync(complete, corpus):
+    """Engines that run on the main loop block it for their whole latency"""
+    latency = []
+    for prefix in corpus:
+        start = time.perf_counter()
+        complete(prefix)
+        latency.append((time.perf_counter() - start) * 1000)
+    return {"latency": summarize(latency), "blocked": summarize(latency)}
+
+def compgen(path):
+    # Absolute paths, since only the synthetic directories are on PATH
+    bash = shutil.which("bash")
+    head = shutil.which("head")
+    env = dict(os.environ, PATH=path)
+
+    def complete(prefix):
+        result = subprocess.run([bash, "-c", f"compgen -c '{prefix}' | {head} -n 1"],
+                                capture_output=True, text=True, env=env)
+        return result.stdout.strip()
+    return complete
+
+def time_engine(providers, corpus):
+    """Submit from a simulated main loop and wait for each result to be dispatched back"""
+    main_loop = queue.Queue()
+    engine = CompletionEngine(providers, dispatch=lambda func, *args: main_loop.put((func, args)))
+    latency = []
+    blocked = []
+    for prefix in corpus:
+        delivered = []
+        start = time.perf_counter()
+        engine.submit("pane", prefix, delivered.append)
+        submitted = time.perf_counter()
+        func, args = main_loop.get()
+        dispatched = time.perf_counter()
+        func(*args)
+        done = time.perf_counter()
+        latency.append((done - start) * 1000)
+        blocked.append(((submitted - start) + (done - dispatched)) * 1000)
+    engine.stop()
+    return {"latency": summarize(latency), "blocked": summarize(blocked)}
+
+def bench_size(size, args, rng):
+    with tempfile.TemporaryDirectory() as root:
+        path, names = make_path(root, size, rng)
+        history_file = os.path.join(root, "history")
+        make_history(history_file, names, args.history_lines, rng)
+        corpus = make_corpus(names, args.prefixes, rng)
+        results = {}
+
+        start = time.perf_counter()
+        index = CommandIndex(path)
+        index.build()
+        index_build_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        history = HistoryIndex(history_file)
+        history.refresh(force=True)
+        history_build_ms = (time.perf_counter() - start) * 1000
+
+        if not args.skip_compgen:
+            results["compgen"] = time_sync(compgen(path), corpus[:args.compgen_prefixes])
+        results["index"] = time_sync(index.complete, corpus)
+        results["index"]["build_ms"] = index_build_ms
+        results["history"] = time_sync(history.complete, corpus)
+        results["history"]["build_ms"] = history_build_ms
+        results["engine"] = time_engine([history.complete, index.complete], corpus)
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 50000],
+                        help="executables on the synthetic PATH")
+    parser.add_argument("--prefixes", type=int, default=5000, help="prefixes replayed per engine")
+    parser.add_argument("--compgen-prefixes", type=int, default=200,
+                        help="prefixes replayed through compgen, which forks per lookup")
+    parser.add_argument("--history-lines", type=int, default=100000)
+    parser.add_argument("--skip-compgen", action="store_true")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    report = {}
+    print(f"{'size':>7} {'engine':<8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'blocked p99':>12} {'build ms':>9}")
+    for size in args.sizes:
+        report[size] = bench_size(size, args, rng)
+        for name, result in report[size].items():
+            latency = result["latency"]
+            build = result.get("build_ms")
+            print(f"{size:>7} {name:<8} {latency['p50_ms']:>9.3f} {latency['p95_ms']:>9.3f} "
+                  f"{latency['p99_ms']:>9.3f} {result['blocked']['p99_ms']:>12.3f} "
+                  f"{'-' if build is None else f'{build:.1f}':>9}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Compare cold launch and server launch time-to-first-prompt.
+
+Each shell started by HyxTerminal gets a temporary HOME whose .bashrc appends
+a timestamp to a file on every prompt, so the time between starting the
+launcher and the first new timestamp is the time until the prompt is usable.
+
+Needs a running X server (use xvfb-run for headless machines):
+
+    xvfb-run -a python3 benchmarks/bench_launch.py --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAUNCHER = os.path.join(ROOT, "hyxterminal.py")
+
+BASHRC = 'PROMPT_COMMAND=\'printf "%s\\n" "${EPOCHREALTIME:-$(date +%s.%N)}" >> "$HYX_BENCH_PROMPTS"\'\n'
+
+def make_env(home):
+    """Build an isolated environment for the terminal and its shells"""
+    with open(os.path.join(home, ".bashrc"), "w") as f:
+        f.write(BASHRC)
+    env = dict(os.environ)
+    env["HOME"] = home
+    env["XDG_RUNTIME_DIR"] = home
+    env["HYX_BENCH_PROMPTS"] = os.path.join(home, "prompts")
+    return env
+
+def count_prompts(path):
+    try:
+        with open(path) as f:
+            return f.read().splitlines()
+    except FileNotFoundError:
+        return []
+
+def wait_for_prompt(path, seen, timeout):
+    """Wait for a new prompt timestamp and return it"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        lines = count_prompts(path)
+        if len(lines) > seen:
+            return float(lines[seen])
+        time.sleep(0.002)
+    raise TimeoutError("no prompt appeared")
+
+def bench_cold(env, runs, timeout):
+    samples = []
+    prompts = env["HYX_BENCH_PROMPTS"]
+    for _ in range(runs):
+        seen = len(count_prompts(prompts))
+        start = time.time()
+        proc = subprocess.Popen([sys.executable, LAUNCHER, "--standalone"], env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            samples.append(wait_for_prompt(prompts, seen, timeout) - start)
+        finally:
+            proc.terminate()
+            proc.wait()
+    return samples
+
+def bench_server(env, runs, timeout):
+    samples = []
+    prompts = env["HYX_BENCH_PROMPTS"]
+    seen = len(count_prompts(prompts))
+    server = subprocess.Popen([sys.executable, LAUNCHER, "--server"], env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_prompt(prompts, seen, timeout)
+        for _ in range(runs):
+            seen = len(count_prompts(prompts))
+            start = time.time()
+            subprocess.run([sys.executable, LAUNCHER], env=env, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            samples.append(wait_for_prompt(prompts, seen, timeout) - start)
+    finally:
+        server.terminate()
+        server.wait()
+    return samples
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "min_ms": ordered[0] * 1000,
+        "median_ms": statistics.median(ordered) * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+        sys.exit("No display available, run under xvfb-run")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as home:
+        env = make_env(home)
+        results["cold"] = summarize(bench_cold(env, args.runs, args.timeout))
+        results["server"] = summarize(bench_server(env, args.runs, args.timeout))
+
+    print(f"{'mode':<8} {'runs':>5} {'min ms':>10} {'median ms':>10} {'max ms':>10}")
+    for mode, r in results.items():
+        print(f"{mode:<8} {r['runs']:>5} {r['min_ms']:>10.1f} {r['median_ms']:>10.1f} {r['max_ms']:>10.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=4)
+
+if __name__ == "__main__":
+    main()
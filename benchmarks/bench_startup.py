@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""Cold and warm startup benchmark under a virtual X server.
+
+Launches hyxterminal.py repeatedly with --profile-startup and -X importtime
+and records, per run:
+
+  * interpreter start to window mapped
+  * window mapped to first shell output (the prompt)
+  * self import time of every module
+
+Runs once with all plugins disabled and once per plugin in modules/plugins
+with only that plugin enabled. Cold runs use a fresh HOME and bytecode cache
+each time, warm runs reuse them after a priming launch. Results are written
+as JSON so releases can be diffed:
+
+    python3 benchmarks/bench_startup.py --runs 5 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAUNCHER = os.path.join(ROOT, "hyxterminal.py")
+PLUGIN_DIR = os.path.join(ROOT, "modules", "plugins")
+
+sys.path.insert(0, ROOT)
+
+def start_xvfb():
+    """Start Xvfb on a free display and return (process, display)"""
+    if not shutil.which("Xvfb"):
+        sys.exit("Xvfb is not installed")
+    read_fd, write_fd = os.pipe()
+    proc = subprocess.Popen(
+        ["Xvfb", "-displayfd", str(write_fd), "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+        pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        display = f.readline().strip()
+    if not display:
+        proc.kill()
+        sys.exit("Xvfb failed to start")
+    return proc, f":{display}"
+
+def list_plugins():
+    """Return plugin names from the static metadata scan"""
+    from modules.plugins import scan_plugin_file
+
+    names = []
+    for filename in sorted(os.listdir(PLUGIN_DIR)):
+        if filename.endswith(".py") and not filename.startswith("__"):
+            for plugin_class in scan_plugin_file(os.path.join(PLUGIN_DIR, filename)):
+                names.append(plugin_class["metadata"].get("name", plugin_class["class_name"]))
+    return names
+
+def parse_importtime(stderr):
+    """Map module name to self import time in milliseconds"""
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, _, name = line[len("import time:"):].split("|", 2)
+            imports[name.strip()] = imports.get(name.strip(), 0) + int(self_us) / 1000
+        except ValueError:
+            continue
+    return imports
+
+def launch(env, timeout):
+    """Run one profiled launch and return its measurements"""
+    profile = os.path.join(env["HOME"], "profile.json")
+    if os.path.exists(profile):
+        os.unlink(profile)
+    stderr_path = os.path.join(env["HOME"], "stderr.txt")
+    with open(stderr_path, "w") as stderr:
+        proc = subprocess.Popen(
+            [sys.executable, "-X", "importtime", LAUNCHER,
+             "--standalone", "--no-restore", f"--profile-startup={profile}"],
+            env=env, stdout=subprocess.DEVNULL, stderr=stderr
+        )
+        try:
+            deadline = time.time() + timeout
+            while not os.path.exists(profile):
+                if time.time() > deadline or proc.poll() is not None:
+                    raise RuntimeError("HyxTerminal did not finish starting")
+                time.sleep(0.01)
+            time.sleep(0.05)
+        finally:
+            proc.terminate()
+            proc.wait()
+    with open(profile) as f:
+        phases = {p["name"]: p for p in json.load(f)["phases"]}
+    with open(stderr_path) as f:
+        imports = parse_importtime(f.read())
+
+    origin = -phases["interpreter startup"]["duration_ms"] if "interpreter startup" in phases else 0
+    mapped = phases.get("window mapped", {}).get("start_ms")
+    output = phases.get("first shell output", {}).get("start_ms")
+    return {
+        "start_to_mapped_ms": None if mapped is None else mapped - origin,
+        "mapped_to_prompt_ms": None if mapped is None or output is None else output - mapped,
+        "load_plugins_ms": phases.get("load plugins", {}).get("duration_ms"),
+        "imports_ms": imports,
+    }
+
+def make_env(base, home, pycache, display, enabled_plugin):
+    os.makedirs(home, exist_ok=True)
+    settings_file = os.path.join(home, "plugin_settings.json")
+    with open(settings_file, "w") as f:
+        json.dump({enabled_plugin: {"enabled": True, "settings": {}}} if enabled_plugin else {}, f)
+    env = dict(base)
+    env.update({
+        "HOME": home,
+        "DISPLAY": display,
+        "XDG_RUNTIME_DIR": home,
+        "PYTHONPYCACHEPREFIX": pycache,
+        "HYXTERMINAL_PLUGIN_SETTINGS": settings_file,
+    })
+    return env
+
+def summarize(runs):
+    summary = {}
+    for key in ("start_to_mapped_ms", "mapped_to_prompt_ms", "load_plugins_ms"):
+        values = [run[key] for run in runs if run[key] is not None]
+        if values:
+            summary[key] = {"median": statistics.median(values), "min": min(values), "max": max(values)}
+    imports = {}
+    for run in runs:
+        for name, ms in run["imports_ms"].items():
+            imports.setdefault(name, []).append(ms)
+    top = sorted(((statistics.median(v), name) for name, v in imports.items()), reverse=True)[:25]
+    summary["top_imports_ms"] = {name: ms for ms, name in top}
+    return summary
+
+def bench_variant(name, plugin, display, runs, timeout, workdir):
+    results = {"cold": [], "warm": []}
+    for i in range(runs):
+        run_dir = os.path.join(workdir, f"{name}-cold-{i}")
+        env = make_env(os.environ, os.path.join(run_dir, "home"), os.path.join(run_dir, "pycache"),
+                       display, plugin)
+        results["cold"].append(launch(env, timeout))
+
+    warm_dir = os.path.join(workdir, f"{name}-warm")
+    env = make_env(os.environ, os.path.join(warm_dir, "home"), os.path.join(warm_dir, "pycache"),
+                   display, plugin)
+    launch(env, timeout)
+    for _ in range(runs):
+        results["warm"].append(launch(env, timeout))
+
+    return {mode: {"summary": summarize(r), "runs": r} for mode, r in results.items()}
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "-C", ROOT, "rev-parse", "HEAD"],
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", default="startup-benchmark.json")
+    parser.add_argument("--use-display", action="store_true",
+                        help="use the current DISPLAY instead of starting Xvfb")
+    args = parser.parse_args()
+
+    xvfb = None
+    if args.use_display:
+        display = os.environ["DISPLAY"]
+    else:
+        xvfb, display = start_xvfb()
+
+    variants = [("no-plugins", None)] + [(plugin, plugin) for plugin in list_plugins()]
+    report = {
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "variants": {},
+    }
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for name, plugin in variants:
+                print(f"benchmarking {name}...")
+                report["variants"][name] = bench_variant(name, plugin, display, args.runs,
+                                                         args.timeout, workdir)
+    finally:
+        if xvfb:
+            xvfb.terminate()
+            xvfb.wait()
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+
+    print(f"{'variant':<20} {'mode':<5} {'start->mapped':>14} {'mapped->prompt':>15} {'plugins':>8}")
+    for name, modes in report["variants"].items():
+        for mode, data in modes.items():
+            s = data["summary"]
+            cells = [s.get(key, {}).get("median") for key in
+                     ("start_to_mapped_ms", "mapped_to_prompt_ms", "load_plugins_ms")]
+            text = [f"{c:.1f}" if c is not None else "-" for c in cells]
+            print(f"{name:<20} {mode:<5} {text[0]:>14} {text[1]:>15} {text[2]:>8}")
+    print(f"results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,90 @@
 #!/usr/bin/env python3
 
-import gi
-import re
+import argparse
 import os
+import sys
+
+from modules import instance
+from modules import startup_profiler as profiler
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(prog="hyxterminal", description="HyxTerminal terminal emulator")
+    parser.add_argument('--server', action='store_true',
+                        help="keep running and open windows for later invocations")
+    parser.add_argument('--standalone', action='store_true',
+                        help="always start a new process instead of using a running server")
+    parser.add_argument('--new-tab', action='store_true',
+                        help="open a tab in the running server instead of a new window")
+    parser.add_argument('--dropdown', action='store_true',
+                        help="run as a server with a hidden dropdown terminal ready to show")
+    parser.add_argument('--toggle-dropdown', action='store_true',
+                        help="show or hide the dropdown terminal of the running server")
+    parser.add_argument('-d', '--working-directory',
+                        help="directory to start the shell in")
+    parser.add_argument('--profile-startup', nargs='?', const='', metavar='JSON_FILE',
+                        help="print startup phase timings, or write them as JSON to JSON_FILE")
+    parser.add_argument('--no-restore', action='store_true',
+                        help="do not restore the previous session")
+    parser.add_argument('--metrics', action='store_true',
+                        help="print new tab and split prompt latency on exit")
+    parser.add_argument('--search', metavar='PATTERN',
+                        help="print archived scrollback lines containing PATTERN and exit")
+    parser.add_argument('--search-limit', type=int, default=50, metavar='N',
+                        help="print at most N lines for --search (default 50)")
+    return parser.parse_args(argv)
+
+# Hand the request to a running server before paying for the GTK imports
+if __name__ == "__main__":
+    ARGS = parse_args()
+    if ARGS.search is not None:
+        from modules import search_index
+        sys.exit(search_index.main(ARGS.search, ARGS.search_limit))
+    if not (ARGS.server or ARGS.standalone or ARGS.dropdown):
+        if ARGS.toggle_dropdown:
+            action = "toggle-dropdown"
+        else:
+            action = "tab" if ARGS.new_tab else "window"
+        if instance.hand_off(sys.argv[1:], os.getcwd(), action):
+            sys.exit(0)
+    if ARGS.profile_startup is not None:
+        profiler.enable(ARGS.profile_startup or None)
+
+profiler.begin("import gi")
+import gi
 gi.require_version('Gtk', '3.0')
 gi.require_version('Vte', '2.91')
-from gi.repository import Gtk, Gdk, Pango, Vte, GLib, GObject
+from gi.repository import Gtk, Gdk, Vte
+profiler.end("import gi")
 
+profiler.begin("import modules")
 from modules.terminal_tab import TerminalTab
 from modules.tab_label import TabLabel
 from modules.dialogs import Dialogs
+from modules.find_bar import FindBar
+from modules.global_search import GlobalSearchWindow
+from modules.archive_browser import ArchiveBrowser
 from modules.plugins import Plugins
 from modules.themes import Themes
 import modules.config as config
-from modules.plugin_manager import PluginManager
+from modules.services import Services
+from modules.shell_pool import ShellPool
+from modules.session import Session
+from modules import metrics
+profiler.end("import modules")
 
 class HyxTerminal(Gtk.Window):
-    def __init__(self):
+    dropdown = False
+    # Set by main(), so every window is tracked and counted for quitting alike
+    window_opener = None
+
+    def __init__(self, working_directory=None, session=None):
+        profiler.begin("window init")
         Gtk.Window.__init__(self, title="HyxTerminal")
         
         # Set application icon
-        self.set_application_icon()
+        with profiler.phase("set_application_icon"):
+            self.set_application_icon()
         
         # Enable transparency
         screen = self.get_screen()
@@ -34,257 +98,37 @@ class HyxTerminal(Gtk.Window):
         # Initialize fullscreen state
         self.is_fullscreen = False
         
-        # Load config
-        self.config = config.load_config()
+        # Config, plugin settings and styles are shared by all windows
+        with profiler.phase("services"):
+            self.services = Services.get()
+        self.config = self.services.config
+        self.plugin_manager = self.services.plugin_settings
         self.set_default_size(
             self.config.get('window_width', 800),
             self.config.get('window_height', 600)
         )
-
-        # Initialize plugin manager
-        self.plugin_manager = PluginManager()
         
         # Create main vertical box
         self.vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
         self.add(self.vbox)
 
         # Create menubar with solid background
+        profiler.begin("menubar")
         menubar = Gtk.MenuBar()
-        menubar_style = menubar.get_style_context()
-        menubar_css = Gtk.CssProvider()
-        bg_color = self.config.get('background_color', '#000000')
-        css = f"""
-        menubar {{
-            background-color: {bg_color};
-            color: {self.config.get('foreground_color', '#FFFFFF')};
-        }}
-        """
-        menubar_css.load_from_data(css.encode())
-        menubar_style.add_provider(menubar_css, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
+        menubar.get_style_context().add_provider(
+            self.services.theme_css, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
+        )
         self.vbox.pack_start(menubar, False, False, 0)
 
-        # File menu
-        file_menu = Gtk.MenuItem.new_with_label("File")
-        file_submenu = Gtk.Menu()
-        file_menu.set_submenu(file_submenu)
-
-        # File menu items with accelerators
-        new_tab = Gtk.MenuItem.new_with_label("New Tab" + " " * 13 + "Ctrl+Shift+T")
-        new_tab.connect("activate", lambda w: self.new_tab())
-        file_submenu.append(new_tab)
-
-        preset_menu = Gtk.MenuItem.new_with_label("New Tab with Preset")
-        preset_submenu = Gtk.Menu()
-        preset_menu.set_submenu(preset_submenu)
-        file_submenu.append(preset_menu)
-
-        # Add preset options
-        presets = [
-            ("1 Terminal", "single"),
-            ("2 Horizontal Terminals", "horizontal"),
-            ("2 Vertical Terminals", "vertical"),
-            ("4 Terminals", "quad"),
-            ("Custom...", "custom")
-        ]
-        
-        for label, layout in presets:
-            item = Gtk.MenuItem.new_with_label(label)
-            item.connect("activate", lambda w, l: self.new_tab(l), layout)
-            preset_submenu.append(item)
-
-        new_window = Gtk.MenuItem.new_with_label("New Window")
-        new_window.connect("activate", self.new_window)
-        file_submenu.append(new_window)
-
-        file_submenu.append(Gtk.SeparatorMenuItem())
-
-        close_tab = Gtk.MenuItem.new_with_label("Close Tab" + " " * 11 + "Ctrl+Shift+W")
-        close_tab.connect("activate", self.close_current_tab)
-        file_submenu.append(close_tab)
-
-        file_submenu.append(Gtk.SeparatorMenuItem())
-
-        preferences = Gtk.MenuItem.new_with_label("Preferences...")
-        preferences.connect("activate", self.show_preferences)
-        file_submenu.append(preferences)
-
-        file_submenu.append(Gtk.SeparatorMenuItem())
-
-        quit_item = Gtk.MenuItem.new_with_label("Quit" + " " * 18 + "Ctrl+Q")
-        quit_item.connect("activate", Gtk.main_quit)
-        file_submenu.append(quit_item)
-        menubar.append(file_menu)
-
-        # Edit menu
-        edit_menu = Gtk.MenuItem.new_with_label("Edit")
-        edit_submenu = Gtk.Menu()
-        edit_menu.set_submenu(edit_submenu)
-
-        copy_item = Gtk.MenuItem.new_with_label("Copy Selection" + " " * 6 + "Ctrl+Shift+C")
-        copy_item.connect("activate", self.copy_selection)
-        edit_submenu.append(copy_item)
-
-        paste_item = Gtk.MenuItem.new_with_label("Paste Clipboard" + " " * 5 + "Ctrl+Shift+V")
-        paste_item.connect("activate", self.paste_clipboard)
-        edit_submenu.append(paste_item)
-
-        paste_selection = Gtk.MenuItem.new_with_label("Paste Selection" + " " * 5 + "Shift+Insert")
-        paste_selection.connect("activate", self.paste_selection)
-        edit_submenu.append(paste_selection)
-
-        edit_submenu.append(Gtk.SeparatorMenuItem())
-
-        zoom_in = Gtk.MenuItem.new_with_label("Zoom In" + " " * 15 + "Ctrl++")
-        zoom_in.connect("activate", self.zoom_in)
-        edit_submenu.append(zoom_in)
-
-        zoom_out = Gtk.MenuItem.new_with_label("Zoom Out" + " " * 12 + "Ctrl+-")
-        zoom_out.connect("activate", self.zoom_out)
-        edit_submenu.append(zoom_out)
-
-        zoom_reset = Gtk.MenuItem.new_with_label("Zoom Reset" + " " * 9 + "Ctrl+0")
-        zoom_reset.connect("activate", self.zoom_reset)
-        edit_submenu.append(zoom_reset)
-
-        menubar.append(edit_menu)
-
-        # Actions menu
-        actions_menu = Gtk.MenuItem.new_with_label("Actions")
-        actions_submenu = Gtk.Menu()
-        actions_menu.set_submenu(actions_submenu)
-
-        # Clear Terminal
-        clear_terminal = Gtk.MenuItem.new_with_label("Clear Active Terminal" + " " * 4 + "Ctrl+Shift+X")
-        clear_terminal.connect("activate", self.clear_active_terminal)
-        actions_submenu.append(clear_terminal)
-
-        actions_submenu.append(Gtk.SeparatorMenuItem())
-
-        # Tab navigation
-        next_tab = Gtk.MenuItem.new_with_label("Next Tab" + " " * 16 + "Ctrl+PgUp")
-        next_tab.connect("activate", self.next_tab)
-        actions_submenu.append(next_tab)
-
-        prev_tab = Gtk.MenuItem.new_with_label("Previous Tab" + " " * 12 + "Ctrl+PgDown")
-        prev_tab.connect("activate", self.previous_tab)
-        actions_submenu.append(prev_tab)
-
-        # Go to terminal submenu
-        goto_menu = Gtk.MenuItem.new_with_label("Go to")
-        goto_submenu = Gtk.Menu()
-        goto_menu.set_submenu(goto_submenu)
-        actions_submenu.append(goto_menu)
-
-        actions_submenu.append(Gtk.SeparatorMenuItem())
-
-        # Split options
-        split_h = Gtk.MenuItem.new_with_label("Split Terminal Horizontally")
-        split_h.connect("activate", self.split_horizontal)
-        actions_submenu.append(split_h)
-
-        split_v = Gtk.MenuItem.new_with_label("Split Terminal Vertically")
-        split_v.connect("activate", self.split_vertical)
-        actions_submenu.append(split_v)
-
-        actions_submenu.append(Gtk.SeparatorMenuItem())
-
-        # Find
-        find_item = Gtk.MenuItem.new_with_label("Find..." + " " * 16 + "Ctrl+Shift+F")
-        find_item.connect("activate", self.show_find_dialog)
-        actions_submenu.append(find_item)
-
-        menubar.append(actions_menu)
-
-        # View menu
-        view_menu = Gtk.MenuItem.new_with_label("View")
-        view_submenu = Gtk.Menu()
-        view_menu.set_submenu(view_submenu)
-
-        # Fullscreen toggle
-        fullscreen_item = Gtk.MenuItem.new_with_label("Toggle Fullscreen" + " " * 8 + "F11")
-        fullscreen_item.connect("activate", self.toggle_fullscreen)
-        view_submenu.append(fullscreen_item)
-
-        # Show/hide menubar
-        menubar_item = Gtk.MenuItem.new_with_label("Toggle Menubar" + " " * 9 + "F10")
-        menubar_item.connect("activate", self.toggle_menubar)
-        view_submenu.append(menubar_item)
-
-        view_submenu.append(Gtk.SeparatorMenuItem())
-
-        # Theme submenu
-        theme_item = Gtk.MenuItem.new_with_label("Terminal Theme")
-        theme_submenu = Themes.create_theme_menu(self)
-        theme_item.set_submenu(theme_submenu)
-        
-        view_submenu.append(theme_item)
-        menubar.append(view_menu)
-
-        # Plugins menu
-        plugins_menu = Gtk.MenuItem.new_with_label("Plugins")
-        plugins_submenu = Gtk.Menu()
-        plugins_menu.set_submenu(plugins_submenu)
-
-        # Plugin browser
-        manage_plugins = Gtk.MenuItem.new_with_label("Plugin Browser...")
-        manage_plugins.connect("activate", lambda w: Plugins.show_plugin_browser(self))
-        plugins_submenu.append(manage_plugins)
-
-        plugins_submenu.append(Gtk.SeparatorMenuItem())
-
-        # Sample plugins
-        command_palette = Gtk.MenuItem.new_with_label("Command Palette" + " " * 7 + "Ctrl+Shift+P")
-        command_palette.connect("activate", lambda w: Plugins.show_command_palette(self))
-        plugins_submenu.append(command_palette)
-
-        smart_completion = Gtk.CheckMenuItem.new_with_label("Smart Command Completion")
-        smart_completion.set_active(True)
-        smart_completion.connect("toggled", lambda w: Plugins.toggle_smart_completion(w, self))
-        plugins_submenu.append(smart_completion)
-
-        # More plugin options
-        clipboard_manager = Gtk.MenuItem.new_with_label("Clipboard Manager")
-        clipboard_manager.connect("activate", lambda w: Plugins.show_clipboard_manager(self))
-        plugins_submenu.append(clipboard_manager)
-
-        plugins_submenu.append(Gtk.SeparatorMenuItem())
-
-        # Plugin settings
-        plugin_settings = Gtk.MenuItem.new_with_label("Plugin Settings...")
-        plugin_settings.connect("activate", lambda w: Plugins.show_plugin_browser(self))
-        plugins_submenu.append(plugin_settings)
-
-        menubar.append(plugins_menu)
-
-        # Help menu
-        help_menu = Gtk.MenuItem.new_with_label("Help")
-        help_submenu = Gtk.Menu()
-        help_menu.set_submenu(help_submenu)
-
-        # Help items
-        documentation = Gtk.MenuItem.new_with_label("Documentation" + " " * 10 + "F1")
-        documentation.connect("activate", lambda w: Plugins.show_documentation(self))
-        help_submenu.append(documentation)
-
-        keyboard_shortcuts = Gtk.MenuItem.new_with_label("Keyboard Shortcuts...")
-        keyboard_shortcuts.connect("activate", lambda w: Dialogs.show_keyboard_shortcuts(self))
-        help_submenu.append(keyboard_shortcuts)
-
-        help_submenu.append(Gtk.SeparatorMenuItem())
-
-        # Check for updates
-        check_updates = Gtk.MenuItem.new_with_label("Check for Updates...")
-        check_updates.connect("activate", lambda w: Dialogs.check_for_updates(self))
-        help_submenu.append(check_updates)
-
-        help_submenu.append(Gtk.SeparatorMenuItem())
-
-        # About dialog
-        about_item = Gtk.MenuItem.new_with_label("About HyxTerminal")
-        about_item.connect("activate", lambda w: Dialogs.show_about_dialog(self))
-        help_submenu.append(about_item)
-
-        menubar.append(help_menu)
+        # Submenus are built the first time they are opened
+        self.menubar = menubar
+        self.add_lazy_menu("File", self.build_file_menu)
+        self.add_lazy_menu("Edit", self.build_edit_menu)
+        self.add_lazy_menu("Actions", self.build_actions_menu)
+        self.add_lazy_menu("View", self.build_view_menu)
+        self.add_lazy_menu("Plugins", self.build_plugins_menu)
+        self.add_lazy_menu("Help", self.build_help_menu)
+        profiler.end("menubar")
 
         # Create notebook for tabs
         self.notebook = Gtk.Notebook()
@@ -293,31 +137,27 @@ class HyxTerminal(Gtk.Window):
         self.notebook.connect("page-removed", self.on_tab_removed)
         
         # Style the notebook
-        notebook_css = Gtk.CssProvider()
-        notebook_css.load_from_data(f"""
-        notebook {{
-            background-color: {bg_color};
-        }}
-        notebook tab {{
-            background-color: {bg_color};
-            color: {self.config.get('foreground_color', '#FFFFFF')};
-            padding: 4px;
-        }}
-        notebook tab:checked {{
-            background-color: shade({bg_color}, 1.2);
-        }}
-        """.encode())
         self.notebook.get_style_context().add_provider(
-            notebook_css, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
+            self.services.theme_css, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
         )
         
         self.vbox.pack_start(self.notebook, True, True, 0)
         
+        # Inline search, hidden until opened
+        self.find_bar = FindBar(self)
+        self.vbox.pack_start(self.find_bar, False, False, 0)
+        
         # Create first tab
-        self.new_tab()
+        with profiler.phase("first tab"):
+            if session:
+                self.restore_session(session)
+            else:
+                self.new_tab(working_directory=working_directory)
         
         # Key bindings
         self.connect("key-press-event", self.on_key_press)
+        self.services.register_window(self)
+        profiler.end("window init")
 
     def get_current_terminal(self):
         """Get the terminal from the current tab"""
@@ -331,54 +171,58 @@ class HyxTerminal(Gtk.Window):
     def show_preferences(self, widget):
         """Show preferences dialog using the Dialogs module"""
         def update_terminals(bg_color, fg_color, opacity, font_scale, scrollback_lines, cursor_shape):
-            for i in range(self.notebook.get_n_pages()):
-                tab = self.notebook.get_nth_page(i)
-                tab.update_colors(bg_color, fg_color, opacity)
-                for terminal in tab.terminals:
-                    terminal.set_font_scale(font_scale)
-                    terminal.set_scrollback_lines(scrollback_lines)
-                    tab.update_cursor(cursor_shape)
+            # The config is shared, so apply it to every window
+            scrollback_lines = self.services.get_scrollback_lines()
+            for window in self.services.windows:
+                for i in range(window.notebook.get_n_pages()):
+                    tab = window.notebook.get_nth_page(i)
+                    tab.update_colors(bg_color, fg_color, opacity)
+                    for terminal in tab.terminals:
+                        terminal.set_font_scale(font_scale)
+                        terminal.set_scrollback_lines(scrollback_lines)
+                        tab.update_cursor(cursor_shape)
+            self.services.scrollback_budget.reapply()
             
             # Update window size
             self.resize(self.config['window_width'], self.config['window_height'])
             
-            # Update menubar style when colors change
-            menubar = self.vbox.get_children()[0]
-            menubar_style = menubar.get_style_context()
-            menubar_css = Gtk.CssProvider()
-            css = f"""
-            menubar {{
-                background-color: {bg_color};
-                color: {fg_color};
-            }}
-            """
-            menubar_css.load_from_data(css.encode())
-            menubar_style.add_provider(menubar_css, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
+            # Update menubar and notebook style of every window
+            self.services.update_theme_css()
 
         Dialogs.show_preferences(self, self.config, update_terminals)
 
     def new_window(self, widget):
         """Create and show a new terminal window"""
-        window = HyxTerminal()
-        window.show_all()
+        HyxTerminal.window_opener()
 
-    def new_tab(self, layout="single"):
+    def new_tab(self, layout="single", working_directory=None, title=None, layout_tree=None):
         """Add a new terminal tab with specified layout"""
-        tab = TerminalTab(self, layout)
-        label = TabLabel(f"Terminal {self.notebook.get_n_pages() + 1}", tab, self.notebook)
+        tab = TerminalTab(self, layout, working_directory, requested_at=metrics.now(),
+                          layout_tree=layout_tree)
+        title = title or f"Terminal {self.notebook.get_n_pages() + 1}"
+        label = TabLabel(title, tab, self.notebook)
         page_num = self.notebook.append_page(tab, label)
         self.notebook.set_tab_reorderable(tab, True)
         tab.show_all()
         # Switch to the new tab explicitly
         self.notebook.set_current_page(page_num)
-        # Update the Go to menu
-        self.update_goto_menu()
+
+    def restore_session(self, session):
+        """Recreate the tabs and splits of a saved window"""
+        self.resize(session.get('width', self.config.get('window_width', 800)),
+                    session.get('height', self.config.get('window_height', 600)))
+        for tab in session.get('tabs', []):
+            self.new_tab("session", title=tab.get('title'), layout_tree=tab.get('layout'))
+        if self.notebook.get_n_pages() == 0:
+            self.new_tab()
+        self.notebook.set_current_page(min(session.get('current_tab', 0), self.notebook.get_n_pages() - 1))
 
     def close_current_tab(self, widget):
         """Close the current tab"""
         current_page = self.notebook.get_current_page()
         if current_page != -1:
-            self.notebook.remove_page(current_page)
+            # Destroying the tab releases its panes, removing it would only unparent them
+            self.notebook.get_nth_page(current_page).destroy()
 
     def on_tab_added(self, notebook, child, page_num):
         """Show tabs bar when there's more than one tab"""
@@ -441,11 +285,16 @@ class HyxTerminal(Gtk.Window):
                 self.clear_active_terminal(None)
                 return True
             elif event.keyval == Gdk.KEY_F:
-                self.show_find_dialog(None)
+                self.show_find_bar(None)
+                return True
+            elif event.keyval == Gdk.KEY_G:
+                GlobalSearchWindow.show_for(self)
                 return True
             elif event.keyval == Gdk.KEY_P:
                 Plugins.show_command_palette(self)
                 return True
+            elif event.keyval in (Gdk.KEY_Up, Gdk.KEY_Down):
+                return self.jump_to_prompt(-1 if event.keyval == Gdk.KEY_Up else 1)
 
         # Handle Ctrl+PgUp/PgDown
         if modifiers == Gdk.ModifierType.CONTROL_MASK:
@@ -502,6 +351,14 @@ class HyxTerminal(Gtk.Window):
             # Send the clear command instead of reset
             terminal.feed_child("clear\n".encode())
 
+    def jump_to_prompt(self, direction):
+        """Scroll the focused pane to its previous or next command prompt"""
+        terminal = self.get_focus()
+        tab = self.notebook.get_nth_page(self.notebook.get_current_page())
+        if isinstance(terminal, Vte.Terminal) and isinstance(tab, TerminalTab):
+            return tab.scroll_to_prompt(terminal, direction)
+        return False
+
     def next_tab(self, widget):
         current = self.notebook.get_current_page()
         if current < self.notebook.get_n_pages() - 1:
@@ -521,101 +378,263 @@ class HyxTerminal(Gtk.Window):
         if current_page != -1:
             tab = self.notebook.get_nth_page(current_page)
             tab.create_horizontal_split()
+            Session.schedule_save()
 
     def split_vertical(self, widget):
         current_page = self.notebook.get_current_page()
         if current_page != -1:
             tab = self.notebook.get_nth_page(current_page)
             tab.create_vertical_split()
+            Session.schedule_save()
+
+    def add_lazy_menu(self, label, builder, menu_shell=None, cache=True):
+        """Add a menu item whose submenu is filled by builder on first open"""
+        menu_item = Gtk.MenuItem.new_with_label(label)
+        submenu = Gtk.Menu()
+        menu_item.set_submenu(submenu)
+        submenu.built = False
+
+        def ensure_built(widget):
+            if submenu.built and cache:
+                return
+            submenu.foreach(lambda w: submenu.remove(w))
+            builder(submenu)
+            submenu.show_all()
+            submenu.built = True
+
+        menu_item.connect("select", ensure_built)
+        menu_item.connect("activate", ensure_built)
+        (menu_shell or self.menubar).append(menu_item)
+        return menu_item
+
+    def build_file_menu(self, file_submenu):
+        """Fill the File menu"""
+        # File menu items with accelerators
+        new_tab = Gtk.MenuItem.new_with_label("New Tab" + " " * 13 + "Ctrl+Shift+T")
+        new_tab.connect("activate", lambda w: self.new_tab())
+        file_submenu.append(new_tab)
 
-    def update_goto_menu(self):
-        """Update the Go to submenu with current terminal tabs"""
-        goto_menu = None
-        actions_menu = None
-        
-        # Find the Actions menu and its Go to submenu
-        menubar = self.vbox.get_children()[0]
-        for menu_item in menubar.get_children():
-            if menu_item.get_label() == "Actions":
-                actions_menu = menu_item.get_submenu()
-                break
-        
-        if actions_menu:
-            for menu_item in actions_menu.get_children():
-                if menu_item.get_label() == "Go to":
-                    goto_menu = menu_item.get_submenu()
-                    break
-
-        if goto_menu:
-            # Clear existing items
-            goto_menu.foreach(lambda w: goto_menu.remove(w))
-            
-            # Add menu item for each tab
-            for i in range(self.notebook.get_n_pages()):
-                tab = self.notebook.get_nth_page(i)
-                label = self.notebook.get_tab_label(tab).label.get_text()
-                item = Gtk.MenuItem.new_with_label(f"{label}")
-                item.connect("activate", lambda w, num: self.notebook.set_current_page(num), i)
-                goto_menu.append(item)
-            goto_menu.show_all()
-
-    def show_find_dialog(self, widget):
-        """Show find dialog using Dialogs module"""
-        def do_find(text, case_sensitive, use_regex, backward, clear=False):
-            terminal = self.get_current_terminal()
-            if not terminal:
-                return False
-            
-            if clear:
-                # Clear search highlighting
-                terminal.search_set_regex(None, 0)
-                return True
-            
-            if not text:
-                return False
-            
-            try:
-                # Clear previous search
-                terminal.search_set_regex(None, 0)
-                
-                # Prepare pattern
-                pattern = text if use_regex else re.escape(text)
-                
-                try:
-                    # Set up regex flags for VTE
-                    # MULTILINE (8) is required by VTE for proper terminal search
-                    # PCRE2_MULTILINE (1) is for regex multiline mode
-                    flags = 8 | 1  # VTE multiline flag | PCRE2_MULTILINE
-                    
-                    if not case_sensitive:
-                        flags |= 2  # PCRE2_CASELESS
-                    
-                    # Create regex for searching
-                    regex = Vte.Regex.new_for_search(pattern, -1, flags)
-                    
-                    # Enable wrap-around search by default
-                    terminal.search_set_wrap_around(True)
-                    
-                    # Set up search pattern with proper flags
-                    terminal.search_set_regex(regex, flags)
-                    
-                    # Perform search
-                    if backward:
-                        found = terminal.search_find_previous()
-                    else:
-                        found = terminal.search_find_next()
-                    
-                    return found
-                    
-                except GLib.Error as e:
-                    print(f"Invalid regex pattern: {e}")
-                    return False
-                
-            except Exception as e:
-                print(f"Search error: {e}")
-                return False
+        preset_menu = Gtk.MenuItem.new_with_label("New Tab with Preset")
+        preset_submenu = Gtk.Menu()
+        preset_menu.set_submenu(preset_submenu)
+        file_submenu.append(preset_menu)
+
+        # Add preset options
+        presets = [
+            ("1 Terminal", "single"),
+            ("2 Horizontal Terminals", "horizontal"),
+            ("2 Vertical Terminals", "vertical"),
+            ("4 Terminals", "quad"),
+            ("Custom...", "custom")
+        ]
         
-        Dialogs.show_find_dialog(self, do_find)
+        for label, layout in presets:
+            item = Gtk.MenuItem.new_with_label(label)
+            item.connect("activate", lambda w, l: self.new_tab(l), layout)
+            preset_submenu.append(item)
+
+        new_window = Gtk.MenuItem.new_with_label("New Window")
+        new_window.connect("activate", self.new_window)
+        file_submenu.append(new_window)
+
+        file_submenu.append(Gtk.SeparatorMenuItem())
+
+        close_tab = Gtk.MenuItem.new_with_label("Close Tab" + " " * 11 + "Ctrl+Shift+W")
+        close_tab.connect("activate", self.close_current_tab)
+        file_submenu.append(close_tab)
+
+        file_submenu.append(Gtk.SeparatorMenuItem())
+
+        preferences = Gtk.MenuItem.new_with_label("Preferences...")
+        preferences.connect("activate", self.show_preferences)
+        file_submenu.append(preferences)
+
+        file_submenu.append(Gtk.SeparatorMenuItem())
+
+        quit_item = Gtk.MenuItem.new_with_label("Quit" + " " * 18 + "Ctrl+Q")
+        quit_item.connect("activate", Gtk.main_quit)
+        file_submenu.append(quit_item)
+
+    def build_edit_menu(self, edit_submenu):
+        """Fill the Edit menu"""
+        copy_item = Gtk.MenuItem.new_with_label("Copy Selection" + " " * 6 + "Ctrl+Shift+C")
+        copy_item.connect("activate", self.copy_selection)
+        edit_submenu.append(copy_item)
+
+        paste_item = Gtk.MenuItem.new_with_label("Paste Clipboard" + " " * 5 + "Ctrl+Shift+V")
+        paste_item.connect("activate", self.paste_clipboard)
+        edit_submenu.append(paste_item)
+
+        paste_selection = Gtk.MenuItem.new_with_label("Paste Selection" + " " * 5 + "Shift+Insert")
+        paste_selection.connect("activate", self.paste_selection)
+        edit_submenu.append(paste_selection)
+
+        edit_submenu.append(Gtk.SeparatorMenuItem())
+
+        zoom_in = Gtk.MenuItem.new_with_label("Zoom In" + " " * 15 + "Ctrl++")
+        zoom_in.connect("activate", self.zoom_in)
+        edit_submenu.append(zoom_in)
+
+        zoom_out = Gtk.MenuItem.new_with_label("Zoom Out" + " " * 12 + "Ctrl+-")
+        zoom_out.connect("activate", self.zoom_out)
+        edit_submenu.append(zoom_out)
+
+        zoom_reset = Gtk.MenuItem.new_with_label("Zoom Reset" + " " * 9 + "Ctrl+0")
+        zoom_reset.connect("activate", self.zoom_reset)
+        edit_submenu.append(zoom_reset)
+
+    def build_actions_menu(self, actions_submenu):
+        """Fill the Actions menu"""
+        # Clear Terminal
+        clear_terminal = Gtk.MenuItem.new_with_label("Clear Active Terminal" + " " * 4 + "Ctrl+Shift+X")
+        clear_terminal.connect("activate", self.clear_active_terminal)
+        actions_submenu.append(clear_terminal)
+
+        actions_submenu.append(Gtk.SeparatorMenuItem())
+
+        # Tab navigation
+        next_tab = Gtk.MenuItem.new_with_label("Next Tab" + " " * 16 + "Ctrl+PgUp")
+        next_tab.connect("activate", self.next_tab)
+        actions_submenu.append(next_tab)
+
+        prev_tab = Gtk.MenuItem.new_with_label("Previous Tab" + " " * 12 + "Ctrl+PgDown")
+        prev_tab.connect("activate", self.previous_tab)
+        actions_submenu.append(prev_tab)
+
+        # Go to terminal submenu, rebuilt every time it is opened
+        self.add_lazy_menu("Go to", self.build_goto_menu, actions_submenu, cache=False)
+
+        actions_submenu.append(Gtk.SeparatorMenuItem())
+
+        # Split options
+        split_h = Gtk.MenuItem.new_with_label("Split Terminal Horizontally")
+        split_h.connect("activate", self.split_horizontal)
+        actions_submenu.append(split_h)
+
+        split_v = Gtk.MenuItem.new_with_label("Split Terminal Vertically")
+        split_v.connect("activate", self.split_vertical)
+        actions_submenu.append(split_v)
+
+        actions_submenu.append(Gtk.SeparatorMenuItem())
+
+        # Find
+        find_item = Gtk.MenuItem.new_with_label("Find..." + " " * 16 + "Ctrl+Shift+F")
+        find_item.connect("activate", self.show_find_bar)
+        actions_submenu.append(find_item)
+
+        search_all_item = Gtk.MenuItem.new_with_label("Search All Panes..." + " " * 4 + "Ctrl+Shift+G")
+        search_all_item.connect("activate", lambda w: GlobalSearchWindow.show_for(self))
+        actions_submenu.append(search_all_item)
+
+        archive_item = Gtk.MenuItem.new_with_label("Browse Scrollback Archive...")
+        archive_item.set_sensitive(self.services.scrollback_archive.enabled)
+        archive_item.connect("activate", self.browse_archive)
+        actions_submenu.append(archive_item)
+
+    def build_view_menu(self, view_submenu):
+        """Fill the View menu"""
+        # Fullscreen toggle
+        fullscreen_item = Gtk.MenuItem.new_with_label("Toggle Fullscreen" + " " * 8 + "F11")
+        fullscreen_item.connect("activate", self.toggle_fullscreen)
+        view_submenu.append(fullscreen_item)
+
+        # Show/hide menubar
+        menubar_item = Gtk.MenuItem.new_with_label("Toggle Menubar" + " " * 9 + "F10")
+        menubar_item.connect("activate", self.toggle_menubar)
+        view_submenu.append(menubar_item)
+
+        scrollback_usage = Gtk.MenuItem.new_with_label("Scrollback Usage...")
+        scrollback_usage.connect("activate", lambda w: Dialogs.show_scrollback_usage(self, self.services))
+        view_submenu.append(scrollback_usage)
+
+        view_submenu.append(Gtk.SeparatorMenuItem())
+
+        # Theme submenu
+        theme_item = Gtk.MenuItem.new_with_label("Terminal Theme")
+        theme_submenu = Themes.create_theme_menu(self)
+        theme_item.set_submenu(theme_submenu)
+        view_submenu.append(theme_item)
+
+    def build_plugins_menu(self, plugins_submenu):
+        """Fill the Plugins menu"""
+        # Plugin browser
+        manage_plugins = Gtk.MenuItem.new_with_label("Plugin Browser...")
+        manage_plugins.connect("activate", lambda w: Plugins.show_plugin_browser(self))
+        plugins_submenu.append(manage_plugins)
+
+        plugins_submenu.append(Gtk.SeparatorMenuItem())
+
+        # Sample plugins
+        command_palette = Gtk.MenuItem.new_with_label("Command Palette" + " " * 7 + "Ctrl+Shift+P")
+        command_palette.connect("activate", lambda w: Plugins.show_command_palette(self))
+        plugins_submenu.append(command_palette)
+
+        smart_completion = Gtk.CheckMenuItem.new_with_label("Smart Command Completion")
+        smart_completion.set_active(True)
+        smart_completion.connect("toggled", lambda w: Plugins.toggle_smart_completion(w, self))
+        plugins_submenu.append(smart_completion)
+
+        # More plugin options
+        clipboard_manager = Gtk.MenuItem.new_with_label("Clipboard Manager")
+        clipboard_manager.connect("activate", lambda w: Plugins.show_clipboard_manager(self))
+        plugins_submenu.append(clipboard_manager)
+
+        plugins_submenu.append(Gtk.SeparatorMenuItem())
+
+        # Plugin settings
+        plugin_settings = Gtk.MenuItem.new_with_label("Plugin Settings...")
+        plugin_settings.connect("activate", lambda w: Plugins.show_plugin_browser(self))
+        plugins_submenu.append(plugin_settings)
+
+    def build_help_menu(self, help_submenu):
+        """Fill the Help menu"""
+        # Help items
+        documentation = Gtk.MenuItem.new_with_label("Documentation" + " " * 10 + "F1")
+        documentation.connect("activate", lambda w: Plugins.show_documentation(self))
+        help_submenu.append(documentation)
+
+        keyboard_shortcuts = Gtk.MenuItem.new_with_label("Keyboard Shortcuts...")
+        keyboard_shortcuts.connect("activate", lambda w: Dialogs.show_keyboard_shortcuts(self))
+        help_submenu.append(keyboard_shortcuts)
+
+        help_submenu.append(Gtk.SeparatorMenuItem())
+
+        # Check for updates
+        check_updates = Gtk.MenuItem.new_with_label("Check for Updates...")
+        check_updates.connect("activate", lambda w: Dialogs.check_for_updates(self))
+        help_submenu.append(check_updates)
+
+        help_submenu.append(Gtk.SeparatorMenuItem())
+
+        # About dialog
+        about_item = Gtk.MenuItem.new_with_label("About HyxTerminal")
+        about_item.connect("activate", lambda w: Dialogs.show_about_dialog(self))
+        help_submenu.append(about_item)
+
+    def build_goto_menu(self, goto_menu):
+        """Fill the Go to submenu with current terminal tabs"""
+        for i in range(self.notebook.get_n_pages()):
+            tab = self.notebook.get_nth_page(i)
+            label = self.notebook.get_tab_label(tab).label.get_text()
+            item = Gtk.MenuItem.new_with_label(f"{label}")
+            item.connect("activate", lambda w, num: self.notebook.set_current_page(num), i)
+            goto_menu.append(item)
+
+    def show_find_bar(self, widget):
+        """Open the inline find bar for the focused terminal"""
+        terminal = self.get_focus()
+        if not isinstance(terminal, Vte.Terminal):
+            terminal = self.find_bar.terminal or self.get_current_terminal()
+        if terminal:
+            self.find_bar.open(terminal)
+
+    def browse_archive(self, widget):
+        """Open the scrollback archive at the focused pane"""
+        terminal = self.get_focus()
+        tab = self.notebook.get_nth_page(self.notebook.get_current_page())
+        pane = tab.pane_archives.get(terminal) if isinstance(tab, TerminalTab) else None
+        ArchiveBrowser.show_for(self, self.services.scrollback_archive, self.services.search_index,
+                                pane.directory if pane else None)
 
     def toggle_fullscreen(self, widget):
         """Toggle fullscreen mode"""
@@ -657,11 +676,153 @@ class HyxTerminal(Gtk.Window):
             # Fall back to a standard icon
             self.set_icon_name("utilities-terminal")
 
-if __name__ == "__main__":
-    win = HyxTerminal()
-    win.connect("delete-event", Gtk.main_quit)
-    win.show_all()
+class DropdownTerminal(HyxTerminal):
+    """Quake-style window built once at startup and then only shown or hidden"""
+    dropdown = True
+
+    def __init__(self):
+        HyxTerminal.__init__(self)
+        self.set_decorated(False)
+        self.set_skip_taskbar_hint(True)
+        self.set_skip_pager_hint(True)
+        self.set_keep_above(True)
+        self.connect("delete-event", self.on_delete)
+
+        # Realize everything now so showing the window is only a map
+        self.vbox.show_all()
+        self.realize()
+
+    def place(self):
+        """Stretch the window across the top of the primary monitor"""
+        display = self.get_display()
+        monitor = display.get_primary_monitor() or display.get_monitor(0)
+        geometry = monitor.get_geometry()
+        height = int(geometry.height * self.config.get('dropdown_height', 0.4))
+        self.move(geometry.x, geometry.y)
+        self.resize(geometry.width, height)
+
+    def toggle(self):
+        """Show the window, or hide it if it is already focused"""
+        if self.get_visible() and self.is_active():
+            self.hide()
+            return
+        self.place()
+        self.present()
+        terminal = self.get_current_terminal()
+        if terminal:
+            terminal.grab_focus()
+
+    def on_delete(self, widget, event):
+        self.hide()
+        return True
+
+def bind_global_shortcut(accelerator, callback):
+    """Bind a desktop-wide shortcut if the optional Keybinder library is present"""
+    try:
+        gi.require_version('Keybinder', '3.0')
+        from gi.repository import Keybinder
+    except (ValueError, ImportError):
+        print("Keybinder is not installed, bind 'hyxterminal.py --toggle-dropdown' "
+              "to a shortcut in your desktop settings instead")
+        return False
+    Keybinder.init()
+    return Keybinder.bind(accelerator, lambda keystring: callback())
+
+def resolve_working_directory(args, cwd):
+    """Resolve the requested working directory against the caller's cwd"""
+    if not args.working_directory:
+        return None
+    return os.path.normpath(os.path.join(cwd, os.path.expanduser(args.working_directory)))
+
+def main(args):
+    windows = []
+    dropdown = None
+    daemon = args.dropdown or args.toggle_dropdown
+
+    def on_window_destroy(window):
+        if window in windows:
+            windows.remove(window)
+        if not windows and not daemon:
+            Gtk.main_quit()
+
+    def on_dropdown_destroy(window):
+        nonlocal dropdown
+        dropdown = None
+
+    def create_dropdown():
+        nonlocal dropdown
+        if dropdown is None:
+            dropdown = DropdownTerminal()
+            dropdown.connect("destroy", on_dropdown_destroy)
+        return dropdown
+
+    def toggle_dropdown():
+        create_dropdown().toggle()
+
+    def open_window(working_directory=None, session=None):
+        window = HyxTerminal(working_directory, session)
+        windows.append(window)
+        Session.track(window)
+        window.connect("destroy", on_window_destroy)
+        if profiler.is_enabled():
+            window.connect("map-event", lambda w, e: profiler.mark("window mapped"))
+        with profiler.phase("show_all"):
+            window.show_all()
+        return window
+
+    HyxTerminal.window_opener = open_window
+
+    def on_request(request):
+        request_args = parse_args(request.get('argv', []))
+        working_directory = resolve_working_directory(request_args, request.get('cwd', os.getcwd()))
+        if request.get('action') == 'toggle-dropdown':
+            toggle_dropdown()
+        elif request.get('action') == 'tab' and windows:
+            window = windows[-1]
+            window.new_tab(working_directory=working_directory)
+            window.present()
+        else:
+            open_window(working_directory)
+
+    server = None
+    if args.server or daemon:
+        server = instance.InstanceServer(on_request)
+        if not server.start():
+            print("Another HyxTerminal server is already running")
+            server = None
+
+    settings = config.load_config()
+    if daemon:
+        # Start the dropdown's shell now and keep the window hidden
+        create_dropdown()
+        bind_global_shortcut(settings.get('dropdown_shortcut', 'F12'), toggle_dropdown)
+        if args.toggle_dropdown:
+            toggle_dropdown()
+    else:
+        saved = None
+        if not args.no_restore and not args.working_directory and settings.get('restore_session', True):
+            saved = Session.load()
+
+        with profiler.phase("first window"):
+            if saved:
+                for window_session in saved['windows']:
+                    open_window(session=window_session)
+            else:
+                open_window(resolve_working_directory(args, os.getcwd()))
     try:
         Gtk.main()
     except KeyboardInterrupt:
-        win.destroy()
+        Session.close()
+        for window in list(windows):
+            window.destroy()
+    finally:
+        Session.close()
+        if server:
+            server.stop()
+        ShellPool.shutdown_shared()
+        Services.shutdown_shared()
+        if args.metrics:
+            metrics.report()
+
+if __name__ == "__main__":
+    main(ARGS)
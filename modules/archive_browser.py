@@ -0,0 +1,224 @@
+import os
+import threading
+import time
+from collections import deque
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import Gtk, GLib
+from modules.scrollback_archive import list_segments, read_segment, read_pane_meta
+
+MAX_BROWSE_LINES = 200000    # newest archived lines shown for a pane
+MAX_SEARCH_RESULTS = 500     # lines listed for an archive search
+
+def describe_session(name, current):
+    """Readable title of a session directory named <date>-<time>-<pid>"""
+    try:
+        started = time.strptime(name[:15], '%Y%m%d-%H%M%S')
+        title = time.strftime('%Y-%m-%d %H:%M:%S', started)
+    except ValueError:
+        title = name
+    return f"{title} (this session)" if name == current else title
+
+class ArchiveBrowser(Gtk.Window):
+    """Archived scrollback of past and present panes"""
+    instance = None
+
+    @classmethod
+    def show_for(cls, parent_window, archive, index=None, pane_dir=None):
+        """Open the browser, showing pane_dir if given"""
+        if cls.instance is None:
+            cls.instance = cls(archive, index)
+        browser = cls.instance
+        browser.set_transient_for(parent_window)
+        browser.fill_sessions(pane_dir)
+        browser.show_all()
+        browser.present()
+        return browser
+
+    def __init__(self, archive, index=None):
+        Gtk.Window.__init__(self, title="Scrollback Archive")
+        self.set_default_size(900, 600)
+        self.archive = archive
+        self.index = index
+        self.generation = 0
+        self.search_generation = 0
+        self.pending_line = None
+        self.connect("destroy", self.on_destroy)
+
+        outer_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        self.add(outer_box)
+
+        self.search_entry = Gtk.SearchEntry()
+        self.search_entry.set_placeholder_text("Search all archived scrollback")
+        self.search_entry.set_sensitive(index is not None)
+        self.search_entry.set_margin_start(6)
+        self.search_entry.set_margin_end(6)
+        self.search_entry.connect("activate", self.on_search_activate)
+        self.search_entry.connect("stop-search", lambda entry: self.show_results(False))
+        outer_box.pack_start(self.search_entry, False, False, 6)
+
+        paned = Gtk.Paned(orientation=Gtk.Orientation.HORIZONTAL)
+        outer_box.pack_start(paned, True, True, 0)
+
+        self.store = Gtk.TreeStore(str, str)  # title, pane directory
+        self.view = Gtk.TreeView(model=self.store)
+        self.view.set_headers_visible(False)
+        self.view.append_column(Gtk.TreeViewColumn("Pane", Gtk.CellRendererText(), text=0))
+        self.view.get_selection().connect("changed", self.on_selection_changed)
+        tree_window = Gtk.ScrolledWindow()
+        tree_window.set_size_request(260, -1)
+        tree_window.add(self.view)
+        paned.pack1(tree_window, False, False)
+
+        vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        paned.pack2(vbox, True, False)
+
+        # The selected pane's text, or the results of a search
+        self.stack = Gtk.Stack()
+        vbox.pack_start(self.stack, True, True, 0)
+
+        self.text_view = Gtk.TextView()
+        self.text_view.set_editable(False)
+        self.text_view.set_monospace(True)
+        text_window = Gtk.ScrolledWindow()
+        text_window.add(self.text_view)
+        self.stack.add_named(text_window, "pane")
+
+        self.results_store = Gtk.ListStore(str, str, str, str)  # time, pane title, line, pane directory
+        results_view = Gtk.TreeView(model=self.results_store)
+        for title, column_index in (("Time", 0), ("Pane", 1), ("Line", 2)):
+            renderer = Gtk.CellRendererText()
+            if column_index == 2:
+                renderer.set_property("family", "Monospace")
+            results_view.append_column(Gtk.TreeViewColumn(title, renderer, text=column_index))
+        results_view.connect("row-activated", self.on_result_activated)
+        results_window = Gtk.ScrolledWindow()
+        results_window.add(results_view)
+        self.stack.add_named(results_window, "results")
+
+        self.status_label = Gtk.Label(xalign=0)
+        self.status_label.set_margin_start(6)
+        vbox.pack_start(self.status_label, False, False, 3)
+
+    def on_destroy(self, widget):
+        self.generation += 1
+        self.search_generation += 1
+        ArchiveBrowser.instance = None
+
+    def fill_sessions(self, select_dir=None):
+        """List every archived session and its panes, newest first"""
+        self.store.clear()
+        select_iter = None
+        for session_dir in self.archive.list_sessions():
+            name = os.path.basename(session_dir)
+            session_iter = self.store.append(None, [describe_session(name, self.archive.session), ""])
+            try:
+                panes = sorted(entry.path for entry in os.scandir(session_dir) if entry.is_dir())
+            except OSError:
+                continue
+            for pane_dir in panes:
+                segments = list_segments(pane_dir)
+                size = sum(os.path.getsize(path) for path in segments if os.path.exists(path))
+                cwd = read_pane_meta(pane_dir).get('cwd') or ""
+                cwd = cwd.replace(os.path.expanduser("~"), "~", 1)
+                title = f"{os.path.basename(pane_dir)} {cwd} ({size // 1024} KB)"
+                pane_iter = self.store.append(session_iter, [title, pane_dir])
+                if pane_dir == select_dir:
+                    select_iter = pane_iter
+        if select_iter is not None:
+            path = self.store.get_path(select_iter)
+            self.view.expand_to_path(path)
+            self.view.get_selection().select_iter(select_iter)
+            self.view.scroll_to_cell(path, None, False, 0, 0)
+
+    def on_selection_changed(self, selection):
+        model, tree_iter = selection.get_selected()
+        if tree_iter is None or not model[tree_iter][1]:
+            return
+        self.generation += 1
+        self.show_results(False)
+        self.status_label.set_text("Loading…")
+        threading.Thread(target=self.load_pane, args=(model[tree_iter][1], self.generation),
+                         daemon=True).start()
+
+    def load_pane(self, pane_dir, generation):
+        """Read a pane's segments on a worker thread, keeping only the newest lines"""
+        lines = deque(maxlen=MAX_BROWSE_LINES)
+        first_stamp = last_stamp = 0
+        total = 0
+        for path in list_segments(pane_dir):
+            if generation != self.generation:
+                return
+            for stamp, line in read_segment(path):
+                lines.append(line)
+                total += 1
+                first_stamp = first_stamp or stamp
+                last_stamp = stamp or last_stamp
+        GLib.idle_add(self.show_pane, generation, '\n'.join(lines), total, first_stamp, last_stamp)
+
+    def show_pane(self, generation, text, total, first_stamp, last_stamp):
+        if generation != self.generation:
+            return False
+        buffer = self.text_view.get_buffer()
+        buffer.set_text(text)
+        buffer.place_cursor(buffer.get_end_iter())
+        if self.pending_line:
+            # Opened from a search result: select the newest copy of the line
+            found = buffer.get_end_iter().backward_search(self.pending_line, 0, None)
+            if found:
+                buffer.select_range(found[0], found[1])
+            self.pending_line = None
+        self.text_view.scroll_to_mark(buffer.get_insert(), 0, False, 0, 0.5)
+        if not total:
+            self.status_label.set_text("Nothing archived yet")
+            return False
+        span = f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(first_stamp))} to " \
+               f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(last_stamp))}"
+        if total > MAX_BROWSE_LINES:
+            self.status_label.set_text(f"{total} lines, {span}, showing the last {MAX_BROWSE_LINES}")
+        else:
+            self.status_label.set_text(f"{total} lines, {span}")
+        return False
+
+    def show_results(self, visible):
+        self.stack.set_visible_child_name("results" if visible else "pane")
+
+    def on_search_activate(self, entry):
+        """Query the index on a worker thread, the archive may be large"""
+        pattern = entry.get_text()
+        if not pattern:
+            self.show_results(False)
+            return
+        self.search_generation += 1
+        self.status_label.set_text("Searching…")
+        threading.Thread(target=self.run_search, args=(pattern, self.search_generation), daemon=True).start()
+
+    def run_search(self, pattern, generation):
+        started = time.perf_counter()
+        try:
+            results = self.index.search_open_segments(pattern, MAX_SEARCH_RESULTS)
+            results += self.index.search(pattern, MAX_SEARCH_RESULTS)
+        except Exception as e:
+            print(f"Failed to search the scrollback archive: {e}")
+            results = []
+        results.sort(key=lambda result: result[2], reverse=True)
+        elapsed = (time.perf_counter() - started) * 1000
+        GLib.idle_add(self.show_search, generation, results[:MAX_SEARCH_RESULTS], elapsed)
+
+    def show_search(self, generation, results, elapsed):
+        if generation != self.search_generation:
+            return False
+        self.results_store.clear()
+        for session, pane, stamp, line in results:
+            self.results_store.append([time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stamp)),
+                                       pane, line, os.path.join(str(self.archive.root), session, pane)])
+        self.show_results(True)
+        self.status_label.set_text(f"{len(results)} lines in {elapsed:.0f} ms")
+        return False
+
+    def on_result_activated(self, view, path, column):
+        """Open the pane of a result at the matching line"""
+        stamp, pane, line, pane_dir = self.results_store[path]
+        self.pending_line = line
+        # Listing the panes again selects this one, which loads it
+        self.fill_sessions(pane_dir)
@@ -0,0 +1,149 @@
+import heapq
+import os
+import subprocess
+import threading
+from bisect import bisect_left
+
+RESCAN_DELAY = 500    # ms to coalesce bursts of changes in a PATH directory
+
+class CommandIndex:
+    """Sorted in-memory index of command names on $PATH, kept current with file monitors"""
+    def __init__(self, path=None):
+        self.path_dirs = []
+        for directory in (path if path is not None else os.environ.get('PATH', '')).split(os.pathsep):
+            if directory and directory not in self.path_dirs:
+                self.path_dirs.append(directory)
+        self.directory_commands = {}
+        self.builtins = set()
+        self.names = []
+        self.ready = False
+        self.lock = threading.Lock()
+        self.monitors = []
+        self.rescan_ids = {}
+
+    def start(self, watch=True):
+        """Build the index on a background thread"""
+        thread = threading.Thread(target=self.build, args=(watch,), daemon=True)
+        thread.start()
+        return thread
+
+    def build(self, watch=False):
+        """Scan every PATH directory and bash's builtins and keywords"""
+        self.builtins = self.scan_builtins()
+        for directory in self.path_dirs:
+            self.directory_commands[directory] = self.scan_directory(directory)
+        with self.lock:
+            self.rebuild()
+        self.ready = True
+        if watch:
+            # File monitors deliver their signals on the main loop they were created in
+            from gi.repository import GLib
+            GLib.idle_add(self.watch)
+
+    @staticmethod
+    def scan_directory(directory):
+        """Return the executable file names in a directory"""
+        commands = set()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file() and os.access(entry.path, os.X_OK):
+                            commands.add(entry.name)
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+        return commands
+
+    @staticmethod
+    def scan_builtins():
+        """Ask bash once for its builtins and keywords"""
+        try:
+            result = subprocess.run(["bash", "-c", "compgen -b -k"],
+                                    capture_output=True, text=True, timeout=5)
+            return set(result.stdout.split())
+        except (OSError, subprocess.SubprocessError):
+            return set()
+
+    def rebuild(self):
+        names = set(self.builtins)
+        for commands in list(self.directory_commands.values()):
+            names.update(commands)
+        # Lookups read self.names without locking, so swap in a finished list
+        self.names = sorted(names)
+
+    def lookup(self, prefix, limit=1):
+        """Return up to limit command names starting with prefix, in sorted order"""
+        names = self.names
+        if not prefix:
+            return []
+        matches = []
+        i = bisect_left(names, prefix)
+        while i < len(names) and len(matches) < limit and names[i].startswith(prefix):
+            matches.append(names[i])
+            i += 1
+        return matches
+
+    def complete(self, prefix, context=None):
+        """Return the first command completing prefix, or None"""
+        if not prefix or ' ' in prefix:
+            return None
+        for name in self.lookup(prefix, limit=2):
+            if name != prefix:
+                return name
+        return None
+
+    def watch(self):
+        """Monitor the PATH directories so installs and removals show up"""
+        from gi.repository import Gio
+
+        for directory in self.path_dirs:
+            if not os.path.isdir(directory):
+                continue
+            try:
+                monitor = Gio.File.new_for_path(directory).monitor_directory(
+                    Gio.FileMonitorFlags.NONE, None)
+            except Exception as e:
+                print(f"Cannot watch {directory}: {e}")
+                continue
+            monitor.connect("changed", self.on_directory_changed, directory)
+            self.monitors.append(monitor)
+        return False
+
+    def on_directory_changed(self, monitor, file, other_file, event_type, directory):
+        from gi.repository import GLib
+
+        if directory not in self.rescan_ids:
+            self.rescan_ids[directory] = GLib.timeout_add(RESCAN_DELAY, self.on_rescan_timeout, directory)
+
+    def on_rescan_timeout(self, directory):
+        del self.rescan_ids[directory]
+        threading.Thread(target=self.rescan, args=(directory,), daemon=True).start()
+        return False
+
+    def rescan(self, directory):
+        """Rescan one directory and merge what changed in it into the index"""
+        commands = self.scan_directory(directory)
+        with self.lock:
+            old = self.directory_commands.get(directory, set())
+            self.directory_commands[directory] = commands
+            names = self.names
+            added = sorted(name for name in commands - old if not self.contains(names, name))
+            # A name stays while a builtin or another directory still provides it
+            removed = {name for name in old - commands if name not in self.builtins
+                       and not any(name in other for other in self.directory_commands.values())}
+            if added or removed:
+                kept = [name for name in names if name not in removed] if removed else names
+                self.names = list(heapq.merge(kept, added))
+
+    @staticmethod
+    def contains(names, name):
+        i = bisect_left(names, name)
+        return i < len(names) and names[i] == name
+
+    def stop(self):
+        """Cancel the file monitors"""
+        for monitor in self.monitors:
+            monitor.cancel()
+        self.monitors = []
@@ -0,0 +1,73 @@
+from bisect import bisect_left, bisect_right
+
+MAX_MARKS = 1000    # commands remembered per terminal
+
+class CommandMark:
+    """One prompt, the command line typed at it and where its output ended"""
+    __slots__ = ('prompt', 'row', 'input_column', 'command', 'status', 'end_row', 'submitted')
+
+    def __init__(self, prompt, row, input_column):
+        self.prompt = prompt
+        self.row = row                    # absolute terminal row the input starts on
+        self.input_column = input_column
+        self.command = None
+        self.status = None
+        self.end_row = None               # last output row, once the command finished
+        self.submitted = False            # Enter was pressed, the command may be running
+
+class CommandMarks:
+    """Index of the prompts, command lines and outputs of one terminal, in row order"""
+    def __init__(self, max_marks=MAX_MARKS):
+        self.max_marks = max_marks
+        self.marks = []
+        self.rows = []
+
+    @property
+    def current(self):
+        """The mark of the prompt the user is typing at, or None"""
+        if self.marks and self.marks[-1].command is None and not self.marks[-1].submitted:
+            return self.marks[-1]
+        return None
+
+    def add_prompt(self, prompt, row, input_column):
+        # A prompt drawn over an older one (after clear or reset) replaces it
+        while self.rows and self.rows[-1] >= row:
+            self.rows.pop()
+            self.marks.pop()
+        if self.marks and self.marks[-1].end_row is None:
+            self.marks[-1].end_row = row - 1
+        self.marks.append(CommandMark(prompt, row, input_column))
+        self.rows.append(row)
+        if len(self.marks) > self.max_marks:
+            del self.marks[0], self.rows[0]
+
+    def submit(self):
+        """The line at the current prompt was entered, no prompt is current until the next one"""
+        if self.current:
+            self.marks[-1].submitted = True
+
+    def finish(self, command, status):
+        """Record the command line run at the last prompt and its exit status"""
+        mark = self.marks[-1] if self.marks else None
+        if mark and mark.command is None:
+            mark.command = command
+            mark.status = status
+
+    def mark_at(self, row):
+        """Return the mark whose prompt, command or output contains row"""
+        i = bisect_right(self.rows, row) - 1
+        return self.marks[i] if i >= 0 else None
+
+    def previous_row(self, row):
+        """Row of the last prompt above row, or None"""
+        i = bisect_left(self.rows, row) - 1
+        return self.rows[i] if i >= 0 else None
+
+    def next_row(self, row):
+        """Row of the first prompt below row, or None"""
+        i = bisect_right(self.rows, row)
+        return self.rows[i] if i < len(self.rows) else None
+
+    def clear(self):
+        self.marks = []
+        self.rows = []
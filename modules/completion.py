@@ -0,0 +1,81 @@
+import threading
+
+class CompletionEngine:
+    """Runs completion lookups on a worker thread, delivering only the newest result per terminal"""
+    def __init__(self, providers, dispatch=None):
+        # Providers take a prefix and the request's context and return a full
+        # suggestion or None, first hit wins
+        self.providers = list(providers)
+        if dispatch is None:
+            from gi.repository import GLib
+            dispatch = GLib.idle_add
+        self.dispatch = dispatch
+        self.generations = {}
+        self.pending = {}
+        self.condition = threading.Condition()
+        self.running = True
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+
+    def submit(self, key, prefix, callback, context=None):
+        """Ask for a completion of prefix, replacing any request still queued for key
+
+        callback(suggestion) is called through dispatch unless the request went stale.
+        """
+        with self.condition:
+            generation = self.generations.get(key, 0) + 1
+            self.generations[key] = generation
+            self.pending[key] = (generation, prefix, callback, context)
+            self.condition.notify()
+        return generation
+
+    def cancel(self, key):
+        """Drop the queued request for key and any result still in flight"""
+        with self.condition:
+            self.generations[key] = self.generations.get(key, 0) + 1
+            self.pending.pop(key, None)
+
+    def forget(self, key):
+        """Release all state for a key that is gone"""
+        with self.condition:
+            self.generations.pop(key, None)
+            self.pending.pop(key, None)
+
+    def is_current(self, key, generation):
+        return self.generations.get(key) == generation
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                key, (generation, prefix, callback, context) = self.pending.popitem()
+
+            suggestion = self.complete(prefix, context)
+            if self.is_current(key, generation):
+                self.dispatch(self.deliver, key, generation, suggestion, callback)
+
+    def complete(self, prefix, context=None):
+        for provider in self.providers:
+            try:
+                suggestion = provider(prefix, context)
+            except Exception as e:
+                print(f"Error checking completion: {e}")
+                continue
+            if suggestion:
+                return suggestion
+        return None
+
+    def deliver(self, key, generation, suggestion, callback):
+        # The user may have typed again while this result was queued
+        if self.is_current(key, generation):
+            callback(suggestion)
+        return False
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.pending.clear()
+            self.condition.notify()
@@ -19,7 +19,22 @@ def load_config():
         'font_size': 11,
         'cursor_shape': 'block',
         'cursor_blink_mode': 'system',
-        'theme_name': 'HyxTerminal'     # Default theme name
+        'theme_name': 'HyxTerminal',    # Default theme name
+        'shell_pool_size': 0,           # Idle pre-spawned shells, 0 disables the pool
+        'shell_pool_max_idle_mb': 64,   # Memory cap for idle pooled shells
+        'defer_hidden_shells': False,   # Start shells only when their pane is shown
+        'restore_session': True,        # Reopen the previous tabs and splits on startup
+        'dropdown_height': 0.4,         # Dropdown window height as a fraction of the monitor
+        'dropdown_shortcut': 'F12',     # Global shortcut for the dropdown (needs Keybinder)
+        'shell_integration': False,     # Load the bash snippet that reports aliases and functions
+        'history_max_entries': 20000,   # Distinct history lines kept for hints
+        'flag_hints': True,             # Hint flags and subcommands parsed from man pages
+        'flag_help_fallback': False,    # Run commands without a man page with --help to read their flags
+        'scrollback_archive': False,    # Also write scrollback to compressed files on disk
+        'scrollback_archive_memory_lines': 2000,  # In-memory scrollback per pane while archiving
+        'scrollback_archive_max_days': 30,        # Archived sessions older than this are deleted
+        'scrollback_archive_max_mb': 1024,        # Oldest archived segments are deleted above this
+        'scrollback_budget_mb': 0       # Scrollback memory shared by all panes, 0 gives each pane its full scrollback
     }
     
     if config_path.exists():
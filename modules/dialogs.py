@@ -161,80 +161,6 @@ class Dialogs:
         dialog.destroy()
         return response
     
-    @staticmethod
-    def show_find_dialog(parent_window, find_callback):
-        """Show find dialog for terminal search"""
-        dialog = Gtk.Dialog(
-            title="Find",
-            parent=parent_window,
-            flags=0
-        )
-        dialog.add_buttons(
-            Gtk.STOCK_FIND, Gtk.ResponseType.OK,
-            Gtk.STOCK_CLOSE, Gtk.ResponseType.CANCEL
-        )
-        
-        box = dialog.get_content_area()
-        box.set_spacing(6)
-        box.set_margin_start(10)
-        box.set_margin_end(10)
-        box.set_margin_top(10)
-        box.set_margin_bottom(10)
-        
-        # Search entry
-        search_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
-        search_label = Gtk.Label(label="Search:")
-        search_entry = Gtk.Entry()
-        search_box.pack_start(search_label, False, False, 0)
-        search_box.pack_start(search_entry, True, True, 0)
-        box.add(search_box)
-        
-        # Case sensitive checkbox
-        case_check = Gtk.CheckButton(label="Case sensitive")
-        box.add(case_check)
-        
-        # Regex checkbox
-        regex_check = Gtk.CheckButton(label="Regular expression")
-        box.add(regex_check)
-
-        # Search direction
-        direction_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
-        direction_label = Gtk.Label(label="Search direction:")
-        backward_check = Gtk.CheckButton(label="Search backward")
-        direction_box.pack_start(direction_label, False, False, 0)
-        direction_box.pack_start(backward_check, False, False, 0)
-        box.add(direction_box)
-        
-        box.show_all()
-        
-        while True:
-            response = dialog.run()
-            if response == Gtk.ResponseType.OK:
-                text = search_entry.get_text()
-                case_sensitive = case_check.get_active()
-                use_regex = regex_check.get_active()
-                backward = backward_check.get_active()
-                
-                found = find_callback(text, case_sensitive, use_regex, backward)
-                
-                if not found:
-                    # If not found, show a message
-                    msg_dialog = Gtk.MessageDialog(
-                        parent=dialog,
-                        flags=0,
-                        message_type=Gtk.MessageType.INFO,
-                        buttons=Gtk.ButtonsType.OK,
-                        text="Text not found"
-                    )
-                    msg_dialog.run()
-                    msg_dialog.destroy()
-            else:
-                # Clear search highlighting
-                find_callback("", False, False, False, clear=True)
-                break
-        
-        dialog.destroy()
-    
     @staticmethod
     def show_about_dialog(parent_window):
         """Show about dialog with application information"""
@@ -330,6 +256,7 @@ class Dialogs:
             "Plugins": [
                 ("Ctrl+Shift+P", "Command Palette"),
                 ("Ctrl+Shift+F", "Find in Terminal"),
+                ("Ctrl+Shift+G", "Search All Panes"),
                 ("F1", "Show Documentation")
             ]
         }
@@ -364,6 +291,76 @@ class Dialogs:
         dialog.run()
         dialog.destroy()
         
+    @staticmethod
+    def show_scrollback_usage(parent_window, services):
+        """Show each pane's scrollback limit and estimated memory, against the budget"""
+        from modules.scrollback_budget import pressure_factor
+
+        budget = services.scrollback_budget
+        dialog = Gtk.Dialog(
+            title="Scrollback Usage",
+            parent=parent_window,
+            flags=0
+        )
+        dialog.add_buttons("Refresh", Gtk.ResponseType.APPLY, Gtk.STOCK_CLOSE, Gtk.ResponseType.CLOSE)
+        dialog.set_default_size(640, 400)
+
+        box = dialog.get_content_area()
+        box.set_spacing(6)
+        box.set_margin_start(10)
+        box.set_margin_end(10)
+        box.set_margin_top(10)
+        box.set_margin_bottom(10)
+
+        summary = Gtk.Label(xalign=0)
+        box.pack_start(summary, False, False, 0)
+
+        store = Gtk.ListStore(str, str, int, int, float)  # pane, state, limit, used lines, estimated MB
+        view = Gtk.TreeView(model=store)
+        for i, title in enumerate(["Pane", "State", "Limit (lines)", "Used (lines)", "Estimated MB"]):
+            renderer = Gtk.CellRendererText()
+            if i == 4:
+                # Kept as a number so the column sorts numerically
+                column = Gtk.TreeViewColumn(title, renderer)
+                column.set_cell_data_func(renderer, lambda column, cell, model, tree_iter, data:
+                                          cell.set_property("text", f"{model[tree_iter][4]:.1f}"))
+            else:
+                column = Gtk.TreeViewColumn(title, renderer, text=i)
+            column.set_sort_column_id(i)
+            view.append_column(column)
+        scrolled_window = Gtk.ScrolledWindow()
+        scrolled_window.add(view)
+        box.pack_start(scrolled_window, True, True, 0)
+
+        def refresh():
+            store.clear()
+            total = 0
+            windows = services.windows
+            for window, tab, terminal, state, limit, used, estimate in budget.usage():
+                title = window.notebook.get_tab_label(tab).label.get_text()
+                if len(windows) > 1:
+                    title = f"Window {windows.index(window) + 1} › {title}"
+                if len(tab.terminals) > 1:
+                    title += f" › Pane {tab.terminals.index(terminal) + 1}"
+                store.append([title, state, limit, used, estimate / 1048576])
+                total += estimate
+            if budget.enabled:
+                text = f"Estimated {total / 1048576:.1f} MB of a {budget.budget_bytes / 1048576:.0f} MB budget"
+                if budget.pressure is not None:
+                    text += f", memory pressure {budget.pressure:.1f}%"
+                    if pressure_factor(budget.pressure) < 1:
+                        text += " (budget reduced)"
+            else:
+                text = (f"Estimated {total / 1048576:.1f} MB. No budget is set, every pane keeps "
+                        f"{services.get_scrollback_lines()} lines (scrollback_budget_mb)")
+            summary.set_text(text)
+
+        refresh()
+        dialog.show_all()
+        while dialog.run() == Gtk.ResponseType.APPLY:
+            refresh()
+        dialog.destroy()
+
     @staticmethod
     def check_for_updates(parent_window):
         """Check for application updates"""
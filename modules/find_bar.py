@@ -0,0 +1,284 @@
+import re
+from collections import OrderedDict
+import gi
+gi.require_version('Gtk', '3.0')
+gi.require_version('Vte', '2.91')
+from gi.repository import Gtk, Gdk, Vte, GLib
+from modules.search import snapshot_scrollback, compile_pattern, scroll_to_row, FindAllJob
+
+# PCRE2 compile flags understood by Vte.Regex
+PCRE2_CASELESS = 0x00000008
+PCRE2_MULTILINE = 0x00000400
+
+class RegexCache:
+    """Compiled search patterns keyed by (pattern, flags), least recently used dropped first"""
+    def __init__(self, size=32):
+        self.size = size
+        self.regexes = OrderedDict()
+
+    def get(self, pattern, flags):
+        """Return the compiled Vte.Regex, raising GLib.Error for an invalid pattern"""
+        key = (pattern, flags)
+        regex = self.regexes.get(key)
+        if regex is not None:
+            self.regexes.move_to_end(key)
+            return regex
+        regex = Vte.Regex.new_for_search(pattern, -1, flags)
+        self.regexes[key] = regex
+        if len(self.regexes) > self.size:
+            self.regexes.popitem(last=False)
+        return regex
+
+class FindBar(Gtk.Revealer):
+    """Inline search for the focused terminal, searching as you type"""
+    regex_cache = RegexCache()
+
+    def __init__(self, parent_window):
+        Gtk.Revealer.__init__(self)
+        self.parent_window = parent_window
+        self.terminal = None
+        self.active_search = None
+        self.find_all_job = None
+
+        outer_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        self.add(outer_box)
+
+        box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        box.set_margin_start(6)
+        box.set_margin_end(6)
+        box.set_margin_top(3)
+        box.set_margin_bottom(3)
+        outer_box.pack_start(box, False, False, 0)
+
+        self.entry = Gtk.SearchEntry()
+        self.entry.set_width_chars(30)
+        self.entry.connect("search-changed", self.on_search_changed)
+        self.entry.connect("activate", lambda entry: self.find(backward=True))
+        self.entry.connect("previous-match", lambda entry: self.find(backward=True))
+        self.entry.connect("next-match", lambda entry: self.find(backward=False))
+        self.entry.connect("stop-search", lambda entry: self.close())
+        self.entry.connect("key-press-event", self.on_key_press)
+        box.pack_start(self.entry, False, False, 0)
+
+        previous_button = Gtk.Button.new_from_icon_name("go-up-symbolic", Gtk.IconSize.BUTTON)
+        previous_button.set_tooltip_text("Previous match (Enter)")
+        previous_button.connect("clicked", lambda button: self.find(backward=True))
+        box.pack_start(previous_button, False, False, 0)
+
+        next_button = Gtk.Button.new_from_icon_name("go-down-symbolic", Gtk.IconSize.BUTTON)
+        next_button.set_tooltip_text("Next match (Shift+Enter)")
+        next_button.connect("clicked", lambda button: self.find(backward=False))
+        box.pack_start(next_button, False, False, 0)
+
+        self.case_check = Gtk.CheckButton(label="Case sensitive")
+        self.case_check.connect("toggled", self.on_search_changed)
+        box.pack_start(self.case_check, False, False, 0)
+
+        self.regex_check = Gtk.CheckButton(label="Regular expression")
+        self.regex_check.connect("toggled", self.on_search_changed)
+        box.pack_start(self.regex_check, False, False, 0)
+
+        self.find_all_button = Gtk.Button(label="Find All")
+        self.find_all_button.set_tooltip_text("List every matching line (Alt+Enter)")
+        self.find_all_button.connect("clicked", self.on_find_all_clicked)
+        box.pack_start(self.find_all_button, False, False, 0)
+
+        self.progress_bar = Gtk.ProgressBar()
+        self.progress_bar.set_valign(Gtk.Align.CENTER)
+        self.progress_bar.set_no_show_all(True)
+        box.pack_start(self.progress_bar, False, False, 0)
+
+        self.status_label = Gtk.Label()
+        box.pack_start(self.status_label, False, False, 0)
+
+        close_button = Gtk.Button.new_from_icon_name("window-close-symbolic", Gtk.IconSize.BUTTON)
+        close_button.set_relief(Gtk.ReliefStyle.NONE)
+        close_button.connect("clicked", lambda button: self.close())
+        box.pack_end(close_button, False, False, 0)
+
+        # Matching lines of the last Find All, newest output last
+        self.results_revealer = Gtk.Revealer()
+        outer_box.pack_start(self.results_revealer, False, False, 0)
+
+        self.results_store = Gtk.ListStore(int, int, str)  # row, line number, text
+        self.results_view = Gtk.TreeView(model=self.results_store)
+        self.results_view.set_headers_visible(False)
+        self.results_view.set_enable_search(False)
+        self.results_view.set_fixed_height_mode(True)
+        self.results_view.connect("row-activated", self.on_result_activated)
+        self.results_view.get_selection().connect("changed", self.on_result_selected)
+        for title, column_index in (("Line", 1), ("Text", 2)):
+            renderer = Gtk.CellRendererText()
+            if column_index == 2:
+                renderer.set_property("family", "Monospace")
+            column = Gtk.TreeViewColumn(title, renderer, text=column_index)
+            column.set_sizing(Gtk.TreeViewColumnSizing.FIXED)
+            column.set_fixed_width(80 if column_index == 1 else 600)
+            self.results_view.append_column(column)
+
+        scrolled_window = Gtk.ScrolledWindow()
+        scrolled_window.set_min_content_height(160)
+        scrolled_window.add(self.results_view)
+        self.results_revealer.add(scrolled_window)
+
+    def open(self, terminal):
+        """Show the bar for a terminal and focus the search entry"""
+        if self.terminal is not terminal:
+            self.clear_search()
+            self.clear_results()
+            self.terminal = terminal
+        self.set_reveal_child(True)
+        self.show_all()
+        self.entry.grab_focus()
+        self.entry.select_region(0, -1)
+        if self.entry.get_text():
+            self.on_search_changed()
+
+    def close(self):
+        self.clear_search()
+        self.clear_results()
+        self.set_reveal_child(False)
+        if self.terminal:
+            self.terminal.grab_focus()
+        self.terminal = None
+
+    def clear_search(self):
+        if self.terminal:
+            self.terminal.search_set_regex(None, 0)
+        self.active_search = None
+        self.status_label.set_text("")
+
+    def on_key_press(self, widget, event):
+        if event.keyval in (Gdk.KEY_Return, Gdk.KEY_KP_Enter):
+            if event.state & Gdk.ModifierType.MOD1_MASK:
+                self.find_all()
+                return True
+            if event.state & Gdk.ModifierType.SHIFT_MASK:
+                self.find(backward=False)
+                return True
+        return False
+
+    def on_search_changed(self, *args):
+        """Search again from the bottom whenever the pattern or options change"""
+        if not self.terminal:
+            return
+        self.clear_results()
+        if self.update_regex():
+            # Start from the newest output, as the scrollback grows downwards
+            self.terminal.unselect_all()
+            self.find(backward=True)
+
+    def update_regex(self):
+        """Point the terminal at the current pattern, compiling it only on a cache miss"""
+        text = self.entry.get_text()
+        style = self.entry.get_style_context()
+        style.remove_class("error")
+        if not text:
+            self.clear_search()
+            return False
+
+        pattern = text if self.regex_check.get_active() else re.escape(text)
+        flags = PCRE2_MULTILINE
+        if not self.case_check.get_active():
+            flags |= PCRE2_CASELESS
+        if self.active_search == (pattern, flags):
+            return True
+        try:
+            regex = self.regex_cache.get(pattern, flags)
+        except GLib.Error:
+            style.add_class("error")
+            self.status_label.set_text("Invalid pattern")
+            self.terminal.search_set_regex(None, 0)
+            self.active_search = None
+            return False
+        self.terminal.search_set_wrap_around(True)
+        self.terminal.search_set_regex(regex, 0)
+        self.active_search = (pattern, flags)
+        return True
+
+    def find(self, backward=True):
+        """Move to the previous or next match of the current pattern"""
+        if not self.terminal or not self.update_regex():
+            return False
+        if backward:
+            found = self.terminal.search_find_previous()
+        else:
+            found = self.terminal.search_find_next()
+        self.status_label.set_text("" if found else "Not found")
+        if not found:
+            self.entry.get_style_context().add_class("error")
+        return found
+
+    def on_find_all_clicked(self, button):
+        if self.find_all_job:
+            self.cancel_find_all()
+            self.status_label.set_text("Cancelled")
+        else:
+            self.find_all()
+
+    def find_all(self):
+        """List every line of the scrollback matching the pattern, searching on a worker thread"""
+        text = self.entry.get_text()
+        if not self.terminal or not text:
+            return
+        self.clear_results()
+        try:
+            regex = compile_pattern(text, self.case_check.get_active(), self.regex_check.get_active())
+        except re.error:
+            self.entry.get_style_context().add_class("error")
+            self.status_label.set_text("Invalid pattern")
+            return
+        # Only the copy happens here, the matching runs on the worker
+        snapshot, first_row, columns = snapshot_scrollback(self.terminal)
+        self.find_all_job = FindAllJob(regex, snapshot, first_row, columns,
+                                       self.on_find_all_progress, self.on_find_all_done).start()
+        self.find_all_button.set_label("Cancel")
+        self.progress_bar.set_fraction(0)
+        self.progress_bar.show()
+        self.status_label.set_text("Searching…")
+
+    def cancel_find_all(self):
+        if self.find_all_job:
+            self.find_all_job.cancel()
+            self.find_all_job = None
+        self.find_all_button.set_label("Find All")
+        self.progress_bar.hide()
+
+    def on_find_all_progress(self, fraction):
+        self.progress_bar.set_fraction(fraction)
+
+    def on_find_all_done(self, result):
+        self.find_all_job = None
+        self.find_all_button.set_label("Find All")
+        self.progress_bar.hide()
+        if not result.count:
+            self.status_label.set_text("Not found")
+            self.entry.get_style_context().add_class("error")
+            return
+
+        lines = len(result.lines)
+        if result.truncated:
+            self.status_label.set_text(f"{result.count} matches, first {lines} lines listed")
+        else:
+            self.status_label.set_text(f"{result.count} matches in {lines} lines")
+        # Filled detached from the view, so the rows are not laid out one by one
+        self.results_view.set_model(None)
+        for row, number, line in result.lines:
+            self.results_store.append([row, number, line])
+        self.results_view.set_model(self.results_store)
+        self.results_revealer.set_reveal_child(True)
+        self.results_view.scroll_to_cell(Gtk.TreePath(lines - 1), None, False, 0, 0)
+
+    def clear_results(self):
+        self.cancel_find_all()
+        self.results_revealer.set_reveal_child(False)
+        self.results_store.clear()
+
+    def on_result_selected(self, selection):
+        model, tree_iter = selection.get_selected()
+        if tree_iter is not None:
+            scroll_to_row(self.terminal, model[tree_iter][0])
+
+    def on_result_activated(self, view, path, column):
+        scroll_to_row(self.terminal, self.results_store[path][0])
+        self.terminal.grab_focus()
@@ -0,0 +1,164 @@
+import json
+import os
+import queue
+import re
+import shutil
+import subprocess
+import threading
+from bisect import bisect_left
+from pathlib import Path
+
+HELP_TIMEOUT = 2      # seconds a man page or --help may take
+SAVE_DELAY = 5        # seconds to coalesce cache writes after parsing
+
+OVERSTRIKE = re.compile(r'.\x08')
+ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+OPTION_LINE = re.compile(r'^\s{0,16}(-[^\s].*?)(?:\s{2,}|\t|$)')
+OPTION = re.compile(r'(?:^|[\s,/|\[])(--?[A-Za-z0-9][A-Za-z0-9_-]*)')
+COMMANDS_HEADER = re.compile(r'^\s*(?:[\w ]*\bcommands?\b[\w ]*:|[A-Z][A-Z ]*COMMANDS?)\s*$', re.IGNORECASE)
+COMMAND_LINE = re.compile(r'^\s{2,}([a-z][a-z0-9_-]*)(?:\s{2,}|\t|,|\s*$)')
+
+def parse_help(text):
+    """Return (flags, subcommands) found in man page or --help text"""
+    text = ANSI_ESCAPE.sub('', OVERSTRIKE.sub('', text))
+    flags = set()
+    subcommands = set()
+    in_commands = False
+    for line in text.splitlines():
+        match = OPTION_LINE.match(line)
+        if match:
+            flags.update(OPTION.findall(match.group(1)))
+            continue
+        if COMMANDS_HEADER.match(line):
+            in_commands = True
+            continue
+        if in_commands:
+            match = COMMAND_LINE.match(line)
+            if match:
+                subcommands.add(match.group(1))
+            elif line.strip() and not line[0].isspace() and (line.rstrip().endswith(':') or line.isupper()):
+                # Another section starts, group captions inside the list do not end it
+                in_commands = False
+    flags.discard('-')
+    flags.discard('--')
+    return sorted(flags), sorted(subcommands)
+
+class FlagCache:
+    """Flag and subcommand hints parsed once per binary and cached on disk by path and mtime"""
+    def __init__(self, cache_file=None, help_fallback=False):
+        self.cache_file = Path(cache_file) if cache_file else Path.home() / '.cache' / 'hyxterminal' / 'flags.json'
+        self.help_fallback = help_fallback
+        self.entries = None
+        self.paths = {}
+        self.queued = set()
+        self.requests = queue.Queue()
+        self.lock = threading.Lock()
+        self.save_timer = None
+        self.worker = None
+
+    def load(self):
+        try:
+            with open(self.cache_file) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        with self.lock:
+            self.save_timer = None
+            text = json.dumps(self.entries)
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'w') as f:
+                f.write(text)
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            print(f"Error saving flag cache: {e}")
+
+    def resolve(self, command):
+        """Return (path, mtime) of a command, or None"""
+        path = self.paths.get(command)
+        if path is None:
+            path = self.paths[command] = shutil.which(command) or ''
+        if not path:
+            return None
+        try:
+            return path, os.stat(path).st_mtime
+        except OSError:
+            self.paths.pop(command, None)
+            return None
+
+    def lookup(self, command):
+        """Return the cached entry for a command, queueing a parse on a miss"""
+        if self.entries is None:
+            self.load()
+        resolved = self.resolve(command)
+        if resolved is None:
+            return None
+        path, mtime = resolved
+        entry = self.entries.get(path)
+        if entry and entry['mtime'] == mtime:
+            return entry
+        if path not in self.queued:
+            self.queued.add(path)
+            self.requests.put((command, path, mtime))
+            if self.worker is None:
+                self.worker = threading.Thread(target=self.run, daemon=True)
+                self.worker.start()
+        return None
+
+    def run(self):
+        while True:
+            command, path, mtime = self.requests.get()
+            flags, subcommands = self.read_help(command, path)
+            with self.lock:
+                self.entries[path] = {'mtime': mtime, 'flags': flags, 'subcommands': subcommands}
+                if self.save_timer is None:
+                    self.save_timer = threading.Timer(SAVE_DELAY, self.save)
+                    self.save_timer.daemon = True
+                    self.save_timer.start()
+            self.queued.discard(path)
+
+    def read_help(self, command, path):
+        """Parse the man page, falling back to running the binary with --help if enabled"""
+        env = dict(os.environ, LC_ALL='C', MANPAGER='cat', PAGER='cat', MANWIDTH='120')
+        # Running an arbitrary binary is not safe, not every program knows --help
+        argvs = [["man", command], [path, "--help"]] if self.help_fallback else [["man", command]]
+        for argv in argvs:
+            try:
+                result = subprocess.run(argv, stdin=subprocess.DEVNULL, capture_output=True,
+                                        text=True, errors='replace', env=env,
+                                        timeout=HELP_TIMEOUT, start_new_session=True)
+            except (OSError, subprocess.SubprocessError):
+                continue
+            flags, subcommands = parse_help(result.stdout + result.stderr)
+            if flags or subcommands:
+                return flags, subcommands
+        return [], []
+
+    @staticmethod
+    def first_match(names, prefix):
+        i = bisect_left(names, prefix)
+        while i < len(names) and names[i].startswith(prefix):
+            if names[i] != prefix:
+                return names[i]
+            i += 1
+        return None
+
+    def complete(self, line, context=None):
+        """Completion provider for the flags and subcommands of the typed command"""
+        words = line.split(' ')
+        if len(words) < 2 or not words[0] or not words[-1]:
+            return None
+        word = words[-1]
+        entry = self.lookup(words[0])
+        if entry is None:
+            return None
+        if word.startswith('-'):
+            match = self.first_match(entry['flags'], word)
+        elif len(words) == 2:
+            match = self.first_match(entry['subcommands'], word)
+        else:
+            match = None
+        return line[:len(line) - len(word)] + match if match else None
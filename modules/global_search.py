@@ -0,0 +1,173 @@
+import os
+import re
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import Gtk, GObject
+from modules.search import compile_pattern, scroll_to_row, GlobalSearch
+from modules.services import Services
+
+MAX_PANE_LINES = 500    # matching lines listed per pane
+
+class GlobalSearchWindow(Gtk.Window):
+    """Search the scrollback of every pane in every tab and window"""
+    instance = None
+
+    @classmethod
+    def show_for(cls, parent_window):
+        """Open the search window, reusing it if it is already open"""
+        if cls.instance is None:
+            cls.instance = cls()
+        cls.instance.set_transient_for(parent_window)
+        cls.instance.show_all()
+        cls.instance.present()
+        cls.instance.entry.grab_focus()
+        return cls.instance
+
+    def __init__(self):
+        Gtk.Window.__init__(self, title="Search All Panes")
+        self.set_default_size(800, 500)
+        self.search = None
+        self.tab_rows = {}
+        self.connect("destroy", self.on_destroy)
+
+        vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        vbox.set_margin_start(6)
+        vbox.set_margin_end(6)
+        vbox.set_margin_top(6)
+        vbox.set_margin_bottom(6)
+        self.add(vbox)
+
+        box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        vbox.pack_start(box, False, False, 0)
+
+        self.entry = Gtk.SearchEntry()
+        self.entry.connect("activate", lambda entry: self.start_search())
+        self.entry.connect("stop-search", lambda entry: self.cancel_search())
+        box.pack_start(self.entry, True, True, 0)
+
+        self.case_check = Gtk.CheckButton(label="Case sensitive")
+        box.pack_start(self.case_check, False, False, 0)
+
+        self.regex_check = Gtk.CheckButton(label="Regular expression")
+        box.pack_start(self.regex_check, False, False, 0)
+
+        self.search_button = Gtk.Button(label="Search")
+        self.search_button.connect("clicked", self.on_search_clicked)
+        box.pack_start(self.search_button, False, False, 0)
+
+        # Tab > pane > matching line
+        self.store = Gtk.TreeStore(str, int, GObject.TYPE_PYOBJECT)  # text, row, pane
+        self.view = Gtk.TreeView(model=self.store)
+        self.view.set_headers_visible(False)
+        self.view.connect("row-activated", self.on_row_activated)
+        renderer = Gtk.CellRendererText()
+        renderer.set_property("family", "Monospace")
+        self.view.append_column(Gtk.TreeViewColumn("Match", renderer, text=0))
+
+        scrolled_window = Gtk.ScrolledWindow()
+        scrolled_window.add(self.view)
+        vbox.pack_start(scrolled_window, True, True, 0)
+
+        self.status_label = Gtk.Label(xalign=0)
+        vbox.pack_start(self.status_label, False, False, 0)
+
+    def on_destroy(self, widget):
+        self.cancel_search()
+        GlobalSearchWindow.instance = None
+
+    def on_search_clicked(self, button):
+        if self.search:
+            self.cancel_search()
+            self.status_label.set_text("Cancelled")
+        else:
+            self.start_search()
+
+    def list_panes(self):
+        """Every terminal of every window, as ((window, tab, terminal), terminal)"""
+        return [(pane, pane[2]) for pane in Services.get().iter_terminals()]
+
+    def start_search(self):
+        text = self.entry.get_text()
+        self.cancel_search()
+        self.store.clear()
+        self.tab_rows = {}
+        self.entry.get_style_context().remove_class("error")
+        if not text:
+            self.status_label.set_text("")
+            return
+        try:
+            regex = compile_pattern(text, self.case_check.get_active(), self.regex_check.get_active())
+        except re.error:
+            self.entry.get_style_context().add_class("error")
+            self.status_label.set_text("Invalid pattern")
+            return
+
+        panes = self.list_panes()
+        self.pane_count = len(panes)
+        self.match_count = 0
+        self.matching_panes = 0
+        self.search = GlobalSearch(regex, panes, self.on_pane_result, self.on_search_done).start()
+        self.search_button.set_label("Cancel")
+        self.status_label.set_text(f"Searching {self.pane_count} panes…")
+
+    def cancel_search(self):
+        if self.search:
+            self.search.cancel()
+            self.search = None
+        self.search_button.set_label("Search")
+
+    def get_tab_row(self, window, tab):
+        """The tree row of a tab, added the first time one of its panes matches"""
+        key = (window, tab)
+        if key not in self.tab_rows:
+            title = window.notebook.get_tab_label(tab).label.get_text()
+            windows = Services.get().windows
+            if len(windows) > 1 and window in windows:
+                title = f"Window {windows.index(window) + 1} › {title}"
+            self.tab_rows[key] = self.store.append(None, [title, -1, None])
+        return self.tab_rows[key]
+
+    def on_pane_result(self, pane, result):
+        window, tab, terminal = pane
+        if terminal not in tab.terminals:
+            return
+        self.match_count += result.count
+        self.matching_panes += 1
+
+        tab_row = self.get_tab_row(window, tab)
+        number = tab.terminals.index(terminal) + 1
+        cwd = tab.get_cwd(terminal).replace(os.path.expanduser("~"), "~", 1)
+        pane_row = self.store.append(tab_row, [f"Pane {number} ({cwd}): {result.count} matches", -1, pane])
+        # The newest output is usually what is being looked for
+        for row, line_number, line in result.lines[-MAX_PANE_LINES:]:
+            self.store.append(pane_row, [f"{line_number:>7}  {line}", row, pane])
+        if len(result.lines) > MAX_PANE_LINES:
+            self.store.insert(pane_row, 0, [f"… {len(result.lines) - MAX_PANE_LINES} earlier lines", -1, pane])
+        self.view.expand_row(self.store.get_path(tab_row), False)
+        self.status_label.set_text(f"{self.match_count} matches in {self.matching_panes} panes, "
+                                   f"{self.search.finished} of {self.pane_count} searched…")
+
+    def on_search_done(self):
+        self.search = None
+        self.search_button.set_label("Search")
+        if self.match_count:
+            self.status_label.set_text(f"{self.match_count} matches in {self.matching_panes} "
+                                       f"of {self.pane_count} panes")
+        else:
+            self.status_label.set_text(f"Not found in {self.pane_count} panes")
+
+    def on_row_activated(self, view, path, column):
+        """Focus the pane of a result and scroll it to the matching line"""
+        text, row, pane = self.store[path]
+        if pane is None:
+            return
+        window, tab, terminal = pane
+        page = window.notebook.page_num(tab)
+        if window not in Services.get().windows or page < 0 or terminal not in tab.terminals:
+            self.status_label.set_text("That pane has been closed")
+            return
+        window.present()
+        window.notebook.set_current_page(page)
+        terminal.grab_focus()
+        if row >= 0:
+            scroll_to_row(terminal, row)
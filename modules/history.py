@@ -0,0 +1,254 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DECAY = 1 / 500          # each command weighs e^(1/500) more than the one before it
+TOP_N = 8                # candidates kept at every inner prefix node
+BUCKET_SIZE = 32         # lines a leaf holds before it splits by the next character
+MAX_LINE = 256           # longer lines are not indexed
+REFRESH_INTERVAL = 1.0   # seconds between history file checks
+MAX_CWDS = 64            # directories with their own recent commands
+MAX_CWD_COMMANDS = 100   # recent commands kept per directory
+CWD_BONUS = 1.0          # log-score boost for commands last run in the same directory
+MAX_RECORDED = 1000      # recorded lines waiting to show up in the history file
+
+def get_history_file():
+    return os.environ.get('HISTFILE') or os.path.join(os.path.expanduser('~'), '.bash_history')
+
+class _Node:
+    __slots__ = ('children', 'lines', 'top', 'count')
+
+    def __init__(self, lines=None):
+        # Leaves hold every line below them until they grow past BUCKET_SIZE,
+        # inner nodes only the line that ends exactly at them
+        self.children = None
+        self.lines = lines if lines is not None else set()
+        self.top = []     # best command lines below an inner node, highest score first
+        self.count = 0    # indexed command lines below this node
+
+class HistoryIndex:
+    """Frecency-ranked prefix index of shell history lines, tailed incrementally
+
+    Scores are kept as logarithms of exponentially growing weights, so older
+    uses decay relative to newer ones without ever rescoring the index.
+    """
+    def __init__(self, path=None, max_entries=20000):
+        self.path = path or get_history_file()
+        self.max_entries = max_entries
+        self.root = _Node()
+        self.root.children = {}
+        self.scores = {}
+        self.clock = 0
+        self.offset = 0
+        self.inode = None
+        self.partial = b''
+        self.last_check = 0
+        self.cwd_commands = OrderedDict()
+        # Lines already counted by record(), not counted again when the shell appends them
+        self.recorded = OrderedDict()
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+
+    def refresh(self, force=False):
+        """Index lines appended to the history file since the last read"""
+        now = time.monotonic()
+        if not force and now - self.last_check < REFRESH_INTERVAL:
+            return
+        with self.refresh_lock:
+            self.last_check = now
+            self.read_appended()
+
+    def read_appended(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return
+        # Bash rewrites the file when it truncates it to HISTFILESIZE
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            self.inode = st.st_ino
+            self.offset = 0
+            self.partial = b''
+        if st.st_size == self.offset:
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset)
+                data = f.read()
+        except OSError:
+            return
+        self.offset += len(data)
+        lines = (self.partial + data).split(b'\n')
+        self.partial = lines.pop()
+        with self.lock:
+            for line in lines:
+                text = line.decode('utf-8', 'replace').strip()
+                # Timestamp comments written when HISTTIMEFORMAT is set
+                if text.startswith('#') and text[1:].isdigit():
+                    continue
+                pending = self.recorded.get(text)
+                if pending:
+                    if pending == 1:
+                        del self.recorded[text]
+                    else:
+                        self.recorded[text] = pending - 1
+                    continue
+                self.add(text)
+
+    def record(self, line, cwd=None):
+        """Count a command the user just ran, remembering where it ran"""
+        line = line.strip()
+        with self.lock:
+            self.add(line)
+            if line:
+                # A shell that never writes its history must not grow this forever
+                self.recorded[line] = self.recorded.pop(line, 0) + 1
+                while len(self.recorded) > MAX_RECORDED:
+                    self.recorded.popitem(last=False)
+            if cwd and line in self.scores:
+                commands = self.cwd_commands.pop(cwd, None) or OrderedDict()
+                commands.pop(line, None)
+                commands[line] = True
+                while len(commands) > MAX_CWD_COMMANDS:
+                    commands.popitem(last=False)
+                self.cwd_commands[cwd] = commands
+                while len(self.cwd_commands) > MAX_CWDS:
+                    self.cwd_commands.popitem(last=False)
+
+    def add(self, line):
+        if not line or len(line) > MAX_LINE:
+            return
+        self.clock += 1
+        weight = self.clock * DECAY
+        old = self.scores.get(line)
+        if old is None:
+            score = weight
+        else:
+            score = max(old, weight) + math.log1p(math.exp(-abs(old - weight)))
+        self.scores[line] = score
+
+        node = self.root
+        depth = 0
+        while node.children is not None:
+            if old is None:
+                node.count += 1
+            self.promote(node, line)
+            if depth == len(line):
+                node.lines.add(line)
+                break
+            parent = node
+            node = node.children.get(line[depth])
+            depth += 1
+            if node is None:
+                node = parent.children[line[depth - 1]] = _Node()
+        else:
+            if old is None:
+                node.count += 1
+                node.lines.add(line)
+                if len(node.lines) > BUCKET_SIZE:
+                    self.split(node, depth)
+
+        if len(self.scores) > self.max_entries:
+            self.evict()
+
+    def split(self, node, depth):
+        """Turn a full leaf into an inner node with one leaf per next character"""
+        lines = node.lines
+        node.children = {}
+        node.lines = set()
+        for line in lines:
+            if len(line) == depth:
+                node.lines.add(line)
+                continue
+            child = node.children.get(line[depth])
+            if child is None:
+                child = node.children[line[depth]] = _Node()
+            child.lines.add(line)
+            child.count += 1
+        node.top = sorted(lines, key=self.scores.get, reverse=True)[:TOP_N]
+
+    def promote(self, node, line):
+        """Update an inner node's candidates after line's score went up"""
+        top = node.top
+        scores = self.scores
+        score = scores[line]
+        if top and top[0] == line:
+            return
+        if line in top:
+            top.remove(line)
+        elif len(top) >= TOP_N and scores[top[-1]] >= score:
+            return
+        # The line just used usually has the best score, so check the head first
+        if not top or score >= scores[top[0]]:
+            top.insert(0, line)
+            del top[TOP_N:]
+            return
+        i = 0
+        while i < len(top) and scores[top[i]] >= score:
+            i += 1
+        top.insert(i, line)
+        del top[TOP_N:]
+
+    def evict(self):
+        """Drop the lowest scored tenth of the lines"""
+        count = len(self.scores) - int(self.max_entries * 0.9)
+        for line in sorted(self.scores, key=self.scores.get)[:count]:
+            self.remove(line)
+
+    def remove(self, line):
+        del self.scores[line]
+        for cwd, commands in list(self.cwd_commands.items()):
+            if commands.pop(line, None) and not commands:
+                del self.cwd_commands[cwd]
+        parent = None
+        node = self.root
+        depth = 0
+        while True:
+            node.count -= 1
+            if line in node.top:
+                node.top.remove(line)
+            if node.count == 0 and parent is not None:
+                # Nothing is left below this node
+                del parent.children[line[depth - 1]]
+                return
+            if node.children is None or depth == len(line):
+                node.lines.discard(line)
+                return
+            parent = node
+            node = node.children[line[depth]]
+            depth += 1
+
+    def lookup(self, prefix, cwd=None, limit=1):
+        """Return the best scored lines longer than prefix that start with it"""
+        with self.lock:
+            node = self.root
+            depth = 0
+            while node.children is not None and depth < len(prefix):
+                node = node.children.get(prefix[depth])
+                if node is None:
+                    break
+                depth += 1
+            if node is None:
+                candidates = []
+            elif node.children is None:
+                candidates = [line for line in node.lines if line.startswith(prefix) and line != prefix]
+            else:
+                candidates = [line for line in node.top if line != prefix]
+
+            # Commands last run in this directory compete with a bonus
+            local = self.cwd_commands.get(cwd, {})
+            for line in local:
+                if line.startswith(prefix) and line != prefix and line not in candidates:
+                    candidates.append(line)
+            candidates.sort(key=lambda line: self.scores.get(line, 0) + (CWD_BONUS if line in local else 0),
+                            reverse=True)
+            return candidates[:limit]
+
+    def complete(self, prefix, context=None):
+        """Completion provider returning the best history line for prefix"""
+        if not prefix:
+            return None
+        self.refresh()
+        matches = self.lookup(prefix, (context or {}).get('cwd'))
+        return matches[0] if matches else None
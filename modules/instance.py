@@ -0,0 +1,118 @@
+import json
+import os
+import socket
+
+# This module is imported before GTK so that a client invocation can hand its
+# request to a running HyxTerminal and exit without loading gi at all.
+
+CONNECT_TIMEOUT = 0.5
+
+def get_socket_path():
+    """Return the per-user Unix socket path used by the server"""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, 'hyxterminal.sock')
+    return os.path.join('/tmp', f'hyxterminal-{os.getuid()}.sock')
+
+def hand_off(argv, cwd, action="window"):
+    """Send a request to a running server, return True if it was accepted"""
+    path = get_socket_path()
+    if not os.path.exists(path):
+        return False
+
+    message = json.dumps({'action': action, 'argv': list(argv), 'cwd': cwd})
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(path)
+            sock.sendall(message.encode() + b'\n')
+            sock.shutdown(socket.SHUT_WR)
+            return sock.recv(16).startswith(b'ok')
+    except OSError:
+        return False
+
+class InstanceServer:
+    """Accepts requests from later invocations on the per-user socket"""
+    def __init__(self, handler):
+        self.handler = handler
+        self.path = get_socket_path()
+        self.sock = None
+        self.watch_id = None
+
+    def start(self):
+        """Start listening, return False if another server owns the socket"""
+        from gi.repository import GLib
+
+        if hand_off([], os.getcwd(), action="ping"):
+            return False
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.bind(self.path)
+            os.chmod(self.path, 0o600)
+            self.sock.listen(8)
+        except OSError as e:
+            print(f"Failed to start instance server: {e}")
+            self.sock.close()
+            self.sock = None
+            return False
+
+        self.sock.setblocking(False)
+        self.watch_id = GLib.io_add_watch(self.sock.fileno(), GLib.PRIORITY_DEFAULT,
+                                          GLib.IO_IN, self.on_connection)
+        return True
+
+    def stop(self):
+        """Stop listening and remove the socket file"""
+        from gi.repository import GLib
+
+        if self.watch_id:
+            GLib.source_remove(self.watch_id)
+            self.watch_id = None
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+    def on_connection(self, fd, condition):
+        """Read one request from a client and dispatch it to the handler"""
+        try:
+            conn, _ = self.sock.accept()
+        except BlockingIOError:
+            return True
+
+        with conn:
+            try:
+                conn.settimeout(CONNECT_TIMEOUT)
+                data = b''
+                while not data.endswith(b'\n'):
+                    chunk = conn.recv(4096)
+                    if not chunk:
+                        break
+                    data += chunk
+                request = json.loads(data.decode())
+                conn.sendall(b'ok')
+            except (OSError, ValueError) as e:
+                print(f"Invalid instance request: {e}")
+                return True
+
+        # Reply first so the client can exit before the window is built
+        if request.get('action') != 'ping':
+            from gi.repository import GLib
+            GLib.idle_add(self.dispatch, request)
+        return True
+
+    def dispatch(self, request):
+        """Run the handler for a request on the main loop"""
+        try:
+            self.handler(request)
+        except Exception as e:
+            print(f"Error handling instance request: {e}")
+        return False
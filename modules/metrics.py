@@ -0,0 +1,35 @@
+import time
+from collections import deque
+
+# Rolling latency samples, reported at exit when started with --metrics
+
+MAX_SAMPLES = 1000
+
+_samples = {}
+
+def now():
+    return time.perf_counter()
+
+def record(name, start):
+    """Record the milliseconds elapsed since start under name"""
+    samples = _samples.setdefault(name, deque(maxlen=MAX_SAMPLES))
+    samples.append((time.perf_counter() - start) * 1000)
+
+def summary(name):
+    """Return count, p50, p95 and max for a metric"""
+    samples = sorted(_samples.get(name, ()))
+    if not samples:
+        return None
+    return {
+        'count': len(samples),
+        'p50_ms': samples[len(samples) // 2],
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'max_ms': samples[-1],
+    }
+
+def report():
+    """Print a summary of all recorded metrics"""
+    print(f"{'metric':<28} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for name in sorted(_samples):
+        s = summary(name)
+        print(f"{name:<28} {s['count']:>6} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['max_ms']:>9.1f}")
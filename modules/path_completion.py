@@ -0,0 +1,99 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+
+MAX_DIRECTORIES = 64    # directory listings kept in memory
+RECHECK_INTERVAL = 1.0  # seconds before a cached listing's mtime is checked again
+
+class _Listing:
+    __slots__ = ('mtime', 'names', 'directories', 'checked')
+
+    def __init__(self, mtime, names, directories):
+        self.mtime = mtime
+        self.names = names              # sorted, so prefixes are found with bisect
+        self.directories = directories
+        self.checked = time.monotonic()
+
+class PathCompleter:
+    """Completes path-like words against the pane's working directory"""
+    def __init__(self, max_directories=MAX_DIRECTORIES):
+        self.max_directories = max_directories
+        self.listings = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def looks_like_path(word):
+        return '/' in word or word.startswith(('~', '.'))
+
+    def listing(self, directory):
+        """Return the cached listing of a directory, re-reading it only when its mtime changed"""
+        with self.lock:
+            cached = self.listings.get(directory)
+            if cached:
+                self.listings.move_to_end(directory)
+                if time.monotonic() - cached.checked < RECHECK_INTERVAL:
+                    return cached
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+        if cached and cached.mtime == mtime:
+            cached.checked = time.monotonic()
+            return cached
+
+        names = []
+        directories = set()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    names.append(entry.name)
+                    try:
+                        if entry.is_dir():
+                            directories.add(entry.name)
+                    except OSError:
+                        pass
+        except OSError:
+            return None
+        names.sort()
+        listing = _Listing(mtime, names, directories)
+        with self.lock:
+            self.listings[directory] = listing
+            self.listings.move_to_end(directory)
+            while len(self.listings) > self.max_directories:
+                self.listings.popitem(last=False)
+        return listing
+
+    def lookup(self, word, cwd):
+        """Return the first entry completing word, with a trailing / for directories"""
+        head, base = os.path.split(word)
+        directory = os.path.join(cwd, os.path.expanduser(head) if head else '.')
+        listing = self.listing(os.path.normpath(directory))
+        if listing is None:
+            return None
+        names = listing.names
+        i = bisect_left(names, base)
+        while i < len(names) and names[i].startswith(base):
+            name = names[i]
+            i += 1
+            if name.startswith('.') and not base.startswith('.'):
+                continue
+            if name in listing.directories:
+                name += '/'
+            if name != base:
+                return os.path.join(head, name)
+        return None
+
+    def complete(self, line, context=None):
+        """Completion provider for the path being typed as the last word"""
+        cwd = (context or {}).get('cwd')
+        words = line.split(' ')
+        word = words[-1]
+        # Arguments complete to files like bash's default, a command only when it is a path
+        if not cwd or not word or word.startswith('-'):
+            return None
+        if len(words) == 1 and not self.looks_like_path(word):
+            return None
+        path = self.lookup(word, cwd)
+        return line[:len(line) - len(word)] + path if path else None
@@ -1,11 +1,18 @@
 import gi
 import os
+import ast
 import json
 import importlib
-import inspect
-from typing import Dict, List, Optional, Any
+import importlib.util
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Union
 gi.require_version('Gtk', '3.0')
 from gi.repository import Gtk, GLib
+from modules.services import Services
+
+# Attributes read from a plugin's source without importing it
+MANIFEST_FIELDS = ('name', 'description', 'version', 'author', 'settings',
+                   'dependencies', 'categories', 'tags')
 
 class Plugin:
     """Base class for all plugins"""
@@ -25,9 +32,17 @@ class Plugin:
         pass
         
     def on_disable(self, parent_window):
-        """Called when the plugin is disabled"""
+        """Called when the plugin is disabled, once for every open window
+
+        This may include windows that never went through on_enable or
+        on_window_added, such as one opened before the plugins were loaded.
+        """
         pass
         
+    def on_window_added(self, parent_window):
+        """Called for each window other than the one passed to on_enable, open or opened later"""
+        self.on_enable(parent_window)
+        
     def on_settings_changed(self, settings):
         """Called when plugin settings are changed"""
         self.settings.update(settings)
@@ -36,14 +51,73 @@ class Plugin:
         """Return a widget for plugin settings"""
         return None
 
+class PluginManifest:
+    """Plugin metadata collected by a static scan, stands in until import"""
+    def __init__(self, filename, class_name, metadata):
+        self.filename = filename
+        self.class_name = class_name
+        self.name = metadata.get('name', class_name)
+        self.description = metadata.get('description', "")
+        self.version = metadata.get('version', "1.0")
+        self.author = metadata.get('author', "HyxTerminal Team")
+        self.enabled = False
+        self.settings = dict(metadata.get('settings', {}))
+        self.dependencies = list(metadata.get('dependencies', []))
+        self.categories = list(metadata.get('categories', []))
+        self.tags = list(metadata.get('tags', []))
+
+def scan_plugin_file(path):
+    """Find Plugin subclasses in a source file and their literal metadata"""
+    with open(path, 'r') as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    classes = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        base_names = {base.id if isinstance(base, ast.Name) else getattr(base, 'attr', None)
+                      for base in node.bases}
+        if 'Plugin' not in base_names:
+            continue
+
+        # Class attributes first, then literal assignments in __init__
+        assignments = []
+        for item in node.body:
+            if isinstance(item, ast.Assign):
+                assignments.extend((target.id, item.value) for target in item.targets
+                                   if isinstance(target, ast.Name))
+            elif isinstance(item, ast.FunctionDef) and item.name == '__init__':
+                for stmt in item.body:
+                    if isinstance(stmt, ast.Assign):
+                        assignments.extend(
+                            (target.attr, stmt.value) for target in stmt.targets
+                            if isinstance(target, ast.Attribute)
+                            and isinstance(target.value, ast.Name) and target.value.id == 'self'
+                        )
+
+        metadata = {}
+        for attr, value in assignments:
+            if attr in MANIFEST_FIELDS:
+                try:
+                    metadata[attr] = ast.literal_eval(value)
+                except (ValueError, TypeError):
+                    pass
+        classes.append({'class_name': node.name, 'metadata': metadata})
+    return classes
+
 class PluginManager:
     """Manages plugin loading, unloading, and state"""
     def __init__(self, parent_window):
         self.parent_window = parent_window
-        self.plugins: Dict[str, Plugin] = {}
+        self.plugins: Dict[str, Union[Plugin, PluginManifest]] = {}
         self.loaded_plugins: Dict[str, Plugin] = {}
+        self.modules = {}
         self.plugin_dir = os.path.join(os.path.dirname(__file__), "plugins")
-        self.settings_file = os.path.join(os.path.dirname(__file__), "plugin_settings.json")
+        self.settings_file = os.environ.get(
+            'HYXTERMINAL_PLUGIN_SETTINGS',
+            os.path.join(os.path.dirname(__file__), "plugin_settings.json")
+        )
+        self.index_file = Path.home() / '.cache' / 'hyxterminal' / 'plugin_index.json'
         self.load_settings()
         
     def load_settings(self):
@@ -65,59 +139,106 @@ class PluginManager:
         with open(self.settings_file, 'w') as f:
             json.dump(settings_data, f, indent=4)
             
+    def load_index(self):
+        """Load the cached plugin metadata index"""
+        try:
+            with open(self.index_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_index(self, index):
+        """Save the plugin metadata index"""
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.index_file, 'w') as f:
+                json.dump(index, f, indent=4)
+        except OSError as e:
+            print(f"Error saving plugin index: {e}")
+
     def load_plugins(self):
-        """Load all available plugins"""
+        """Discover plugins from their metadata and import only enabled ones"""
         if not os.path.exists(self.plugin_dir):
             os.makedirs(self.plugin_dir)
             
-        print(f"Loading plugins from: {self.plugin_dir}")
-        plugin_files = [f for f in os.listdir(self.plugin_dir) if f.endswith('.py') and not f.startswith('__')]
-        print(f"Found plugin files: {plugin_files}")
+        plugin_files = sorted(f for f in os.listdir(self.plugin_dir) if f.endswith('.py') and not f.startswith('__'))
+        cached_index = self.load_index()
+        index = {}
             
         for filename in plugin_files:
-            if filename.endswith('.py') and not filename.startswith('__'):
-                try:
-                    print(f"Attempting to load plugin: {filename}")
-                    module_name = f"modules.plugins.{filename[:-3]}"
-                    spec = importlib.util.spec_from_file_location(
-                        module_name,
-                        os.path.join(self.plugin_dir, filename)
-                    )
-                    module = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(module)
-                    
-                    # Find plugin classes in the module
-                    plugin_classes_found = False
-                    for name, obj in inspect.getmembers(module):
-                        if (inspect.isclass(obj) and 
-                            issubclass(obj, Plugin) and 
-                            obj != Plugin):
-                            plugin = obj()
-                            self.plugins[plugin.name] = plugin
-                            plugin_classes_found = True
-                            print(f"Loaded plugin: {plugin.name} from {filename}")
-                            
-                            # Restore plugin state from settings
-                            if plugin.name in self.settings:
-                                plugin.enabled = self.settings[plugin.name].get('enabled', False)
-                                plugin.settings = self.settings[plugin.name].get('settings', {})
-                                
-                            if plugin.enabled:
-                                self.enable_plugin(plugin.name)
-                                
-                    if not plugin_classes_found:
-                        print(f"No plugin classes found in {filename}")
-                except Exception as e:
-                    print(f"Error loading plugin {filename}: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    
+            path = os.path.join(self.plugin_dir, filename)
+            try:
+                stat = os.stat(path)
+                entry = cached_index.get(filename)
+                if not entry or entry.get('mtime') != stat.st_mtime or entry.get('size') != stat.st_size:
+                    entry = {
+                        'mtime': stat.st_mtime,
+                        'size': stat.st_size,
+                        'classes': scan_plugin_file(path)
+                    }
+                index[filename] = entry
+            except (OSError, SyntaxError) as e:
+                print(f"Error scanning plugin {filename}: {e}")
+                continue
+
+            if not entry['classes']:
+                print(f"No plugin classes found in {filename}")
+            for plugin_class in entry['classes']:
+                manifest = PluginManifest(filename, plugin_class['class_name'], plugin_class['metadata'])
+                # Restore plugin state from settings
+                if manifest.name in self.settings:
+                    manifest.enabled = self.settings[manifest.name].get('enabled', False)
+                    manifest.settings.update(self.settings[manifest.name].get('settings', {}))
+                self.plugins[manifest.name] = manifest
+
+        if index != cached_index:
+            self.save_index(index)
+
+        for plugin in list(self.plugins.values()):
+            if plugin.enabled:
+                self.enable_plugin(plugin.name)
+
+    def import_plugin(self, plugin_name: str) -> Optional[Plugin]:
+        """Import the module behind a manifest and replace it with the plugin"""
+        plugin = self.plugins.get(plugin_name)
+        if not isinstance(plugin, PluginManifest):
+            return plugin
+
+        manifest = plugin
+        try:
+            module = self.modules.get(manifest.filename)
+            if module is None:
+                module_name = f"modules.plugins.{manifest.filename[:-3]}"
+                spec = importlib.util.spec_from_file_location(
+                    module_name,
+                    os.path.join(self.plugin_dir, manifest.filename)
+                )
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                self.modules[manifest.filename] = module
+
+            plugin = getattr(module, manifest.class_name)()
+        except Exception as e:
+            print(f"Error loading plugin {manifest.filename}: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+
+        if plugin.name != manifest.name:
+            print(f"Plugin {manifest.class_name} is named {plugin.name!r}, expected {manifest.name!r}")
+        plugin.enabled = manifest.enabled
+        plugin.settings.update(manifest.settings)
+        self.plugins[manifest.name] = plugin
+        return plugin
+
     def enable_plugin(self, plugin_name: str) -> bool:
         """Enable a plugin and its dependencies"""
         if plugin_name not in self.plugins:
             return False
             
-        plugin = self.plugins[plugin_name]
+        plugin = self.import_plugin(plugin_name)
+        if plugin is None:
+            return False
         
         # Check dependencies
         for dep in plugin.dependencies:
@@ -127,6 +248,8 @@ class PluginManager:
                     
         plugin.enabled = True
         plugin.on_enable(self.parent_window)
+        for window in self.other_windows():
+            plugin.on_window_added(window)
         self.loaded_plugins[plugin_name] = plugin
         self.save_settings()
         return True
@@ -139,26 +262,48 @@ class PluginManager:
         plugin = self.loaded_plugins[plugin_name]
         plugin.enabled = False
         plugin.on_disable(self.parent_window)
+        for window in self.other_windows():
+            plugin.on_disable(window)
         del self.loaded_plugins[plugin_name]
         self.save_settings()
         return True
         
+    def other_windows(self):
+        """Open windows besides the active one"""
+        return [window for window in Services.get().windows if window is not self.parent_window]
+        
+    def add_window(self, parent_window):
+        """Attach the enabled plugins to a newly opened window"""
+        for plugin in self.loaded_plugins.values():
+            plugin.on_window_added(parent_window)
+        
+    def set_active_window(self, parent_window):
+        """Make plugins act on the window the user is working in"""
+        self.parent_window = parent_window
+        for plugin in self.loaded_plugins.values():
+            if hasattr(plugin, 'parent_window'):
+                plugin.parent_window = parent_window
+        
     def get_plugin(self, plugin_name: str) -> Optional[Plugin]:
-        """Get a plugin by name"""
-        return self.plugins.get(plugin_name)
+        """Get a plugin by name, importing it if needed"""
+        if plugin_name not in self.plugins:
+            return None
+        return self.import_plugin(plugin_name)
         
     def get_enabled_plugins(self) -> List[Plugin]:
         """Get list of enabled plugins"""
         return list(self.loaded_plugins.values())
         
-    def get_available_plugins(self) -> List[Plugin]:
-        """Get list of all available plugins"""
+    def get_available_plugins(self) -> List[Union[Plugin, PluginManifest]]:
+        """Get list of all available plugins, imported or not"""
         return list(self.plugins.values())
         
     def update_plugin_settings(self, plugin_name: str, settings: Dict[str, Any]):
         """Update settings for a plugin"""
         if plugin_name in self.plugins:
-            plugin = self.plugins[plugin_name]
+            plugin = self.import_plugin(plugin_name)
+            if plugin is None:
+                return False
             plugin.on_settings_changed(settings)
             self.save_settings()
             return True
@@ -170,15 +315,30 @@ class Plugins:
     
     @classmethod
     def initialize(cls, parent_window):
-        """Initialize the plugin manager"""
-        cls._manager = PluginManager(parent_window)
-        cls._manager.load_plugins()
+        """Initialize the plugin manager once per process"""
+        if cls._manager is None:
+            cls._manager = PluginManager(parent_window)
+            cls._manager.load_plugins()
+        else:
+            cls.set_active_window(parent_window)
+        return False
+        
+    @classmethod
+    def set_active_window(cls, parent_window):
+        """Point the shared plugin manager at another window"""
+        if cls._manager:
+            cls._manager.set_active_window(parent_window)
+        
+    @classmethod
+    def add_window(cls, parent_window):
+        """Attach loaded plugins to a new window, windows open before they load are attached then"""
+        if cls._manager:
+            cls._manager.add_window(parent_window)
         
     @classmethod
     def show_plugin_browser(cls, parent_window):
         """Show plugin browser dialog with available plugins"""
-        if not cls._manager:
-            cls.initialize(parent_window)
+        cls.initialize(parent_window)
             
         dialog = Gtk.Dialog(
             title="Plugin Browser",
@@ -476,16 +636,15 @@ class Plugins:
     @classmethod
     def show_command_palette(cls, parent_window):
         """Show command palette dialog"""
-        if not cls._manager:
-            cls.initialize(parent_window)
+        cls.initialize(parent_window)
             
         # Try to find HyxAgent plugin
         ai_plugin = None
         for plugin in cls._manager.get_available_plugins():
             if plugin.name == "HyxAgent":
-                ai_plugin = plugin
                 if not plugin.enabled:
                     cls._manager.enable_plugin(plugin.name)
+                ai_plugin = cls._manager.get_plugin(plugin.name)
                 break
         
         # If we don't have the plugin, try to import it directly
@@ -1,7 +1,6 @@
 import gi
 import os
 import json
-import requests
 import threading
 import logging
 import tempfile
@@ -14,6 +13,7 @@ from gi.repository import Gtk, Gdk, GLib, Vte, Pango
 
 # Import Plugin class directly using a relative import
 from modules.plugins import Plugin
+from modules.services import Services
 
 class HyxAgent(Plugin):
     """HyxAgent plugin for HyxTerminal using Groq API"""
@@ -34,6 +34,7 @@ class HyxAgent(Plugin):
         self.categories = ["AI", "Terminal"]
         self.tags = ["AI", "command", "natural language", "assistant"]
         self.parent_window = None
+        self.key_handlers = {}  # window -> Ctrl+Space handler id
         self.api_key = None
         self.load_api_key()
         
@@ -58,16 +59,27 @@ class HyxAgent(Plugin):
         self.parent_window = parent_window
         
         # Register keyboard shortcut
-        parent_window.connect("key-press-event", self.on_key_press)
+        self.connect_shortcut(parent_window)
         
         # Check if we have an API key
         if not self.api_key:
             self.show_api_key_dialog()
     
+    def on_window_added(self, parent_window):
+        """Register the shortcut in another window, parent_window follows the focused one"""
+        self.connect_shortcut(parent_window)
+    
     def on_disable(self, parent_window):
         """Called when the plugin is disabled"""
-        # Nothing to clean up for now
-        pass
+        handler = self.key_handlers.pop(parent_window, None)
+        if handler is not None:
+            parent_window.disconnect(handler)
+    
+    def connect_shortcut(self, window):
+        if window in self.key_handlers:
+            return
+        self.key_handlers[window] = window.connect("key-press-event", self.on_key_press)
+        window.connect("destroy", lambda w: self.key_handlers.pop(w, None))
     
     def on_settings_changed(self, settings):
         """Called when plugin settings are changed"""
@@ -610,7 +622,8 @@ You excel at understanding terminal output and using it to inform subsequent ste
             "max_tokens": 1000
         }
         
-        response = requests.post(
+        # Reuse the process-wide session so repeated queries keep the connection
+        response = Services.get().get_http_session().post(
             "https://api.groq.com/openai/v1/chat/completions",
             headers=headers,
             json=data
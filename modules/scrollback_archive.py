@@ -0,0 +1,291 @@
+import gzip
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+
+ARCHIVE_DIR = Path.home() / '.local' / 'share' / 'hyxterminal' / 'scrollback'
+SEGMENT_BYTES = 4 * 1024 * 1024    # uncompressed bytes per segment before it is sealed
+
+# Sealed segments are never written again, the open one is renamed when sealed
+SEALED_SEGMENT = re.compile(r'^(\d{6})\.gz$')
+OPEN_SEGMENT = re.compile(r'^(\d{6})\.open\.gz$')
+
+def segment_number(name):
+    match = SEALED_SEGMENT.match(name) or OPEN_SEGMENT.match(name)
+    return int(match.group(1)) if match else None
+
+def list_segments(pane_dir):
+    """Segment paths of a pane in write order, the open one last"""
+    try:
+        names = os.listdir(pane_dir)
+    except OSError:
+        return []
+    segments = [(segment_number(name), name) for name in names]
+    return [os.path.join(pane_dir, name) for number, name in sorted(s for s in segments if s[0] is not None)]
+
+def seal_segment(open_path):
+    """Give an open segment its sealed name without replacing an existing segment
+
+    Returns the sealed path, or None if it could not be sealed.
+    """
+    directory = os.path.dirname(open_path)
+    number = segment_number(os.path.basename(open_path))
+    while True:
+        sealed_path = os.path.join(directory, f'{number:06d}.gz')
+        try:
+            os.link(open_path, sealed_path)
+        except FileExistsError:
+            number += 1
+            continue
+        except OSError as e:
+            print(f"Failed to seal scrollback segment {open_path}: {e}")
+            return None
+        os.unlink(open_path)
+        return sealed_path
+
+def session_alive(session_dir):
+    """Whether the HyxTerminal process named in a session directory still runs"""
+    try:
+        pid = int(os.path.basename(session_dir).rsplit('-', 1)[1])
+    except (IndexError, ValueError):
+        return False
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    # The pid may have been reused by an unrelated process
+    try:
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            return b'hyxterminal' in f.read()
+    except OSError:
+        return True
+
+def read_segment(path):
+    """Yield (timestamp, line) from a segment, stopping quietly at a torn write"""
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8', errors='replace', newline='\n') as f:
+            for entry in f:
+                stamp, _, line = entry.rstrip('\n').partition('\t')
+                yield int(stamp) if stamp.isdigit() else 0, line
+    except (OSError, EOFError) as e:
+        if not isinstance(e, EOFError):
+            print(f"Failed to read scrollback segment {path}: {e}")
+
+def read_pane_meta(pane_dir):
+    try:
+        with open(os.path.join(pane_dir, 'pane.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+class PaneArchive:
+    """Where one pane's lines go; its files are only touched by the writer thread"""
+    def __init__(self, directory, meta):
+        self.directory = directory
+        self.meta = meta
+        self.segment = 0
+        self.written = 0
+        self.sealed = False
+
+    @property
+    def open_path(self):
+        return os.path.join(self.directory, f'{self.segment:06d}.open.gz')
+
+class ScrollbackArchive:
+    """Append-only, gzip compressed scrollback of every pane of this process
+
+    Each pane writes numbered segments under <session>/<pane>/. Lines are
+    stored as "<unix time>\\t<text>", each batch as one gzip member, so a
+    segment can be appended to without rewriting it.
+    """
+    def __init__(self, enabled=False, root=ARCHIVE_DIR):
+        self.enabled = enabled
+        self.root = Path(root)
+        self.session = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.session_dir = self.root / self.session
+        self.pane_count = 0
+        self.queue = queue.Queue()
+        self.thread = None
+        self.sealed_listeners = []
+        self.removed_listeners = []
+
+    def open_pane(self, cwd=None):
+        """Start archiving a new pane, returning its PaneArchive"""
+        self.pane_count += 1
+        directory = str(self.session_dir / f'pane-{self.pane_count:03d}')
+        pane = PaneArchive(directory, {'cwd': cwd, 'started': int(time.time())})
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+        self.queue.put(('open', pane, None))
+        return pane
+
+    def append(self, pane, lines):
+        if lines:
+            self.queue.put(('append', pane, (int(time.time()), lines)))
+
+    def close_pane(self, pane):
+        """Seal the pane's open segment, nothing is appended afterwards"""
+        self.queue.put(('seal', pane, None))
+
+    def shutdown(self):
+        """Write everything queued and seal every pane, waiting for the writer"""
+        if self.thread is not None:
+            self.queue.put(('stop', None, None))
+            self.thread.join(timeout=5)
+            self.thread = None
+
+    def run(self):
+        panes = set()
+        while True:
+            # Everything queued since the last wake-up becomes one member per pane
+            items = [self.queue.get()]
+            while True:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            batches = {}
+            stop = False
+            for action, pane, value in items:
+                if action == 'open':
+                    self.create_pane(pane)
+                    panes.add(pane)
+                elif action == 'append':
+                    batches.setdefault(pane, []).append(value)
+                elif action == 'seal':
+                    self.write(pane, batches.pop(pane, ()))
+                    self.seal(pane)
+                    panes.discard(pane)
+                elif action == 'stop':
+                    stop = True
+            for pane, batch in batches.items():
+                self.write(pane, batch)
+            if stop:
+                for pane in panes:
+                    self.seal(pane)
+                return
+
+    def create_pane(self, pane):
+        try:
+            os.makedirs(pane.directory, exist_ok=True)
+            with open(os.path.join(pane.directory, 'pane.json'), 'w') as f:
+                json.dump(pane.meta, f)
+        except OSError as e:
+            print(f"Failed to create scrollback archive {pane.directory}: {e}")
+
+    def write(self, pane, batch):
+        if not batch or pane.sealed:
+            return
+        data = ''.join(f'{stamp}\t{line}\n' for stamp, lines in batch for line in lines).encode('utf-8', 'replace')
+        try:
+            with open(pane.open_path, 'ab') as f:
+                f.write(gzip.compress(data, compresslevel=6))
+        except OSError as e:
+            print(f"Failed to write scrollback archive {pane.directory}: {e}")
+            return
+        pane.written += len(data)
+        if pane.written >= SEGMENT_BYTES:
+            self.finish_segment(pane)
+            pane.segment += 1
+            pane.written = 0
+
+    def seal(self, pane):
+        if not pane.sealed:
+            pane.sealed = True
+            self.finish_segment(pane)
+
+    def finish_segment(self, pane):
+        """Rename the open segment to its sealed name and tell the listeners"""
+        if not pane.written:
+            return
+        sealed_path = seal_segment(pane.open_path)
+        if sealed_path:
+            # Numbering continues after the name actually used
+            pane.segment = segment_number(os.path.basename(sealed_path))
+            self.notify_sealed(sealed_path)
+
+    def notify_sealed(self, path):
+        for listener in self.sealed_listeners:
+            listener(path)
+
+    def notify_removed(self, path):
+        for listener in self.removed_listeners:
+            listener(path)
+
+    def list_sessions(self):
+        """Archived session directories, newest first"""
+        try:
+            sessions = [entry for entry in os.scandir(self.root) if entry.is_dir()]
+        except OSError:
+            return []
+        return sorted((entry.path for entry in sessions), reverse=True)
+
+    def cleanup(self, max_days=30, max_mb=1024):
+        """Drop sessions older than max_days, then the oldest segments until under max_mb
+
+        Segments left open by a process that did not exit cleanly are sealed
+        first. Sessions of running processes, such as another --standalone
+        instance, keep their open segments and are never removed whole.
+        The removed_listeners are told about every sealed segment deleted.
+        """
+        cutoff = time.time() - max_days * 86400
+        segments = []
+        live_sessions = {session_dir for session_dir in self.list_sessions() if session_alive(session_dir)}
+        live_sessions.add(str(self.session_dir))
+        for session_dir in self.list_sessions():
+            live = session_dir in live_sessions
+            try:
+                newest = max((entry.stat().st_mtime for pane in os.scandir(session_dir) if pane.is_dir()
+                              for entry in os.scandir(pane.path)), default=0)
+            except OSError:
+                continue
+            if newest < cutoff and not live:
+                removed = [path for pane in os.scandir(session_dir) if pane.is_dir()
+                           for path in list_segments(pane.path)]
+                shutil.rmtree(session_dir, ignore_errors=True)
+                for path in removed:
+                    self.notify_removed(path)
+                continue
+            for pane in os.scandir(session_dir):
+                if not pane.is_dir():
+                    continue
+                for path in list_segments(pane.path):
+                    if OPEN_SEGMENT.match(os.path.basename(path)):
+                        if live:
+                            continue
+                        path = seal_segment(path)
+                        if path is None:
+                            continue
+                        self.notify_sealed(path)
+                    try:
+                        segments.append((os.path.getmtime(path), os.path.getsize(path), path))
+                    except OSError:
+                        pass
+
+        total = sum(size for mtime, size, path in segments)
+        limit = max_mb * 1024 * 1024
+        for mtime, size, path in sorted(segments):
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+            self.notify_removed(path)
+
+        for session_dir in self.list_sessions():
+            # Sessions whose segments were all dropped
+            if session_dir not in live_sessions and not any(
+                    list_segments(pane.path) for pane in os.scandir(session_dir) if pane.is_dir()):
+                shutil.rmtree(session_dir, ignore_errors=True)
@@ -0,0 +1,148 @@
+import time
+
+PRESSURE_FILE = '/proc/pressure/memory'
+REBALANCE_INTERVAL = 10      # seconds between rebalances and pressure checks
+IDLE_SECONDS = 300           # panes not focused for this long are idle
+MIN_LINES = 500              # no pane is shrunk below this
+CELL_BYTES = 16              # estimated memory per scrollback cell
+ACTIVE_WEIGHT = 4            # share of a recently used pane relative to an idle one
+RESIZE_THRESHOLD = 0.1       # limits are only changed by more than this fraction
+
+# Budget fraction kept under memory pressure, by "some avg10" percentage
+PRESSURE_LEVELS = ((30.0, 0.25), (10.0, 0.5))
+
+def read_pressure(path=PRESSURE_FILE):
+    """Percentage of the last 10 s some task stalled on memory, or None without PSI"""
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.startswith('some '):
+                    fields = dict(field.split('=') for field in line.split()[1:])
+                    return float(fields['avg10'])
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+def pressure_factor(pressure):
+    for level, factor in PRESSURE_LEVELS:
+        if pressure is not None and pressure >= level:
+            return factor
+    return 1.0
+
+def allocate(panes, budget_bytes, max_lines, min_lines=MIN_LINES):
+    """Split a byte budget into scrollback line limits
+
+    panes is a list of (key, columns, state) with state 'focused', 'active'
+    or 'idle'. The focused pane keeps max_lines; the rest share what is
+    left by weight, active panes getting ACTIVE_WEIGHT shares.
+    """
+    limits = {}
+    remaining = budget_bytes
+    shared = []
+    for key, columns, state in panes:
+        if state == 'focused':
+            limits[key] = max_lines
+            remaining -= max_lines * columns * CELL_BYTES
+        else:
+            shared.append((key, columns, ACTIVE_WEIGHT if state == 'active' else 1))
+    total_weight = sum(weight for key, columns, weight in shared)
+    for key, columns, weight in shared:
+        share = max(0, remaining) * weight / total_weight
+        limits[key] = int(max(min_lines, min(max_lines, share // (columns * CELL_BYTES))))
+    return limits
+
+class ScrollbackBudget:
+    """Keeps the scrollback of all panes within scrollback_budget_mb
+
+    The focused pane gets the full scrollback; other panes share the rest,
+    idle ones the least, and the budget shrinks under memory pressure.
+    """
+    def __init__(self, services, budget_mb=0):
+        self.services = services
+        self.budget_mb = budget_mb
+        self.last_focus = {}
+        self.focused = None
+        self.pressure = None
+        self.limits = {}
+        self.timeout = None
+
+    @property
+    def enabled(self):
+        return self.budget_mb > 0
+
+    @property
+    def budget_bytes(self):
+        return int(self.budget_mb * 1024 * 1024 * pressure_factor(self.pressure))
+
+    def start(self):
+        from gi.repository import GLib
+        if self.enabled and self.timeout is None:
+            self.timeout = GLib.timeout_add_seconds(REBALANCE_INTERVAL, self.on_timeout)
+        return False
+
+    def on_timeout(self):
+        self.pressure = read_pressure()
+        self.rebalance()
+        return True
+
+    def on_focus(self, terminal):
+        """Give a pane the generous limit as soon as it is focused"""
+        if not self.enabled:
+            return False
+        if terminal not in self.last_focus:
+            terminal.connect("destroy", self.forget)
+        self.last_focus[terminal] = time.monotonic()
+        if self.focused is not terminal:
+            self.focused = terminal
+            self.rebalance()
+        return False
+
+    def get_state(self, terminal, now):
+        if terminal is self.focused:
+            return 'focused'
+        if now - self.last_focus.get(terminal, 0) < IDLE_SECONDS:
+            return 'active'
+        return 'idle'
+
+    def rebalance(self):
+        """Recompute every pane's limit, resizing only panes that changed noticeably"""
+        now = time.monotonic()
+        tabs = {terminal: tab for window, tab, terminal in self.services.iter_terminals()}
+        panes = [(terminal, terminal.get_column_count(), self.get_state(terminal, now)) for terminal in tabs]
+        limits = allocate(panes, self.budget_bytes, self.services.get_scrollback_lines())
+        for terminal, lines in limits.items():
+            current = self.limits.get(terminal)
+            if current is None or abs(lines - current) > current * RESIZE_THRESHOLD:
+                if lines < terminal.get_scrollback_lines():
+                    # Rows about to be cut still need to reach the archive
+                    tabs[terminal].flush_archive(terminal)
+                terminal.set_scrollback_lines(lines)
+                self.limits[terminal] = lines
+        for terminal in set(self.limits) - set(limits):
+            self.forget(terminal)
+        return False
+
+    def forget(self, terminal):
+        """Drop a closed pane"""
+        self.limits.pop(terminal, None)
+        self.last_focus.pop(terminal, None)
+        if terminal is self.focused:
+            self.focused = None
+
+    def reapply(self):
+        """Resize every pane again, after something else set their limits"""
+        self.limits.clear()
+        if self.enabled:
+            self.rebalance()
+
+    def usage(self):
+        """Per-pane (window, tab, terminal, state, limit, used lines, estimated bytes)"""
+        now = time.monotonic()
+        rows = []
+        for window, tab, terminal in self.services.iter_terminals():
+            adjustment = terminal.get_vadjustment()
+            used = max(0, int(adjustment.get_upper() - adjustment.get_lower()) - terminal.get_row_count())
+            limit = self.limits.get(terminal, self.services.get_scrollback_lines())
+            rows.append((window, tab, terminal, self.get_state(terminal, now), limit, used,
+                         used * terminal.get_column_count() * CELL_BYTES))
+        return rows
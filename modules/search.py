@@ -0,0 +1,198 @@
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import unicodedata
+
+PROGRESS_LINES = 5000    # lines scanned between progress reports
+MAX_RESULTS = 10000      # matching lines listed, the count covers all of them
+SEARCH_WORKERS = min(4, os.cpu_count() or 1)
+
+def snapshot_scrollback(terminal):
+    """Copy the text of a terminal's scrollback and screen, on the UI thread
+
+    Returns (text, first_row, columns). Wrapped rows come back joined, so row
+    numbers are recovered from line lengths by the search.
+    """
+    adjustment = terminal.get_vadjustment()
+    first_row = int(adjustment.get_lower())
+    last_row = int(adjustment.get_upper()) - 1
+    columns = terminal.get_column_count()
+    content = terminal.get_text_range(first_row, 0, last_row, columns - 1, lambda *args: True)
+    text = content[0] if isinstance(content, tuple) else content
+    return text or "", first_row, columns
+
+def compile_pattern(text, case_sensitive=False, use_regex=False):
+    """Compile the find bar's pattern for Python's re, raising re.error if invalid"""
+    pattern = text if use_regex else re.escape(text)
+    return re.compile(pattern, 0 if case_sensitive else re.IGNORECASE)
+
+def display_width(line):
+    width = 0
+    for char in line:
+        width += 2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1
+    return width
+
+class SearchResult:
+    """Matches of one search: the total count and the first MAX_RESULTS lines"""
+    def __init__(self):
+        self.count = 0
+        self.lines = []       # (row, line number, text)
+        self.scanned = 0
+        self.truncated = False
+
+def search_text(regex, text, first_row, columns, cancelled, progress=None):
+    """Match regex against every line of a snapshot, returning None if cancelled"""
+    lines = text.split('\n')
+    # The snapshot ends with the newline of its last row
+    if lines and lines[-1] == '':
+        lines.pop()
+    columns = max(1, columns)
+    result = SearchResult()
+    row = first_row
+    total = len(lines)
+    for number, line in enumerate(lines):
+        if number % PROGRESS_LINES == 0 and number:
+            if cancelled.is_set():
+                return None
+            if progress:
+                progress(number / total)
+        matches = sum(1 for _ in regex.finditer(line))
+        if matches:
+            result.count += matches
+            if len(result.lines) < MAX_RESULTS:
+                result.lines.append((row, number + 1, line))
+            else:
+                result.truncated = True
+        # A line wider than the terminal was wrapped over several rows
+        width = len(line) if line.isascii() else display_width(line)
+        row += max(1, -(-width // columns))
+    result.scanned = total
+    return result
+
+def scroll_to_row(terminal, row):
+    """Scroll a terminal so an absolute row sits in the middle of the view"""
+    adjustment = terminal.get_vadjustment()
+    page_size = adjustment.get_page_size()
+    value = row - page_size // 2
+    value = max(adjustment.get_lower(), min(value, adjustment.get_upper() - page_size))
+    adjustment.set_value(value)
+
+class FindAllJob:
+    """Runs a pattern over a scrollback snapshot on a worker thread
+
+    on_progress(fraction) and on_done(result) are called through dispatch.
+    """
+    def __init__(self, regex, text, first_row, columns, on_progress, on_done, dispatch=None):
+        if dispatch is None:
+            from gi.repository import GLib
+            dispatch = GLib.idle_add
+        self.regex = regex
+        self.text = text
+        self.first_row = first_row
+        self.columns = columns
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.dispatch = dispatch
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        """Stop the search, on_done is not called afterwards"""
+        self.cancelled.set()
+
+    def run(self):
+        result = search_text(self.regex, self.text, self.first_row, self.columns,
+                             self.cancelled, self.report_fraction)
+        self.text = None
+        if result is not None:
+            self.dispatch(self.report_done, result)
+
+    def report_fraction(self, fraction):
+        self.dispatch(self.report_progress, fraction)
+
+    def report_progress(self, fraction):
+        if not self.cancelled.is_set():
+            self.on_progress(fraction)
+        return False
+
+    def report_done(self, result):
+        if not self.cancelled.is_set():
+            self.on_done(result)
+        return False
+
+class GlobalSearch:
+    """Searches many terminals at once, one snapshot per pane
+
+    Snapshots are taken one pane per idle callback so the UI keeps drawing,
+    and each is matched on a shared worker pool. on_result(key, result) is
+    called through dispatch as each pane finishes, then on_done().
+    """
+    executor = None
+
+    def __init__(self, regex, panes, on_result, on_done, dispatch=None):
+        if dispatch is None:
+            from gi.repository import GLib
+            dispatch = GLib.idle_add
+        self.regex = regex
+        self.panes = list(panes)        # (key, terminal)
+        self.on_result = on_result
+        self.on_done = on_done
+        self.dispatch = dispatch
+        self.cancelled = threading.Event()
+        self.pending = len(self.panes)
+        self.finished = 0
+
+    @classmethod
+    def get_executor(cls):
+        if cls.executor is None:
+            cls.executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS,
+                                              thread_name_prefix="search")
+        return cls.executor
+
+    def start(self):
+        if not self.panes:
+            self.dispatch(self.report_done)
+        else:
+            self.dispatch(self.snapshot_next)
+        return self
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def snapshot_next(self):
+        """Copy one pane and hand it to the pool, then yield to the main loop"""
+        if self.cancelled.is_set() or not self.panes:
+            return False
+        key, terminal = self.panes.pop(0)
+        try:
+            text, first_row, columns = snapshot_scrollback(terminal)
+        except Exception as e:
+            print(f"Failed to read terminal for search: {e}")
+            text, first_row, columns = "", 0, 1
+        self.get_executor().submit(self.search_pane, key, text, first_row, columns)
+        return bool(self.panes)
+
+    def search_pane(self, key, text, first_row, columns):
+        result = search_text(self.regex, text, first_row, columns, self.cancelled)
+        if result is not None:
+            self.dispatch(self.report_result, key, result)
+
+    def report_result(self, key, result):
+        if self.cancelled.is_set():
+            return False
+        self.finished += 1
+        if result.count:
+            self.on_result(key, result)
+        if self.finished == self.pending:
+            self.report_done()
+        return False
+
+    def report_done(self):
+        if not self.cancelled.is_set():
+            self.on_done()
+        return False
@@ -0,0 +1,236 @@
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from modules.scrollback_archive import (ARCHIVE_DIR, SEALED_SEGMENT, OPEN_SEGMENT, list_segments, read_segment,
+                                       session_alive)
+
+INDEX_FILE = 'index.sqlite3'
+INDEX_WORKERS = min(4, os.cpu_count() or 1)
+
+def parse_segment(path):
+    """Decompress a segment into (stamp, line) rows, run in an index worker"""
+    return path, [(stamp, line) for stamp, line in read_segment(path) if line.strip()]
+
+def segment_location(path):
+    """(session, pane) names of a segment path"""
+    pane_dir = os.path.dirname(path)
+    return os.path.basename(os.path.dirname(pane_dir)), os.path.basename(pane_dir)
+
+class SearchIndex:
+    """Full-text index of sealed scrollback segments, in SQLite next to the archive
+
+    Uses an FTS5 trigram table, so any substring of three or more characters
+    is looked up in the index. Without FTS5 the lines are stored in a plain
+    table and searched with LIKE.
+    """
+    def __init__(self, root=ARCHIVE_DIR):
+        self.root = str(root)
+        self.path = os.path.join(self.root, INDEX_FILE)
+        self.db = None
+        self.fts = False
+        self.lock = threading.Lock()
+        self.pending = queue.Queue()
+        self.thread = None
+
+    def connect(self):
+        if self.db is not None:
+            return self.db
+        os.makedirs(self.root, exist_ok=True)
+        self.db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS segments (
+                               path TEXT PRIMARY KEY, session TEXT, pane TEXT,
+                               first_row INTEGER, last_row INTEGER)""")
+        try:
+            self.db.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS lines
+                               USING fts5(text, stamp UNINDEXED, segment UNINDEXED, tokenize='trigram')""")
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5, or older than the trigram tokenizer
+            self.db.execute("""CREATE TABLE IF NOT EXISTS lines_plain (
+                                   text TEXT, stamp INTEGER, segment TEXT)""")
+        self.db.commit()
+        return self.db
+
+    @property
+    def table(self):
+        return "lines" if self.fts else "lines_plain"
+
+    def close(self):
+        self.stop()
+        # A segment still being inserted finishes on its own, the next run catches up
+        if self.db is not None and self.thread is None:
+            self.db.close()
+            self.db = None
+
+    def start(self):
+        """Index segments queued with add() on a background thread"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """Stop the indexer, leaving queued segments for the next update()"""
+        if self.thread is not None:
+            self.pending.put(None)
+            self.thread.join(timeout=5)
+            if not self.thread.is_alive():
+                self.thread = None
+
+    def add(self, path):
+        """Queue a sealed segment, safe to call from any thread"""
+        self.pending.put(path)
+
+    def remove(self, path):
+        """Forget a deleted segment, safe to call from any thread"""
+        try:
+            with self.lock:
+                db = self.connect()
+                row = db.execute("SELECT first_row, last_row FROM segments WHERE path = ?", (path,)).fetchone()
+                if row:
+                    self.drop_segment(db, path, *row)
+                    db.commit()
+        except sqlite3.Error as e:
+            # update() drops it on the next start
+            print(f"Failed to remove {path} from the search index: {e}")
+
+    def drop_segment(self, db, path, first_row, last_row):
+        db.execute(f"DELETE FROM {self.table} WHERE rowid BETWEEN ? AND ?", (first_row, last_row))
+        db.execute("DELETE FROM segments WHERE path = ?", (path,))
+
+    def run(self):
+        # Catch up with segments sealed while no index was running
+        self.update()
+        with ThreadPoolExecutor(max_workers=INDEX_WORKERS, thread_name_prefix="index") as executor:
+            while True:
+                paths = [self.pending.get()]
+                while True:
+                    try:
+                        paths.append(self.pending.get_nowait())
+                    except queue.Empty:
+                        break
+                if None in paths:
+                    return
+                self.index_segments(paths, executor)
+
+    def index_segments(self, paths, executor):
+        """Parse segments in parallel and insert them, one transaction per segment"""
+        with self.lock:
+            db = self.connect()
+            known = {row[0] for row in db.execute("SELECT path FROM segments")}
+        paths = [path for path in dict.fromkeys(paths) if path not in known]
+        for path, rows in executor.map(parse_segment, paths):
+            session, pane = segment_location(path)
+            with self.lock:
+                # Another process (the command line query) may have indexed it meanwhile
+                db.execute("BEGIN IMMEDIATE")
+                if db.execute("SELECT 1 FROM segments WHERE path = ?", (path,)).fetchone():
+                    db.rollback()
+                    continue
+                # Each segment owns a rowid range, so it can be dropped without a scan
+                first_row = db.execute("SELECT coalesce(max(last_row), 0) FROM segments").fetchone()[0] + 1
+                db.executemany(f"INSERT INTO {self.table} (rowid, text, stamp, segment) VALUES (?, ?, ?, ?)",
+                               [(first_row + i, line, stamp, path) for i, (stamp, line) in enumerate(rows)])
+                db.execute("INSERT INTO segments VALUES (?, ?, ?, ?, ?)",
+                           (path, session, pane, first_row, first_row + len(rows) - 1))
+                db.commit()
+        return len(paths)
+
+    def sealed_segments(self):
+        """Every sealed segment in the archive"""
+        paths = []
+        try:
+            sessions = [entry.path for entry in os.scandir(self.root) if entry.is_dir()]
+        except OSError:
+            return paths
+        for session_dir in sessions:
+            for pane in os.scandir(session_dir):
+                if pane.is_dir():
+                    paths += [path for path in list_segments(pane.path)
+                              if SEALED_SEGMENT.match(os.path.basename(path))]
+        return paths
+
+    def update(self, processes=False):
+        """Index new sealed segments and forget deleted ones, returning how many were added
+
+        processes parses in worker processes instead of threads, for large
+        catch-ups from the command line.
+        """
+        on_disk = set(self.sealed_segments())
+        with self.lock:
+            db = self.connect()
+            gone = [row for row in db.execute("SELECT path, first_row, last_row FROM segments")
+                    if row[0] not in on_disk]
+            for path, first_row, last_row in gone:
+                self.drop_segment(db, path, first_row, last_row)
+            db.commit()
+        executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        with executor_class(max_workers=INDEX_WORKERS) as executor:
+            return self.index_segments(sorted(on_disk), executor)
+
+    def search(self, pattern, limit=100):
+        """Newest indexed lines containing pattern, as (session, pane, stamp, line)"""
+        if not pattern:
+            return []
+        with self.lock:
+            db = self.connect()
+            if self.fts and len(pattern) >= 3:
+                query = '"' + pattern.replace('"', '""') + '"'
+                rows = db.execute("SELECT segment, stamp, text FROM lines WHERE lines MATCH ? "
+                                  "ORDER BY rowid DESC LIMIT ?", (query, limit)).fetchall()
+            else:
+                like = '%' + pattern.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+                rows = db.execute(f"SELECT segment, stamp, text FROM {self.table} WHERE text LIKE ? ESCAPE '\\' "
+                                  "ORDER BY rowid DESC LIMIT ?", (like, limit)).fetchall()
+        return [(*segment_location(path), stamp, line) for path, stamp, line in rows]
+
+    def search_open_segments(self, pattern, limit=100):
+        """Lines containing pattern in segments still being written, which are not indexed yet
+
+        Only sessions of running processes are read. Segments left open by a
+        crashed process are sealed and indexed by the next cleanup.
+        """
+        needle = pattern.lower()
+        results = []
+        try:
+            sessions = [entry.path for entry in os.scandir(self.root) if entry.is_dir()]
+        except OSError:
+            return results
+        for session_dir in filter(session_alive, sessions):
+            for pane in os.scandir(session_dir):
+                if not pane.is_dir():
+                    continue
+                for path in list_segments(pane.path):
+                    if OPEN_SEGMENT.match(os.path.basename(path)):
+                        session, pane_name = segment_location(path)
+                        results += [(session, pane_name, stamp, line) for stamp, line in read_segment(path)
+                                    if needle in line.lower()]
+        results.sort(key=lambda result: result[2], reverse=True)
+        return results[:limit]
+
+def format_result(session, pane, stamp, line):
+    return f"{session}\t{pane}\t{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stamp))}\t{line}"
+
+def main(pattern, limit=50):
+    """Command line query: bring the index up to date, then print matching lines"""
+    index = SearchIndex()
+    started = time.perf_counter()
+    try:
+        added = index.update(processes=True)
+        results = index.search_open_segments(pattern, limit) + index.search(pattern, limit)
+    except sqlite3.Error as e:
+        print(f"Failed to search the scrollback archive: {e}")
+        return 1
+    finally:
+        index.close()
+    results.sort(key=lambda result: result[2], reverse=True)
+    for result in results[:limit]:
+        print(format_result(*result))
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"{min(len(results), limit)} lines ({added} new segments indexed, {elapsed:.0f} ms)", file=sys.stderr)
+    return 0 if results else 1
@@ -0,0 +1,187 @@
+import threading
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import Gtk, GLib
+
+import modules.config as config
+from modules.plugin_manager import PluginManager
+from modules.shell_pool import ShellPool
+from modules.command_index import CommandIndex
+from modules.completion import CompletionEngine
+from modules.shell_integration import ShellIntegration
+from modules.history import HistoryIndex
+from modules.flag_cache import FlagCache
+from modules.path_completion import PathCompleter
+from modules.scrollback_archive import ScrollbackArchive
+from modules.search_index import SearchIndex
+from modules.scrollback_budget import ScrollbackBudget
+from modules import startup_profiler as profiler
+
+PANED_CSS = b"""
+paned separator {
+    background-color: rgba(200, 200, 200, 0.5);
+    min-width: 3px;
+    min-height: 3px;
+}
+"""
+
+class Services:
+    """Process-wide state shared by every HyxTerminal window"""
+    _instance = None
+
+    @classmethod
+    def get(cls):
+        """Return the shared services, creating them on first use"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def shutdown_shared(cls):
+        """Release process-wide resources that outlive the windows"""
+        if cls._instance is not None:
+            cls._instance.shell_integration.shutdown()
+            cls._instance.scrollback_archive.shutdown()
+            if cls._instance.search_index:
+                cls._instance.search_index.close()
+
+    def __init__(self):
+        self.config = config.load_config()
+        self.plugin_settings = PluginManager()
+        self.windows = []
+        self.active_window = None
+        self.started = False
+        self.http_session = None
+        self.command_index = CommandIndex()
+        self.shell_integration = ShellIntegration(self.config.get('shell_integration', False))
+        self.history = HistoryIndex(max_entries=self.config.get('history_max_entries', 20000))
+        providers = [self.history.complete]
+        if self.config.get('flag_hints', True):
+            self.flag_cache = FlagCache(help_fallback=self.config.get('flag_help_fallback', False))
+            providers.append(self.flag_cache.complete)
+        self.paths = PathCompleter()
+        providers += [self.paths.complete, self.shell_integration.complete, self.command_index.complete]
+        self.completion = CompletionEngine(providers)
+        self.scrollback_archive = ScrollbackArchive(self.config.get('scrollback_archive', False))
+        self.search_index = None
+        if self.scrollback_archive.enabled:
+            self.search_index = SearchIndex(self.scrollback_archive.root)
+            self.scrollback_archive.sealed_listeners.append(self.search_index.add)
+            self.scrollback_archive.removed_listeners.append(self.search_index.remove)
+        self.scrollback_budget = ScrollbackBudget(self, self.config.get('scrollback_budget_mb', 0))
+
+        # One provider per style, updated in place so every window follows
+        self.theme_css = Gtk.CssProvider()
+        self.paned_css = Gtk.CssProvider()
+        self.paned_css.load_from_data(PANED_CSS)
+        self.update_theme_css()
+
+    @property
+    def shell_pool(self):
+        return ShellPool.shared(self.config, self.shell_integration)
+
+    def update_theme_css(self):
+        """Regenerate the menubar and notebook styles from the config"""
+        bg_color = self.config.get('background_color', '#000000')
+        fg_color = self.config.get('foreground_color', '#FFFFFF')
+        self.theme_css.load_from_data(f"""
+        menubar {{
+            background-color: {bg_color};
+            color: {fg_color};
+        }}
+        notebook {{
+            background-color: {bg_color};
+        }}
+        notebook tab {{
+            background-color: {bg_color};
+            color: {fg_color};
+            padding: 4px;
+        }}
+        notebook tab:checked {{
+            background-color: shade({bg_color}, 1.2);
+        }}
+        """.encode())
+
+    def register_window(self, window):
+        """Track a window so shared state can follow the focused one"""
+        self.windows.append(window)
+        if not self.started:
+            # Once per process, the --server daemon outlives its windows
+            self.started = True
+            self.active_window = window
+            # Load enabled plugins once, after the first window is up
+            GLib.idle_add(self.load_plugins)
+            GLib.idle_add(self.start_command_index, priority=GLib.PRIORITY_LOW)
+            GLib.idle_add(self.shell_integration.watch, priority=GLib.PRIORITY_LOW)
+            GLib.idle_add(self.scrollback_budget.start, priority=GLib.PRIORITY_LOW)
+            if self.scrollback_archive.enabled:
+                GLib.idle_add(self.start_archive_maintenance, priority=GLib.PRIORITY_LOW)
+        else:
+            from modules.plugins import Plugins
+            if self.active_window is None:
+                # Every window was closed, plugins still point at the last one
+                self.set_active_window(window)
+            Plugins.add_window(window)
+        window.connect("focus-in-event", lambda w, e: self.set_active_window(w))
+        window.connect("destroy", self.unregister_window)
+
+    def unregister_window(self, window):
+        if window in self.windows:
+            self.windows.remove(window)
+        if self.active_window is window:
+            self.active_window = self.windows[-1] if self.windows else None
+            if self.active_window:
+                self.set_active_window(self.active_window)
+
+    def iter_terminals(self):
+        """Yield (window, tab, terminal) for every pane of every window"""
+        for window in self.windows:
+            for i in range(window.notebook.get_n_pages()):
+                tab = window.notebook.get_nth_page(i)
+                for terminal in tab.terminals:
+                    yield window, tab, terminal
+
+    def set_active_window(self, window):
+        """Point plugins at the window the user is working in"""
+        from modules.plugins import Plugins
+
+        self.active_window = window
+        Plugins.set_active_window(window)
+        return False
+
+    def load_plugins(self):
+        from modules.plugins import Plugins
+
+        if self.active_window:
+            with profiler.phase("load plugins"):
+                Plugins.initialize(self.active_window)
+        return False
+
+    def start_command_index(self):
+        """Build the command hint indexes off the main thread"""
+        self.command_index.start()
+        threading.Thread(target=self.history.refresh, args=(True,), daemon=True).start()
+        return False
+
+    def start_archive_maintenance(self):
+        """Apply the archive's age and size limits, then index it, off the main thread"""
+        def maintain():
+            self.scrollback_archive.cleanup(self.config.get('scrollback_archive_max_days', 30),
+                                            self.config.get('scrollback_archive_max_mb', 1024))
+            self.search_index.start()
+        threading.Thread(target=maintain, daemon=True).start()
+        return False
+
+    def get_scrollback_lines(self):
+        """Scrollback kept in memory per pane, smaller when the archive holds the rest"""
+        lines = self.config.get('scrollback_lines', 10000)
+        if self.scrollback_archive.enabled:
+            lines = min(lines, self.config.get('scrollback_archive_memory_lines', 2000))
+        return lines
+
+    def get_http_session(self):
+        """Return a shared requests session so plugins reuse connections"""
+        if self.http_session is None:
+            import requests
+            self.http_session = requests.Session()
+        return self.http_session
@@ -0,0 +1,135 @@
+import json
+import os
+from pathlib import Path
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import GLib
+
+SESSION_VERSION = 1
+SAVE_DELAY = 2        # seconds to coalesce bursts of layout changes
+POLL_INTERVAL = 30    # working directory changes are not signalled, poll for them
+
+class Session:
+    """Snapshots open windows to a session file and restores them on startup"""
+    _windows = []
+    _save_id = None
+    _poll_id = None
+    _last_saved = None
+    _closed = False
+
+    @staticmethod
+    def get_session_file():
+        return Path.home() / '.config' / 'hyxterminal' / 'session.json'
+
+    @classmethod
+    def load(cls):
+        """Return the saved session, or None if there is nothing to restore"""
+        try:
+            with open(cls.get_session_file()) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != SESSION_VERSION or not data.get('windows'):
+            return None
+        cls._last_saved = json.dumps(data, separators=(',', ':'))
+        return data
+
+    @classmethod
+    def track(cls, window):
+        """Include a window in the session and watch it for changes"""
+        cls._windows.append(window)
+        window.connect("delete-event", cls.on_window_delete)
+        window.connect("destroy", cls.on_window_destroy)
+        for signal in ("page-added", "page-removed", "page-reordered", "switch-page"):
+            window.notebook.connect(signal, lambda *args: cls.schedule_save())
+        if cls._poll_id is None:
+            cls._poll_id = GLib.timeout_add_seconds(POLL_INTERVAL, cls.on_poll)
+        cls.schedule_save()
+
+    @classmethod
+    def on_window_delete(cls, window, event):
+        # Keep the layout of the last window the user closes, even one without tabs
+        if cls._windows == [window]:
+            cls.save(allow_empty=True)
+        return False
+
+    @classmethod
+    def on_window_destroy(cls, window):
+        if window in cls._windows:
+            cls._windows.remove(window)
+        cls.save()
+
+    @classmethod
+    def close(cls):
+        """Write a final snapshot and stop saving, used when the app exits"""
+        cls.save()
+        cls._closed = True
+
+    @classmethod
+    def on_poll(cls):
+        cls.save()
+        return True
+
+    @classmethod
+    def schedule_save(cls):
+        """Save after a short delay, coalescing repeated changes"""
+        if cls._save_id is None:
+            cls._save_id = GLib.timeout_add_seconds(SAVE_DELAY, cls.on_save_timeout)
+
+    @classmethod
+    def on_save_timeout(cls):
+        cls._save_id = None
+        cls.save()
+        return False
+
+    @classmethod
+    def save(cls, allow_empty=False):
+        """Write the session file if the snapshot changed
+
+        A snapshot without any tab is only written with allow_empty. When the
+        last shells exit their window goes away without being closed by the
+        user, and the layout they ran in is kept for the next start.
+        """
+        if cls._closed:
+            return
+        data = {
+            'version': SESSION_VERSION,
+            'windows': [cls.snapshot_window(window) for window in cls._windows]
+        }
+        if not allow_empty and not any(window['tabs'] for window in data['windows']):
+            return
+        text = json.dumps(data, separators=(',', ':'))
+        if text == cls._last_saved:
+            return
+        path = cls.get_session_file()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+            cls._last_saved = text
+        except OSError as e:
+            print(f"Error saving session: {e}")
+
+    @staticmethod
+    def snapshot_window(window):
+        """Describe the tabs of one window"""
+        notebook = window.notebook
+        tabs = []
+        for i in range(notebook.get_n_pages()):
+            tab = notebook.get_nth_page(i)
+            layout = tab.get_layout_tree()
+            if layout is None:
+                continue
+            tabs.append({
+                'title': notebook.get_tab_label(tab).label.get_text(),
+                'layout': layout
+            })
+        width, height = window.get_size()
+        return {
+            'width': width,
+            'height': height,
+            'current_tab': max(0, notebook.get_current_page()),
+            'tabs': tabs
+        }
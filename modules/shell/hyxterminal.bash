@@ -0,0 +1,81 @@
+# HyxTerminal shell integration, loaded with bash --rcfile
+#
+# Runs the usual startup files, then reports to HyxTerminal through files in
+# $HYXTERMINAL_RUNTIME_DIR named after $HYXTERMINAL_SESSION_ID:
+#
+#   .vocab   the names this shell can complete (aliases, functions, builtins,
+#            keywords and variables), rewritten whenever they change
+#   .events  one line per event, appended:
+#              D <status> <command>   a command line finished, <command> is
+#                                     empty if it was not added to the history
+#              A <prompt>             a prompt was drawn, <prompt> is its last line
+#
+# The prompt also carries OSC 133 A/B/C marks for terminals that read them.
+# Only builtins are used so a prompt never forks.
+
+[ -r /etc/bash.bashrc ] && . /etc/bash.bashrc
+[ -r ~/.bashrc ] && . ~/.bashrc
+
+if [ -n "$HYXTERMINAL_SESSION_ID" ] && [ -d "$HYXTERMINAL_RUNTIME_DIR" ]; then
+    __hyx_vocab_file="$HYXTERMINAL_RUNTIME_DIR/$HYXTERMINAL_SESSION_ID.vocab"
+    __hyx_events_file="$HYXTERMINAL_RUNTIME_DIR/$HYXTERMINAL_SESSION_ID.events"
+    __hyx_vocab_last=
+    __hyx_status=0
+    __hyx_histcmd=
+
+    __hyx_vocab_build() {
+        printf '%s\n' '#alias'
+        compgen -a
+        printf '%s\n' '#function'
+        compgen -A function
+        printf '%s\n' '#builtin'
+        compgen -b
+        compgen -k
+        printf '%s\n' '#variable'
+        compgen -v
+    }
+
+    # First in PROMPT_COMMAND, so $? is still the status of the command line
+    __hyx_precmd() {
+        __hyx_status=$?
+        # PS0 sets __hyx_running when a command line is executed
+        if [ -n "$__hyx_running" ]; then
+            unset __hyx_running
+            {
+                printf 'D %s ' "$__hyx_status"
+                # A line left out by HISTCONTROL or HISTIGNORE does not move
+                # HISTCMD, and fc would report the line before it
+                if [ "$HISTCMD" != "$__hyx_histcmd" ]; then
+                    HISTTIMEFORMAT= fc -ln -1 2>/dev/null || printf '\n'
+                else
+                    printf '\n'
+                fi
+            } >> "$__hyx_events_file"
+        fi
+        __hyx_histcmd=$HISTCMD
+        # The user's PROMPT_COMMAND runs next and may read $?
+        return $__hyx_status
+    }
+
+    # Last in PROMPT_COMMAND, so PS1 is final
+    __hyx_prompt() {
+        local __hyx_vocab __hyx_ps1
+        __hyx_vocab_build > "$__hyx_vocab_file.tmp" 2>/dev/null
+        IFS= read -r -d '' __hyx_vocab < "$__hyx_vocab_file.tmp"
+        if [ "$__hyx_vocab" != "$__hyx_vocab_last" ]; then
+            __hyx_vocab_last=$__hyx_vocab
+            printf '%s' "$__hyx_vocab" > "$__hyx_vocab_file"
+        fi
+
+        case "$PS1" in
+            *'133;A'*) ;;
+            *) PS1='\[\e]133;A\a\]'"$PS1"'\[\e]133;B\a\]' ;;
+        esac
+        __hyx_ps1=${PS1@P}
+        printf 'A %s\n' "${__hyx_ps1##*$'\n'}" >> "$__hyx_events_file"
+        return $__hyx_status
+    }
+
+    PS0+='\e]133;C;${__hyx_running:=1}\a'
+    PROMPT_COMMAND="__hyx_precmd;${PROMPT_COMMAND:+$PROMPT_COMMAND;}__hyx_prompt"
+fi
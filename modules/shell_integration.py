@@ -0,0 +1,200 @@
+import itertools
+import os
+import re
+import shutil
+import threading
+from bisect import bisect_left
+from pathlib import Path
+
+SNIPPET = Path(__file__).parent / 'shell' / 'hyxterminal.bash'
+
+# Non-printing parts of an expanded prompt: \[...\] regions and escape sequences
+INVISIBLE = re.compile(r'\x01[^\x02]*\x02|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)|\x1b\[[0-9;?]*[A-Za-z]')
+
+def get_runtime_dir():
+    """Directory the integrated shells write their side-channel files to"""
+    base = os.environ.get('XDG_RUNTIME_DIR')
+    if base:
+        return os.path.join(base, 'hyxterminal', str(os.getpid()))
+    return os.path.join('/tmp', f'hyxterminal-{os.getuid()}', str(os.getpid()))
+
+class ShellVocabulary:
+    """Names one live shell can complete, as last reported by the shell"""
+    def __init__(self, sections):
+        self.sections = sections
+        # Shell definitions shadow PATH, so commands are looked up here first
+        self.commands = sorted(set(sections.get('alias', ())) | set(sections.get('function', ()))
+                               | set(sections.get('builtin', ())))
+        self.variables = sorted(sections.get('variable', ()))
+
+    @classmethod
+    def parse(cls, text):
+        sections = {}
+        current = None
+        for line in text.splitlines():
+            if line.startswith('#'):
+                current = sections.setdefault(line[1:], [])
+            elif current is not None and line and not line.startswith('__hyx'):
+                current.append(line)
+        return cls(sections)
+
+    @staticmethod
+    def first_match(names, prefix):
+        i = bisect_left(names, prefix)
+        while i < len(names) and names[i].startswith(prefix):
+            if names[i] != prefix:
+                return names[i]
+            i += 1
+        return None
+
+    def complete(self, line):
+        """Complete a command name, or a $variable as the last word of the line"""
+        word = line.rsplit(' ', 1)[-1]
+        if word.startswith('$') and len(word) > 1:
+            name = self.first_match(self.variables, word[1:])
+            return line[:len(line) - len(word)] + '$' + name if name else None
+        if not line or ' ' in line:
+            return None
+        return self.first_match(self.commands, line)
+
+class ShellIntegration:
+    """Starts shells with the integration snippet and keeps each one's reported vocabulary"""
+    _counter = itertools.count(1)
+
+    def __init__(self, enabled):
+        self.enabled = enabled and SNIPPET.exists()
+        self.runtime_dir = get_runtime_dir()
+        self.vocabularies = {}
+        self.listeners = {}
+        self.event_offsets = {}
+        self.pending_prompts = {}
+        self.monitor = None
+        if self.enabled:
+            try:
+                os.makedirs(self.runtime_dir, mode=0o700, exist_ok=True)
+            except OSError as e:
+                print(f"Shell integration disabled: {e}")
+                self.enabled = False
+
+    def new_session(self):
+        """Return a fresh session id, or None when integration is off"""
+        if not self.enabled:
+            return None
+        return f"{os.getpid()}-{next(self._counter)}"
+
+    def shell_command(self, session_id):
+        """Return the argv and environment additions for a shell"""
+        if session_id is None:
+            return ["/bin/bash"], []
+        return (["/bin/bash", "--rcfile", str(SNIPPET)],
+                [f"HYXTERMINAL_SESSION_ID={session_id}", f"HYXTERMINAL_RUNTIME_DIR={self.runtime_dir}"])
+
+    def watch(self):
+        """Monitor the runtime directory for files written by the shells"""
+        from gi.repository import Gio
+
+        if not self.enabled or self.monitor:
+            return False
+        try:
+            self.monitor = Gio.File.new_for_path(self.runtime_dir).monitor_directory(
+                Gio.FileMonitorFlags.NONE, None)
+        except Exception as e:
+            print(f"Cannot watch {self.runtime_dir}: {e}")
+            return False
+        self.monitor.connect("changed", self.on_changed)
+        return False
+
+    def on_changed(self, monitor, file, other_file, event_type):
+        from gi.repository import Gio
+
+        # Shells write the file in place, so wait until it is closed
+        if event_type != Gio.FileMonitorEvent.CHANGES_DONE_HINT:
+            return
+        name = file.get_basename()
+        if name.endswith('.vocab'):
+            session_id = name[:-len('.vocab')]
+            threading.Thread(target=self.read_vocabulary, args=(session_id, file.get_path()),
+                             daemon=True).start()
+        elif name.endswith('.events'):
+            self.read_events(name[:-len('.events')], file.get_path())
+
+    def read_vocabulary(self, session_id, path):
+        try:
+            with open(path) as f:
+                vocabulary = ShellVocabulary.parse(f.read())
+        except OSError:
+            return
+        self.vocabularies[session_id] = vocabulary
+
+    def listen(self, session_id, callback):
+        """Call callback(kind, *values) on the main loop for each event the shell reports
+
+        ('A', prompt) when a prompt was drawn, with the visible text of its last line,
+        and ('D', status, command) when a command line finished.
+        """
+        if session_id is not None:
+            self.listeners[session_id] = callback
+            # A pooled shell drew its first prompt before anyone listened
+            prompt = self.pending_prompts.pop(session_id, None)
+            if prompt:
+                callback(*prompt)
+
+    def read_events(self, session_id, path):
+        """Read the lines appended to a session's events file since the last call"""
+        offset, partial = self.event_offsets.get(session_id, (0, b''))
+        try:
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except OSError:
+            return
+        lines = (partial + data).split(b'\n')
+        self.event_offsets[session_id] = (offset + len(data), lines.pop())
+        callback = self.listeners.get(session_id)
+        for line in lines:
+            event = self.parse_event(line.decode('utf-8', 'replace'))
+            if event and callback:
+                callback(*event)
+            elif event and event[0] == 'A':
+                self.pending_prompts[session_id] = event
+
+    @staticmethod
+    def parse_event(line):
+        kind, _, rest = line.partition(' ')
+        if kind == 'A':
+            return 'A', INVISIBLE.sub('', rest)
+        if kind == 'D':
+            status, _, command = rest.partition(' ')
+            try:
+                return 'D', int(status), command.strip()
+            except ValueError:
+                return None
+        return None
+
+    def complete(self, line, context=None):
+        """Completion provider backed by the session's own vocabulary"""
+        vocabulary = self.vocabularies.get((context or {}).get('session_id'))
+        if vocabulary is None:
+            return None
+        return vocabulary.complete(line)
+
+    def end_session(self, session_id):
+        """Forget a shell that has exited and remove its files"""
+        if session_id is None:
+            return
+        self.vocabularies.pop(session_id, None)
+        self.listeners.pop(session_id, None)
+        self.event_offsets.pop(session_id, None)
+        self.pending_prompts.pop(session_id, None)
+        for suffix in ('.vocab', '.vocab.tmp', '.events'):
+            try:
+                os.unlink(os.path.join(self.runtime_dir, session_id + suffix))
+            except OSError:
+                pass
+
+    def shutdown(self):
+        if self.monitor:
+            self.monitor.cancel()
+            self.monitor = None
+        if self.enabled:
+            shutil.rmtree(self.runtime_dir, ignore_errors=True)
@@ -0,0 +1,143 @@
+import os
+import signal
+import gi
+gi.require_version('Vte', '2.91')
+from gi.repository import Vte, GLib
+
+class ShellPool:
+    """Keeps idle pre-spawned shells ready to be attached to new terminals"""
+    _shared = None
+
+    @classmethod
+    def shared(cls, config, integration):
+        """Return the process-wide pool, created from config on first use"""
+        if cls._shared is None:
+            cls._shared = cls(
+                config.get('shell_pool_size', 0),
+                config.get('shell_pool_max_idle_mb', 64),
+                integration
+            )
+        return cls._shared
+
+    @classmethod
+    def shutdown_shared(cls):
+        """Terminate the idle shells of the process-wide pool, if any"""
+        if cls._shared is not None:
+            cls._shared.shutdown()
+
+    def __init__(self, size, max_idle_mb, integration):
+        self.size = size
+        self.max_idle_mb = max_idle_mb
+        self.integration = integration
+        self.idle = []
+        self.spawning = 0
+        self.refill_id = None
+        if self.size > 0:
+            self.schedule_refill()
+
+    def acquire(self):
+        """Take an idle (pty, pid, session_id) entry, or None if the pool is empty"""
+        entry = None
+        while self.idle:
+            pty, pid, session_id = self.idle.pop(0)
+            if self.is_alive(pid):
+                entry = (pty, pid, session_id)
+                break
+            self.integration.end_session(session_id)
+        self.schedule_refill()
+        return entry
+
+    def is_alive(self, pid):
+        """Check an idle shell is still running, reaping it if it is not"""
+        try:
+            reaped, _ = os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            return False
+        return reaped == 0
+
+    def schedule_refill(self):
+        """Top the pool up from an idle callback"""
+        if self.size > 0 and self.refill_id is None:
+            self.refill_id = GLib.idle_add(self.refill, priority=GLib.PRIORITY_LOW)
+
+    def refill(self):
+        self.refill_id = None
+        if len(self.idle) + self.spawning >= self.size:
+            return False
+        if self.idle and self.idle_rss_mb() >= self.max_idle_mb:
+            return False
+        self.spawn()
+        return False
+
+    def spawn(self):
+        """Start one shell on a fresh pty without a terminal attached"""
+        try:
+            pty = Vte.Pty.new_sync(Vte.PtyFlags.DEFAULT, None)
+            pty.set_size(24, 80)
+        except GLib.Error as e:
+            print(f"Failed to create pty for shell pool: {e}")
+            return
+        session_id = self.integration.new_session()
+        argv, envv = self.integration.shell_command(session_id)
+        self.spawning += 1
+        pty.spawn_async(
+            os.environ['HOME'],
+            argv,
+            envv,
+            GLib.SpawnFlags.DO_NOT_REAP_CHILD,
+            None,
+            None,
+            -1,
+            None,
+            self.on_spawned,
+            session_id
+        )
+
+    def on_spawned(self, pty, result, session_id):
+        self.spawning -= 1
+        try:
+            ok, pid = pty.spawn_finish(result)
+        except GLib.Error as e:
+            print(f"Failed to pre-spawn shell: {e}")
+            ok = False
+        if not ok:
+            self.integration.end_session(session_id)
+            return
+        self.idle.append((pty, pid, session_id))
+
+        # Drop the newest shell if the idle shells use too much memory
+        if self.idle_rss_mb() > self.max_idle_mb:
+            _, pid, session_id = self.idle.pop()
+            self.kill(pid, session_id)
+            return
+        self.schedule_refill()
+
+    def idle_rss_mb(self):
+        """Resident memory of all idle shells in MB"""
+        page_size = os.sysconf('SC_PAGE_SIZE')
+        total = 0
+        for _, pid, _ in self.idle:
+            try:
+                with open(f'/proc/{pid}/statm') as f:
+                    total += int(f.read().split()[1]) * page_size
+            except (OSError, ValueError, IndexError):
+                pass
+        return total / (1024 * 1024)
+
+    def kill(self, pid, session_id):
+        try:
+            os.kill(pid, signal.SIGHUP)
+            os.waitpid(pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            pass
+        self.integration.end_session(session_id)
+
+    def shutdown(self):
+        """Terminate all idle shells"""
+        if self.refill_id:
+            GLib.source_remove(self.refill_id)
+            self.refill_id = None
+        self.size = 0
+        while self.idle:
+            _, pid, session_id = self.idle.pop()
+            self.kill(pid, session_id)
@@ -0,0 +1,95 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+# Imported before GTK so the import phase itself can be measured. All calls
+# are cheap no-ops unless enable() was called.
+
+_origin = time.perf_counter()
+_enabled = False
+_finished = False
+_output = None
+_open = {}
+_events = []
+
+def enable(output=None):
+    """Start recording; report to stdout, or as JSON to output if given"""
+    global _enabled, _output
+    _enabled = True
+    _output = output
+
+def is_enabled():
+    return _enabled and not _finished
+
+def _now_ms():
+    return (time.perf_counter() - _origin) * 1000
+
+def _process_age_ms():
+    """Milliseconds between interpreter start and this module's import"""
+    try:
+        with open('/proc/self/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        ticks = os.sysconf('SC_CLK_TCK')
+        age = (uptime - start_ticks / ticks) * 1000
+        return max(0.0, age - _now_ms())
+    except (OSError, ValueError, IndexError):
+        return None
+
+def begin(name):
+    """Start timing a phase"""
+    if is_enabled():
+        _open[name] = _now_ms()
+
+def end(name):
+    """Finish timing a phase started with begin()"""
+    if is_enabled() and name in _open:
+        start = _open.pop(name)
+        _events.append((name, start, _now_ms() - start))
+
+@contextmanager
+def phase(name):
+    """Time the enclosed block as a phase"""
+    begin(name)
+    try:
+        yield
+    finally:
+        end(name)
+
+def mark(name):
+    """Record an instant event the first time it happens"""
+    if is_enabled() and not any(event[0] == name for event in _events):
+        _events.append((name, _now_ms(), None))
+
+def finish():
+    """Stop recording and emit the report"""
+    global _finished
+    if not is_enabled():
+        return
+    _finished = True
+
+    interpreter = _process_age_ms()
+    events = sorted(_events, key=lambda event: event[1])
+    if interpreter is not None:
+        events.insert(0, ("interpreter startup", -interpreter, interpreter))
+
+    if _output:
+        data = {
+            'phases': [
+                {'name': name, 'start_ms': round(start, 3),
+                 'duration_ms': None if duration is None else round(duration, 3)}
+                for name, start, duration in events
+            ],
+            'total_ms': round(_now_ms() + (interpreter or 0), 3),
+        }
+        with open(_output, 'w') as f:
+            json.dump(data, f, indent=4)
+        return
+
+    print(f"{'phase':<32} {'start ms':>10} {'duration ms':>12}")
+    for name, start, duration in events:
+        duration_text = '-' if duration is None else f"{duration:.1f}"
+        print(f"{name:<32} {start:>10.1f} {duration_text:>12}")
+    print(f"{'total':<32} {_now_ms() + (interpreter or 0):>10.1f}")
@@ -1,6 +1,7 @@
 import gi
 gi.require_version('Gtk', '3.0')
 from gi.repository import Gtk, Gdk
+from modules.session import Session
 
 class TabLabel(Gtk.Box):
     def __init__(self, title, tab, notebook):
@@ -36,9 +37,9 @@ class TabLabel(Gtk.Box):
 
     def on_close_clicked(self, button):
         if not self.is_editing:  # Prevent closing while editing
-            page_num = self.notebook.page_num(self.tab)
-            if page_num != -1:
-                self.notebook.remove_page(page_num)
+            if self.notebook.page_num(self.tab) != -1:
+                # Destroying the tab releases its panes, removing it would only unparent them
+                self.tab.destroy()
 
     def on_tab_clicked(self, widget, event):
         if event.type == Gdk.EventType._2BUTTON_PRESS and not self.is_editing:
@@ -69,10 +70,7 @@ class TabLabel(Gtk.Box):
             new_text = widget.get_text().strip()
             if new_text:
                 self.label.set_text(new_text)
-                # Update the Go to menu when tab name changes
-                window = self.get_toplevel()
-                if isinstance(window, Gtk.Window):
-                    window.update_goto_menu()
+                Session.schedule_save()
             
             # Safely restore label
             widget.hide()
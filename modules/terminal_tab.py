@@ -1,21 +1,54 @@
 import gi
 import os
-import subprocess
 gi.require_version('Gtk', '3.0')
 gi.require_version('Vte', '2.91')
-from gi.repository import Gtk, Gdk, Vte, GLib
+gi.require_version('PangoCairo', '1.0')
+from gi.repository import Gtk, Gdk, Vte, GLib, PangoCairo
 import modules.config as config
+from modules import startup_profiler as profiler
+from modules import metrics
+from modules.command_marks import CommandMarks
+
+HINT_DELAY = 150    # ms of typing pause before asking for a command hint
+ARCHIVE_INTERVAL = 1000    # ms between copies of finished rows to the scrollback archive
+ARCHIVE_BACKLOG = 0.5      # fraction of the scrollback left unarchived before copying at once
 
 class TerminalTab(Gtk.Box):
-    def __init__(self, parent_window, layout="single"):
+    def __init__(self, parent_window, layout="single", working_directory=None, requested_at=None,
+                 layout_tree=None):
         Gtk.Box.__init__(self, orientation=Gtk.Orientation.VERTICAL)
         self.parent_window = parent_window
+        self.working_directory = working_directory
         self.terminals = []
         
+        # Shell process, start directory and integration session of each terminal
+        self.child_pids = {}
+        self.terminal_directories = {}
+        self.session_ids = {}
+        
+        # Prompts and commands reported by integrated shells
+        self.command_marks = {}
+        
+        # Scrollback archive of each terminal and the first row not yet archived
+        self.pane_archives = {}
+        self.archived_rows = {}
+        self.archive_timeouts = {}
+        
+        # Time of the user action that created the pending terminals
+        self.requested_at = requested_at
+        
+        # Optionally wait until a pane is shown before starting its shell
+        # Restored tabs always defer, so only the visible tab starts its shells
+        # and the dropdown window always starts its shell while still hidden
+        self.defer_shells = ((parent_window.config.get('defer_hidden_shells', False) or layout == "session")
+                             and not parent_window.dropdown)
+        self.deferred_shells = {}
+        
         # Initialize hint-related variables for each terminal
         self.hint_timeouts = {}
         self.current_commands = {}
         self.current_hints = {}
+        self.hint_cells = {}
         
         if layout == "single":
             self.create_single_terminal()
@@ -27,25 +60,39 @@ class TerminalTab(Gtk.Box):
             self.create_quad_split()
         elif layout == "custom":
             self.show_custom_layout_dialog()
-    def create_terminal(self):
+        elif layout == "session":
+            self.create_from_tree(layout_tree)
+
+    def create_terminal(self, working_directory=None):
         """Create a new terminal instance"""
         terminal = Vte.Terminal()
+        if working_directory:
+            self.terminal_directories[terminal] = working_directory
         terminal.connect("child-exited", self.on_terminal_exit)
+        terminal.connect("destroy", self.teardown_terminal)
         terminal.connect("key-press-event", lambda w, e: self.on_key_press(w, e))
+        terminal.connect_after("draw", self.draw_hint)
+        terminal.connect("cursor-moved", self.on_cursor_moved)
+        terminal.connect("focus-in-event", lambda w, e: self.parent_window.services.scrollback_budget.on_focus(w))
         
         # Initialize hint state for this terminal
         self.hint_timeouts[terminal] = None
         self.current_commands[terminal] = ""
         self.current_hints[terminal] = ""
         
-        terminal.set_scrollback_lines(self.parent_window.config.get('scrollback_lines', 10000))
+        terminal.set_scrollback_lines(self.parent_window.services.get_scrollback_lines())
         terminal.set_font_scale(self.parent_window.config.get('font_scale', 1.0))
         terminal.set_cursor_shape(self.get_cursor_shape(
             self.parent_window.config.get('cursor_shape', 'block')
         ))
         
         self.update_colors_for_terminal(terminal)
-        self.start_shell(terminal)
+        if self.defer_shells:
+            self.defer_shell(terminal)
+        else:
+            self.connect_shell_metrics(terminal, self.requested_at)
+            with profiler.phase("start_shell"):
+                self.start_shell(terminal)
         self.terminals.append(terminal)
         return terminal
 
@@ -57,6 +104,7 @@ class TerminalTab(Gtk.Box):
 
     def create_horizontal_split(self):
         """Create two terminals side by side"""
+        self.requested_at = metrics.now()
         # Remove existing terminal
         if len(self.get_children()) > 0:
             old_terminal = self.get_children()[0]
@@ -75,6 +123,7 @@ class TerminalTab(Gtk.Box):
 
     def create_vertical_split(self):
         """Create two terminals stacked vertically"""
+        self.requested_at = metrics.now()
         # Remove existing terminal
         if len(self.get_children()) > 0:
             old_terminal = self.get_children()[0]
@@ -185,19 +234,60 @@ class TerminalTab(Gtk.Box):
         self.terminal = self.terminals[0]  # Keep reference for compatibility
         self.terminals[-1].grab_focus()  # Focus the last terminal created
 
+    def create_from_tree(self, layout_tree):
+        """Rebuild a saved layout of nested splits"""
+        self.pack_start(self.build_from_tree(layout_tree or {}), True, True, 0)
+        self.terminal = self.terminals[0]  # Keep reference for compatibility
+
+    def build_from_tree(self, node):
+        """Create the widget for one node of a saved layout"""
+        if 'paned' in node and len(node.get('children', [])) == 2:
+            orientation = (Gtk.Orientation.HORIZONTAL if node['paned'] == 'horizontal'
+                           else Gtk.Orientation.VERTICAL)
+            paned = Gtk.Paned(orientation=orientation)
+            self.style_paned(paned)
+            paned.pack1(self.build_from_tree(node['children'][0]), True, True)
+            paned.pack2(self.build_from_tree(node['children'][1]), True, True)
+            if node.get('position'):
+                paned.set_position(node['position'])
+            return paned
+        return self.create_terminal(node.get('cwd'))
+
+    def get_layout_tree(self, widget=None):
+        """Describe the splits and each pane's working directory"""
+        if widget is None:
+            children = self.get_children()
+            if not children:
+                return None
+            widget = children[0]
+        if isinstance(widget, Gtk.Paned):
+            child1, child2 = widget.get_child1(), widget.get_child2()
+            if child1 is None or child2 is None:
+                return self.get_layout_tree(child1 or child2)
+            orientation = widget.get_orientation()
+            return {
+                'paned': 'horizontal' if orientation == Gtk.Orientation.HORIZONTAL else 'vertical',
+                'position': widget.get_position(),
+                'children': [self.get_layout_tree(child1), self.get_layout_tree(child2)]
+            }
+        if isinstance(widget, Vte.Terminal):
+            return {'cwd': self.get_cwd(widget)}
+        return None
+
+    def get_cwd(self, terminal):
+        """Return the shell's current directory, or where it will start"""
+        pid = self.child_pids.get(terminal)
+        if pid:
+            try:
+                return os.readlink(f'/proc/{pid}/cwd')
+            except OSError:
+                pass
+        return self.terminal_directories.get(terminal) or self.working_directory or os.environ['HOME']
+
     def style_paned(self, paned):
         """Apply styling to make the paned divider more visible"""
-        css = b"""
-        paned separator { 
-            background-color: rgba(200, 200, 200, 0.5);
-            min-width: 3px;
-            min-height: 3px;
-        }
-        """
-        css_provider = Gtk.CssProvider()
-        css_provider.load_from_data(css)
         paned.get_style_context().add_provider(
-            css_provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
+            self.parent_window.services.paned_css, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
         )
 
     def get_cursor_shape(self, shape_name):
@@ -232,26 +322,268 @@ class TerminalTab(Gtk.Box):
         )
         terminal.set_colors(fg, bg, [])
 
+    def defer_shell(self, terminal):
+        """Show a placeholder and start the shell when the pane is mapped or focused"""
+        terminal.feed(b"\033[2mShell starts when this pane is shown\033[0m")
+        self.deferred_shells[terminal] = (
+            terminal.connect("map", self.start_deferred_shell),
+            terminal.connect("focus-in-event", self.start_deferred_shell)
+        )
+
+    def start_deferred_shell(self, terminal, *args):
+        """Replace the placeholder with a running shell"""
+        handlers = self.deferred_shells.pop(terminal, None)
+        if handlers:
+            for handler in handlers:
+                terminal.disconnect(handler)
+            terminal.reset(True, True)
+            # Timed from now, the placeholder is not the shell's output
+            self.connect_shell_metrics(terminal, metrics.now() if self.requested_at is not None else None)
+            self.start_shell(terminal)
+        return False
+
     def start_shell(self, terminal):
         """Start shell in the given terminal"""
+        working_directory = self.terminal_directories.get(terminal, self.working_directory)
+        services = self.parent_window.services
+        if services.scrollback_archive.enabled:
+            # Deferred panes get an archive only once they run a shell
+            self.start_archive(terminal)
+
+        # Attach an idle pre-spawned shell when the default directory is wanted
+        if not working_directory:
+            entry = services.shell_pool.acquire()
+            if entry:
+                pty, pid, self.session_ids[terminal] = entry
+                self.listen_to_shell(terminal)
+                terminal.set_pty(pty)
+                terminal.watch_child(pid)
+                self.on_shell_spawned(terminal, pid, None)
+                return
+
+        if not working_directory or not os.path.isdir(working_directory):
+            working_directory = os.environ['HOME']
+        session_id = self.session_ids[terminal] = services.shell_integration.new_session()
+        self.listen_to_shell(terminal)
+        argv, envv = services.shell_integration.shell_command(session_id)
         terminal.spawn_async(
             Vte.PtyFlags.DEFAULT,
-            os.environ['HOME'],
-            ["/bin/bash"],
-            [],
+            working_directory,
+            argv,
+            envv,
             GLib.SpawnFlags.DEFAULT,
             None,
             None,
             -1,
             None,
-            None
+            self.on_shell_spawned
+        )
+
+    def listen_to_shell(self, terminal):
+        """Follow the prompts and commands an integrated shell reports"""
+        self.parent_window.services.shell_integration.listen(
+            self.session_ids.get(terminal),
+            lambda kind, *values: self.on_shell_event(terminal, kind, *values)
         )
 
+    def on_shell_event(self, terminal, kind, *values):
+        marks = self.command_marks.setdefault(terminal, CommandMarks())
+        if kind == 'A':
+            self.mark_prompt(terminal, marks, values[0])
+        elif kind == 'D':
+            status, command = values
+            marks.finish(command, status)
+            if command:
+                self.parent_window.services.history.record(command, self.get_cwd(terminal))
+
+    def mark_prompt(self, terminal, marks, prompt, attempts=10):
+        """Record where a reported prompt is, waiting for it to be drawn if needed"""
+        col, row = terminal.get_cursor_position()
+        # Events arrive after the shell printed the prompt, possibly after typing started
+        for prompt_row in range(row, max(row - 4, -1), -1):
+            text = self.get_text_range(terminal, prompt_row, 0, prompt_row, terminal.get_column_count() - 1)
+            if prompt.rstrip() and text.startswith(prompt.rstrip()):
+                marks.add_prompt(prompt, prompt_row, len(prompt))
+                return
+        if attempts:
+            def on_contents_changed(widget):
+                widget.disconnect(handler)
+                self.mark_prompt(terminal, marks, prompt, attempts - 1)
+            handler = terminal.connect("contents-changed", on_contents_changed)
+        else:
+            marks.add_prompt(prompt, row, col)
+
+    @staticmethod
+    def get_text_range(terminal, start_row, start_col, end_row, end_col):
+        """Text of the cells between two positions, inclusive"""
+        content = terminal.get_text_range(start_row, start_col, end_row, end_col, lambda *args: True)
+        text = content[0] if isinstance(content, tuple) else content
+        return text or ""
+
+    def start_archive(self, terminal):
+        """Copy the terminal's output to the scrollback archive as rows are finished"""
+        archive = self.parent_window.services.scrollback_archive
+        cwd = self.terminal_directories.get(terminal, self.working_directory)
+        self.pane_archives[terminal] = archive.open_pane(cwd)
+        # Start at the cursor, nothing written before the shell belongs in the archive
+        col, row = terminal.get_cursor_position()
+        self.archived_rows[terminal] = row
+        terminal.connect("contents-changed", self.schedule_archive)
+
+    def schedule_archive(self, terminal):
+        if terminal not in self.pane_archives:
+            return
+        # A burst of output could scroll rows out before the timer copies them
+        col, cursor_row = terminal.get_cursor_position()
+        if cursor_row - self.archived_rows[terminal] >= terminal.get_scrollback_lines() * ARCHIVE_BACKLOG:
+            self.flush_archive(terminal)
+        elif not self.archive_timeouts.get(terminal):
+            self.archive_timeouts[terminal] = GLib.timeout_add(ARCHIVE_INTERVAL, self.archive_rows, terminal)
+
+    def flush_archive(self, terminal):
+        """Archive finished rows now, before the scrollback is cut or overflows"""
+        if terminal not in self.pane_archives:
+            return
+        timeout = self.archive_timeouts.get(terminal)
+        if timeout:
+            GLib.source_remove(timeout)
+        self.archive_rows(terminal)
+
+    def archive_rows(self, terminal, final=False):
+        """Archive the rows above the cursor, before they can scroll out of memory
+
+        VTE does not say when a row leaves the scrollback, so finished rows
+        are copied while they are still there. The cursor row is left for
+        later unless the terminal is going away.
+        """
+        self.archive_timeouts[terminal] = None
+        pane = self.pane_archives.get(terminal)
+        if pane is None:
+            return False
+        col, cursor_row = terminal.get_cursor_position()
+        adjustment = terminal.get_vadjustment()
+        lower = int(adjustment.get_lower())
+        first = self.archived_rows[terminal]
+        if first > adjustment.get_upper():
+            # Row numbers started over after a reset
+            first = lower
+        lines = []
+        if first < lower:
+            lines.append(f"[{lower - first} rows scrolled out before they were archived]")
+            first = lower
+        end_row = cursor_row if final else cursor_row - 1
+        if end_row >= first:
+            text = self.get_text_range(terminal, first, 0, end_row, terminal.get_column_count() - 1)
+            lines += text[:-1].split('\n') if text.endswith('\n') else text.split('\n')
+            first = end_row + 1
+        self.archived_rows[terminal] = first
+        self.parent_window.services.scrollback_archive.append(pane, lines)
+        return False
+
+    def stop_archive(self, terminal):
+        """Archive what is left of a closing terminal and seal its segment"""
+        if terminal not in self.pane_archives:
+            return
+        timeout = self.archive_timeouts.pop(terminal, None)
+        if timeout:
+            GLib.source_remove(timeout)
+        self.archive_rows(terminal, final=True)
+        self.archive_timeouts.pop(terminal, None)
+        self.archived_rows.pop(terminal, None)
+        self.parent_window.services.scrollback_archive.close_pane(self.pane_archives.pop(terminal))
+
+    def get_command_line(self, terminal):
+        """Return the command line typed so far, or None when the cursor is not at its end"""
+        marks = self.command_marks.get(terminal)
+        if marks is None:
+            return self.current_commands.get(terminal, "")
+        mark = marks.current
+        if mark is None:
+            # A command is running, its input is not a command line
+            return None
+        col, row = terminal.get_cursor_position()
+        if (row, col) <= (mark.row, mark.input_column):
+            return ""
+        columns = terminal.get_column_count()
+        if self.get_text_range(terminal, row, col, row, columns - 1).strip():
+            return None
+        end_row, end_col = (row, col - 1) if col > 0 else (row - 1, columns - 1)
+        text = self.get_text_range(terminal, mark.row, mark.input_column, end_row, end_col)
+        return text.replace('\n', '')
+
+    def scroll_to_prompt(self, terminal, direction):
+        """Scroll the previous or next command's prompt to the top of the pane"""
+        marks = self.command_marks.get(terminal)
+        if not marks:
+            return False
+        adjustment = terminal.get_vadjustment()
+        top = int(adjustment.get_value())
+        row = marks.previous_row(top) if direction < 0 else marks.next_row(top)
+        if row is None:
+            return False
+        adjustment.set_value(min(row, adjustment.get_upper() - adjustment.get_page_size()))
+        return True
+
+    def on_shell_spawned(self, terminal, pid, error, *user_data):
+        """Called once the shell process has been started"""
+        if error:
+            print(f"Failed to start shell: {error}")
+            return
+        self.child_pids[terminal] = pid
+        profiler.mark("first shell spawned")
+
+    def connect_shell_metrics(self, terminal, requested_at):
+        """Watch for the shell's first output, connected just before the shell starts"""
+        if profiler.is_enabled():
+            self.connect_startup_marks(terminal)
+        if requested_at is not None:
+            self.connect_prompt_metric(terminal, requested_at)
+
+    def connect_startup_marks(self, terminal):
+        """Record the first paint and first shell output for the startup profile"""
+        def on_draw(widget, cr):
+            profiler.mark("first terminal draw")
+            widget.disconnect(draw_handler)
+            return False
+
+        def on_contents_changed(widget):
+            profiler.mark("first shell output")
+            widget.disconnect(contents_handler)
+            # Let already queued startup work (plugin loading) finish first
+            GLib.idle_add(profiler.finish)
+
+        draw_handler = terminal.connect("draw", on_draw)
+        contents_handler = terminal.connect("contents-changed", on_contents_changed)
+
+    def connect_prompt_metric(self, terminal, requested_at):
+        """Record the time from the user action to the shell's first output"""
+        def on_contents_changed(widget):
+            metrics.record("prompt_latency", requested_at)
+            widget.disconnect(handler)
+
+        handler = terminal.connect("contents-changed", on_contents_changed)
+
+    def teardown_terminal(self, terminal):
+        """Release everything kept for a pane, when its shell exits or the pane is destroyed"""
+        if terminal in self.terminals:
+            self.terminals.remove(terminal)
+        services = self.parent_window.services
+        self.child_pids.pop(terminal, None)
+        self.terminal_directories.pop(terminal, None)
+        self.deferred_shells.pop(terminal, None)
+        self.clear_hint(terminal)
+        for state in (self.hint_timeouts, self.current_commands, self.current_hints):
+            state.pop(terminal, None)
+        services.completion.forget(terminal)
+        services.shell_integration.end_session(self.session_ids.pop(terminal, None))
+        services.scrollback_budget.forget(terminal)
+        self.command_marks.pop(terminal, None)
+        self.stop_archive(terminal)
+
     def on_terminal_exit(self, terminal, status):
         """Handle terminal exit - close tab or window appropriately"""
         # Remove the exited terminal from our list
-        if terminal in self.terminals:
-            self.terminals.remove(terminal)
+        self.teardown_terminal(terminal)
             
         # Get the parent container of the terminal
         parent = terminal.get_parent()
@@ -308,20 +640,34 @@ class TerminalTab(Gtk.Box):
         if notebook.get_n_pages() <= 1:
             self.parent_window.destroy()
         else:
-            # Otherwise just remove this tab
-            notebook.remove_page(page_num)
+            # Otherwise close this tab, destroying it releases its panes
+            self.destroy()
 
     def on_key_press(self, terminal, event):
         """Handle key events for command hints"""
+        # Any key makes a pending or in-flight hint stale
+        self.parent_window.services.completion.cancel(terminal)
         keyval = event.keyval
+        marks = self.command_marks.get(terminal)
+        if marks is not None:
+            # The shell reports its prompts, so the line is read from the terminal when needed.
+            # Keys typed while a command runs (an editor, a pager) get no hints until the next prompt.
+            if not marks.current or keyval == Gdk.KEY_Tab:
+                self.clear_hint(terminal)
+            elif keyval in (Gdk.KEY_Return, Gdk.KEY_KP_Enter):
+                self.clear_hint(terminal)
+                marks.submit()
+            else:
+                self.schedule_hint_check(terminal)
+            return False
         if keyval == Gdk.KEY_Tab:
-            if self.hint_timeouts.get(terminal):
-                GLib.source_remove(self.hint_timeouts[terminal])
-                self.hint_timeouts[terminal] = None
-            self.current_hints[terminal] = ""
+            self.clear_hint(terminal)
             return False
         elif keyval in (Gdk.KEY_Return, Gdk.KEY_KP_Enter):
             self.clear_hint(terminal)
+            if self.current_commands.get(terminal):
+                self.parent_window.services.history.record(self.current_commands[terminal],
+                                                           self.get_cwd(terminal))
             self.current_commands[terminal] = ""
         else:
             if keyval in range(32, 127):
@@ -338,9 +684,8 @@ class TerminalTab(Gtk.Box):
 
     def schedule_hint_check(self, terminal):
         """Schedule a new hint check with proper cleanup"""
-        if self.hint_timeouts.get(terminal):
-            GLib.source_remove(self.hint_timeouts[terminal])
-        self.hint_timeouts[terminal] = GLib.timeout_add(1000, lambda: self.check_command_completion(terminal))
+        self.clear_hint(terminal)
+        self.hint_timeouts[terminal] = GLib.timeout_add(HINT_DELAY, lambda: self.check_command_completion(terminal))
 
     def clear_hint(self, terminal):
         """Safely clear current hint"""
@@ -348,33 +693,84 @@ class TerminalTab(Gtk.Box):
             GLib.source_remove(self.hint_timeouts[terminal])
             self.hint_timeouts[terminal] = None
         if self.current_hints.get(terminal):
-            terminal.feed(f"\033[{len(self.current_hints[terminal])}D\033[K".encode())
+            self.queue_hint_redraw(terminal)
             self.current_hints[terminal] = ""
+            self.hint_cells.pop(terminal, None)
 
     def display_hint(self, terminal, hint_text):
-        """Display hint directly in terminal"""
+        """Show hint as ghost text after the cursor, leaving the terminal contents alone"""
+        if self.current_hints.get(terminal):
+            self.queue_hint_redraw(terminal)
+            self.current_hints[terminal] = ""
         if hint_text:
-            sequence = f"\033[2;37m{hint_text}\033[0m"
-            terminal.feed(sequence.encode())
-            terminal.feed(f"\033[{len(hint_text)}D".encode())
             self.current_hints[terminal] = hint_text
+            self.hint_cells[terminal] = terminal.get_cursor_position()
+            self.queue_hint_redraw(terminal)
 
-    def check_command_completion(self, terminal):
-        """Check for command completion"""
-        try:
-            current_command = self.current_commands.get(terminal, "")
-            cmd = ["bash", "-c", f"compgen -c '{current_command}' | head -n 1"]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            suggestion = result.stdout.strip()
-
-            if suggestion and suggestion.startswith(current_command):
-                completion = suggestion[len(current_command):]
-                if completion:
-                    self.display_hint(terminal, completion)
-
-        except Exception as e:
-            print(f"Error checking completion: {e}")
+    def get_hint_rectangle(self, terminal):
+        """Pixel area covered by the hint, or None when it is scrolled out of view"""
+        col, row = self.hint_cells[terminal]
+        row -= int(terminal.get_vadjustment().get_value())
+        if row < 0 or row >= terminal.get_row_count():
+            return None
+        padding = terminal.get_style_context().get_padding(terminal.get_state_flags())
+        char_width = terminal.get_char_width()
+        char_height = terminal.get_char_height()
+        return (padding.left + col * char_width, padding.top + row * char_height,
+                len(self.current_hints[terminal]) * char_width, char_height)
+
+    def queue_hint_redraw(self, terminal):
+        rectangle = self.get_hint_rectangle(terminal)
+        if rectangle:
+            terminal.queue_draw_area(*rectangle)
+
+    def draw_hint(self, terminal, cr):
+        """Paint the hint over the cells VTE has just drawn"""
+        hint_text = self.current_hints.get(terminal)
+        if not hint_text:
+            return False
+        rectangle = self.get_hint_rectangle(terminal)
+        if not rectangle:
+            return False
+        x, y, width, height = rectangle
+        # get_font() is the unscaled font, the cells are drawn with font_scale applied
+        font = terminal.get_font().copy()
+        scale = terminal.get_font_scale()
+        if font.get_size_is_absolute():
+            font.set_absolute_size(font.get_size() * scale)
+        else:
+            font.set_size(int(font.get_size() * scale))
+        layout = terminal.create_pango_layout(hint_text)
+        layout.set_font_description(font)
+        color = config.parse_color(self.parent_window.config.get('foreground_color', '#FFFFFF'), 0.5)
+        # The clip must not outlive the hint, other draw handlers use the same context
+        cr.save()
+        cr.rectangle(x, y, width, height)
+        cr.clip()
+        cr.set_source_rgba(color.red, color.green, color.blue, color.alpha)
+        cr.move_to(x, y)
+        PangoCairo.show_layout(cr, layout)
+        cr.restore()
+        return False
+
+    def on_cursor_moved(self, terminal):
+        # Output or editing moved the cursor away from where the hint was shown
+        if self.current_hints.get(terminal) and terminal.get_cursor_position() != self.hint_cells.get(terminal):
             self.clear_hint(terminal)
 
+    def check_command_completion(self, terminal):
+        """Ask the completion engine for a hint, shown when it arrives"""
         self.hint_timeouts[terminal] = None
+        current_command = self.get_command_line(terminal)
+        if not current_command:
+            return False
+        self.parent_window.services.completion.submit(
+            terminal, current_command,
+            lambda suggestion: self.on_completion(terminal, current_command, suggestion),
+            {'session_id': self.session_ids.get(terminal), 'cwd': self.get_cwd(terminal)}
+        )
         return False
+
+    def on_completion(self, terminal, prefix, suggestion):
+        if suggestion and suggestion.startswith(prefix) and len(suggestion) > len(prefix):
+            self.display_hint(terminal, suggestion[len(prefix):])
@@ -38,25 +38,16 @@ class Themes:
             'font_scale': 1.0  # Reset font scale for consistency
         })
 
-        # Apply changes to all terminal tabs
+        # Apply changes to all terminal tabs of every window
         opacity = parent_window.config.get('background_opacity', 0.9)
-        for i in range(parent_window.notebook.get_n_pages()):
-            tab = parent_window.notebook.get_nth_page(i)
-            tab.update_colors(bg, fg, opacity)
-            tab.terminal.set_font_scale(1.0)
+        for window in parent_window.services.windows:
+            for i in range(window.notebook.get_n_pages()):
+                tab = window.notebook.get_nth_page(i)
+                tab.update_colors(bg, fg, opacity)
+                tab.terminal.set_font_scale(1.0)
             
-        # Update menubar style
-        menubar = parent_window.vbox.get_children()[0]
-        menubar_style = menubar.get_style_context()
-        menubar_css = Gtk.CssProvider()
-        css = f"""
-        menubar {{
-            background-color: {bg};
-            color: {fg};
-        }}
-        """
-        menubar_css.load_from_data(css.encode())
-        menubar_style.add_provider(menubar_css, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
+        # Update the shared menubar and notebook style
+        parent_window.services.update_theme_css()
 
         # Save configuration
         config.save_config(parent_window.config) 
\ No newline at end of file
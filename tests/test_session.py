@@ -0,0 +1,89 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from modules.session import Session
+
+class FakeLabel:
+    def __init__(self, text):
+        self.label = self
+        self.text = text
+
+    def get_text(self):
+        return self.text
+
+class FakeTab:
+    def get_layout_tree(self):
+        return {'type': 'terminal', 'cwd': '/tmp'}
+
+class FakeNotebook:
+    def __init__(self):
+        self.tabs = [FakeTab()]
+
+    def connect(self, signal, callback):
+        pass
+
+    def get_n_pages(self):
+        return len(self.tabs)
+
+    def get_nth_page(self, i):
+        return self.tabs[i]
+
+    def get_current_page(self):
+        return 0
+
+    def get_tab_label(self, tab):
+        return FakeLabel("Terminal 1")
+
+class FakeWindow:
+    def __init__(self):
+        self.notebook = FakeNotebook()
+
+    def connect(self, signal, callback):
+        pass
+
+    def get_size(self):
+        return 800, 600
+
+class SessionCloseTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        session_file = Path(self.directory.name) / 'session.json'
+        patcher = mock.patch.object(Session, 'get_session_file', staticmethod(lambda: session_file))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.directory.cleanup)
+        Session._windows = []
+        Session._last_saved = None
+        Session._closed = False
+
+    def test_closing_last_window_keeps_session(self):
+        window = FakeWindow()
+        Session.track(window)
+        Session.on_window_delete(window, None)
+        Session.on_window_destroy(window)
+        Session.close()
+
+        Session._closed = False
+        saved = Session.load()
+        self.assertIsNotNone(saved)
+        self.assertEqual(len(saved['windows']), 1)
+        self.assertEqual(saved['windows'][0]['tabs'][0]['title'], "Terminal 1")
+
+    def test_last_shell_exiting_keeps_session(self):
+        window = FakeWindow()
+        Session.track(window)
+        Session.save()
+        # The last shell exited: its tab is gone and the window is destroyed without delete-event
+        window.notebook.tabs = []
+        Session.on_window_destroy(window)
+        Session.close()
+
+        Session._closed = False
+        saved = Session.load()
+        self.assertIsNotNone(saved)
+        self.assertEqual(saved['windows'][0]['tabs'][0]['title'], "Terminal 1")
+
+if __name__ == '__main__':
+    unittest.main()